@@ -0,0 +1,101 @@
+"""Compare the JSON and binary formats of the daemon REST and WebSocket APIs.
+
+Measures, for one message of /state/full (and /state/ws/full) and one message of
+/move/ws/set_target, the daemon side cost (encoding the state, decoding the
+target) and the size of the payloads.
+"""
+
+import json
+import timeit
+from datetime import datetime, timezone
+
+import numpy as np
+
+from reachy_mini.daemon.app.models import FullBodyTarget, FullState, as_any_pose
+from reachy_mini.io.wire import (
+    RobotStateSample,
+    TargetSample,
+    WireFormat,
+    decode_target,
+    encode_state,
+    encode_target,
+)
+from reachy_mini.utils import create_head_pose
+
+N = 20_000
+
+
+def bench(label: str, fn) -> float:  # type: ignore[no-untyped-def]
+    """Return the mean duration of fn in microseconds."""
+    us = timeit.timeit(fn, number=N) / N * 1e6
+    print(f"  {label:<36} {us:8.2f} us")
+    return us
+
+
+def main() -> None:
+    """Run the benchmark."""
+    head_pose = create_head_pose(z=10, roll=5, yaw=10, mm=True)
+    head_joints = np.random.uniform(-1.0, 1.0, 7)
+    antennas = np.random.uniform(-1.0, 1.0, 2)
+
+    def encode_json_state() -> str:
+        return FullState.model_validate(
+            {
+                "control_mode": "enabled",
+                "head_pose": as_any_pose(head_pose, False),
+                "head_joints": head_joints.tolist(),
+                "body_yaw": float(head_joints[0]),
+                "antennas_position": antennas.tolist(),
+                "timestamp": datetime.now(timezone.utc),
+            }
+        ).model_dump_json()
+
+    def encode_binary_state() -> bytes:
+        return encode_state(
+            RobotStateSample(
+                seq=0,
+                timestamp=0.0,
+                control_mode="enabled",
+                head_joint_positions=head_joints,
+                antennas_joint_positions=antennas,
+                target_head_joint_positions=head_joints,
+                target_antennas_joint_positions=antennas,
+                head_pose=head_pose,
+            ),
+            WireFormat.BINARY,
+        )
+
+    json_target = json.dumps(
+        {
+            "target_head_pose": json.loads(
+                as_any_pose(head_pose, False).model_dump_json()
+            ),
+            "target_antennas": antennas.tolist(),
+            "target_body_yaw": 0.1,
+        }
+    )
+    binary_target = encode_target(TargetSample(0, 0.0, head_pose, antennas, 0.1))
+
+    def decode_json_target() -> None:
+        target = FullBodyTarget.model_validate_json(json_target)
+        assert target.target_head_pose is not None
+        target.target_head_pose.to_pose_array()
+
+    print("state:")
+    json_us = bench("encode json", encode_json_state)
+    binary_us = bench("encode binary", encode_binary_state)
+    json_size, binary_size = len(encode_json_state()), len(encode_binary_state())
+    print(f"  {'size json / binary':<36} {json_size:5d} / {binary_size} bytes")
+    print(f"  binary: x{json_us / binary_us:.1f} faster")
+
+    print("target:")
+    json_us = bench("decode json", decode_json_target)
+    binary_us = bench("decode binary", lambda: decode_target(binary_target))
+    print(
+        f"  {'size json / binary':<36} {len(json_target):5d} / {len(binary_target)} bytes"
+    )
+    print(f"  binary: x{json_us / binary_us:.1f} faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare the single and batch kinematics of each engine.
+
+Generates a smooth head trajectory, then reports how many poses per second each
+available engine solves with one `ik`/`fk` call per sample versus a single
+`ik_batch`/`fk_batch` call over the whole trajectory. Engines whose optional
+dependencies are not installed are skipped.
+"""
+
+import time
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from reachy_mini.kinematics import AnalyticalKinematics, NNKinematics, PlacoKinematics
+from reachy_mini.utils.constants import MODELS_ROOT_PATH, URDF_ROOT_PATH
+
+N = 1000
+
+
+def make_trajectory(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return n head poses and body yaws along a smooth trajectory."""
+    t = np.linspace(0, 2 * np.pi, n)
+    poses = np.tile(np.eye(4), (n, 1, 1))
+    poses[:, :3, :3] = R.from_euler(
+        "xyz",
+        np.stack([0.2 * np.sin(t), 0.2 * np.sin(2 * t), 0.5 * np.sin(t)], axis=1),
+    ).as_matrix()
+    poses[:, 2, 3] = 0.01 * np.sin(3 * t)
+    body_yaws = 0.3 * np.sin(t)
+    return poses, body_yaws
+
+
+def rate(fn) -> float:  # type: ignore[no-untyped-def]
+    """Return the number of samples per second processed by fn."""
+    t0 = time.perf_counter()
+    fn()
+    return N / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    poses, body_yaws = make_trajectory(N)
+
+    engines = {
+        "AnalyticalKinematics": lambda: AnalyticalKinematics(),
+        "NNKinematics": lambda: NNKinematics(MODELS_ROOT_PATH),
+        "PlacoKinematics": lambda: PlacoKinematics(URDF_ROOT_PATH),
+    }
+
+    print(f"{'engine':<22} {'ik':>12} {'ik_batch':>12} {'fk':>12} {'fk_batch':>12}")
+    for name, create in engines.items():
+        try:
+            kin = create()
+        except ImportError as e:
+            print(f"{name:<22} skipped ({e})")
+            continue
+
+        joints = kin.ik_batch(poses, body_yaws)
+
+        ik = rate(lambda: [kin.ik(p, body_yaw=y) for p, y in zip(poses, body_yaws)])
+        ik_batch = rate(lambda: kin.ik_batch(poses, body_yaws))
+        fk = rate(lambda: [kin.fk(j) for j in joints])
+        fk_batch = rate(lambda: kin.fk_batch(joints))
+
+        print(
+            f"{name:<22} {ik:10.0f}/s {ik_batch:10.0f}/s {fk:10.0f}/s {fk_batch:10.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
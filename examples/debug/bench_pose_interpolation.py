@@ -0,0 +1,113 @@
+"""Compare the quaternion pose interpolation with the former scipy implementation.
+
+Checks that both give the same poses (including extrapolation) and measures the
+cost of one interpolation, as called at each control loop tick by the gotos, as
+well as the batched form.
+"""
+
+import timeit
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from reachy_mini.motion.goto import GotoMove
+from reachy_mini.utils.interpolation import (
+    InterpolationTechnique,
+    linear_pose_interpolation,
+    linear_pose_interpolation_many,
+)
+
+N = 20_000
+NB_POSES = 1_000
+TOLERANCE = 1e-9
+
+
+def scipy_linear_pose_interpolation(
+    start_pose: np.ndarray, target_pose: np.ndarray, t: float
+) -> np.ndarray:
+    """Former implementation of linear_pose_interpolation, used as reference."""
+    rot_start = R.from_matrix(start_pose[:3, :3])
+    rot_end = R.from_matrix(target_pose[:3, :3])
+    rotvec_rel = (rot_start.inv() * rot_end).as_rotvec()
+    rot_interp = (rot_start * R.from_rotvec(rotvec_rel * t)).as_matrix()
+
+    pos_start = start_pose[:3, 3]
+    pos_interp = pos_start + (target_pose[:3, 3] - pos_start) * t
+
+    interp_pose = np.eye(4)
+    interp_pose[:3, :3] = rot_interp
+    interp_pose[:3, 3] = pos_interp
+    return interp_pose
+
+
+def random_pose(rng: np.random.Generator) -> np.ndarray:
+    """Return a random pose."""
+    pose = np.eye(4)
+    pose[:3, :3] = R.random(random_state=rng.integers(1 << 31)).as_matrix()
+    pose[:3, 3] = rng.uniform(-0.05, 0.05, 3)
+    return pose
+
+
+def bench(label: str, fn, number: int = N) -> float:  # type: ignore[no-untyped-def]
+    """Return the mean duration of fn in microseconds."""
+    us = timeit.timeit(fn, number=number) / number * 1e6
+    print(f"  {label:<36} {us:8.2f} us")
+    return us
+
+
+def main() -> None:
+    """Run the checks and the benchmark."""
+    rng = np.random.default_rng(0)
+
+    max_error = 0.0
+    for _ in range(NB_POSES):
+        start, target = random_pose(rng), random_pose(rng)
+        # Small rotations too, where arccos-based slerps lose precision
+        if rng.uniform() < 0.2:
+            target[:3, :3] = (
+                R.from_matrix(start[:3, :3]) * R.from_rotvec(rng.normal(0, 1e-6, 3))
+            ).as_matrix()
+        ts = rng.uniform(-0.5, 1.5, 8)
+        batch = linear_pose_interpolation_many(start, target, ts)
+        for t, pose in zip(ts, batch):
+            expected = scipy_linear_pose_interpolation(start, target, t)
+            max_error = max(
+                max_error,
+                np.abs(linear_pose_interpolation(start, target, t) - expected).max(),
+                np.abs(pose - expected).max(),
+            )
+    print(f"max error vs scipy: {max_error:.2e} (tolerance {TOLERANCE:.0e})")
+    assert max_error < TOLERANCE
+
+    start, target = random_pose(rng), random_pose(rng)
+    goto = GotoMove(
+        start, target, np.zeros(2), None, 0.0, None, 1.0, InterpolationTechnique.LINEAR
+    )
+    print("single pose:")
+    ref = bench("scipy", lambda: scipy_linear_pose_interpolation(start, target, 0.3))
+    quat = bench(
+        "linear_pose_interpolation",
+        lambda: linear_pose_interpolation(start, target, 0.3),
+    )
+    goto_us = bench("GotoMove.evaluate (precomputed)", lambda: goto.evaluate(0.3))
+    print(
+        f"  x{ref / quat:.1f} faster, x{ref / goto_us:.1f} with precomputed quaternions"
+    )
+
+    ts = np.linspace(0.0, 1.0, 100)
+    print("100 poses:")
+    ref = bench(
+        "scipy",
+        lambda: [scipy_linear_pose_interpolation(start, target, t) for t in ts],
+        number=N // 100,
+    )
+    batch = bench(
+        "linear_pose_interpolation_many",
+        lambda: linear_pose_interpolation_many(start, target, ts),
+        number=N // 100,
+    )
+    print(f"  x{ref / batch:.1f} faster")
+
+
+if __name__ == "__main__":
+    main()
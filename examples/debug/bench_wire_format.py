@@ -0,0 +1,63 @@
+"""Compare the JSON and binary wire formats of the state topic.
+
+Measures the encode cost (daemon side) and decode cost (client side) of one
+state sample, as published by the daemon at each control loop tick, as well as
+the size of the payloads.
+"""
+
+import timeit
+
+import numpy as np
+
+from reachy_mini.io.wire import (
+    RobotStateSample,
+    WireFormat,
+    decode_state,
+    encode_state,
+)
+
+N = 20_000
+
+
+def bench(label: str, fn) -> float:  # type: ignore[no-untyped-def]
+    """Return the mean duration of fn in microseconds."""
+    us = timeit.timeit(fn, number=N) / N * 1e6
+    print(f"  {label:<28} {us:8.2f} us")
+    return us
+
+
+def main() -> None:
+    """Run the benchmark."""
+    pose = np.eye(4)
+    pose[:3, 3] = np.random.uniform(-0.01, 0.01, 3)
+    sample = RobotStateSample(
+        seq=1,
+        timestamp=0.0,
+        control_mode="enabled",
+        head_joint_positions=np.random.uniform(-1.0, 1.0, 7),
+        antennas_joint_positions=np.random.uniform(-1.0, 1.0, 2),
+        target_head_joint_positions=np.random.uniform(-1.0, 1.0, 7),
+        target_antennas_joint_positions=np.random.uniform(-1.0, 1.0, 2),
+        head_pose=pose,
+    )
+
+    results = {}
+    for wire_format in WireFormat:
+        print(f"{wire_format.value}:")
+        payload = encode_state(sample, wire_format)
+
+        encode = bench("encode state", lambda: encode_state(sample, wire_format))
+        decode = bench("decode state", lambda: decode_state(payload))
+        print(f"  {'payload size':<28} {len(payload):8d} bytes")
+        results[wire_format] = (encode, decode, len(payload))
+
+    json_res, bin_res = results[WireFormat.JSON], results[WireFormat.BINARY]
+    print(
+        f"binary vs json: encode x{json_res[0] / bin_res[0]:.1f} faster, "
+        f"decode x{json_res[1] / bin_res[1]:.1f} faster, "
+        f"{json_res[2] / bin_res[2]:.1f}x smaller"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -27,12 +27,14 @@ from reachy_mini.daemon.app.routers import (
     apps,
     daemon,
     kinematics,
+    metrics,
     motors,
     move,
     state,
     volume,
 )
 from reachy_mini.daemon.daemon import Daemon
+from reachy_mini.io.wire import WireFormat
 
 
 @dataclass
@@ -49,6 +51,8 @@ class Args:
 
     serialport: str = "auto"
     hardware_config_filepath: str | None = None
+    realtime_priority: int | None = None
+    cpu_affinity: list[int] | None = None
 
     sim: bool = False
     scene: str = "empty"
@@ -72,6 +76,8 @@ class Args:
     fastapi_port: int = 8000
 
     localhost_only: bool | None = None
+    wire_format: WireFormat = WireFormat.BINARY
+    legacy_topics: bool = True
 
 
 def create_app(args: Args, health_check_event: asyncio.Event | None = None) -> FastAPI:
@@ -130,6 +136,10 @@ def create_app(args: Args, health_check_event: asyncio.Event | None = None) -> F
         stream=args.stream,
         wireless_version=args.wireless_version,
         desktop_app_daemon=args.desktop_app_daemon,
+        wire_format=args.wire_format,
+        legacy_topics=args.legacy_topics,
+        realtime_priority=args.realtime_priority,
+        cpu_affinity=set(args.cpu_affinity) if args.cpu_affinity else None,
     )
     app.state.app_manager = AppManager(
         wireless_version=args.wireless_version,
@@ -141,6 +151,7 @@ def create_app(args: Args, health_check_event: asyncio.Event | None = None) -> F
     router.include_router(apps.router)
     router.include_router(daemon.router)
     router.include_router(kinematics.router)
+    router.include_router(metrics.router)
     router.include_router(motors.router)
     router.include_router(move.router)
     router.include_router(state.router)
@@ -301,6 +312,19 @@ def main() -> None:
         default=default_hw_config_path,
         help=f"Path to the hardware configuration YAML file (default: {default_hw_config_path}).",
     )
+    parser.add_argument(
+        "--realtime-priority",
+        type=int,
+        default=default_args.realtime_priority,
+        help="SCHED_FIFO priority (1-99) of the control loop thread. Requires CAP_SYS_NICE (default: None, normal scheduling).",
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        type=int,
+        nargs="+",
+        default=default_args.cpu_affinity,
+        help="CPUs the control loop thread is pinned to, e.g. --cpu-affinity 3 (default: None, any CPU).",
+    )
     # Simulation mode
     parser.add_argument(
         "--sim",
@@ -395,6 +419,25 @@ def main() -> None:
         dest="localhost_only",
         help="Allow the server to listen on all interfaces (default: False).",
     )
+    parser.add_argument(
+        "--wire-format",
+        type=str,
+        default=default_args.wire_format.value,
+        choices=[f.value for f in WireFormat],
+        help="Encoding of the combined state topic. Use 'json' for clients without binary support (default: binary).",
+    )
+    parser.add_argument(
+        "--legacy-topics",
+        action="store_true",
+        default=default_args.legacy_topics,
+        help="Also publish the JSON joint_positions and head_pose topics of older clients (default: True).",
+    )
+    parser.add_argument(
+        "--no-legacy-topics",
+        action="store_false",
+        dest="legacy_topics",
+        help="Only publish the combined state topic, older clients will not receive the robot state (default: False).",
+    )
     # Kinematics options
     parser.add_argument(
         "--check-collision",
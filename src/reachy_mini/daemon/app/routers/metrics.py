@@ -0,0 +1,40 @@
+"""Metrics router exposing the runtime counters of the daemon.
+
+The metrics of the control loop, kinematics, transports and media (see
+utils/metrics.py) are rendered in the Prometheus text exposition format, only when
+the endpoint is scraped.
+"""
+
+import functools
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ....utils.metrics import PROMETHEUS_CONTENT_TYPE, metrics
+from .state import state_broadcaster
+
+router = APIRouter()
+
+
+def _broadcaster_stat(name: str) -> float:
+    return state_broadcaster.get_stats()[name]
+
+
+_state_frames = metrics.counter(
+    "state_ws_frames_total",
+    "Frames encoded, sent and dropped by the /state/ws/full broadcaster.",
+    ("result",),
+)
+for _result in ("encoded", "sent", "dropped"):
+    _state_frames.labels(result=_result).set_function(
+        functools.partial(_broadcaster_stat, f"nb_{_result}")
+    )
+metrics.gauge(
+    "state_ws_subscribers", "WebSockets subscribed to the state broadcaster."
+).set_function(functools.partial(_broadcaster_stat, "nb_subscribers"))
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Get the metrics of the daemon, in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -9,6 +9,8 @@ This exposes:
 
 import asyncio
 import json
+import time
+from collections import deque
 from enum import Enum
 from typing import Any, Coroutine
 from uuid import UUID, uuid4
@@ -18,7 +20,13 @@ from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisco
 from huggingface_hub.errors import RepositoryNotFoundError
 from pydantic import BaseModel
 
-from reachy_mini.motion.recorded_move import RecordedMoves
+from reachy_mini.io.wire import (
+    TargetAck,
+    TargetSample,
+    decode_target,
+    encode_target_ack,
+)
+from reachy_mini.motion.recorded_move import get_recorded_moves
 
 from ....daemon.backend.abstract import Backend
 from ..dependencies import get_backend, ws_get_backend
@@ -27,6 +35,9 @@ from ..models import AnyPose, FullBodyTarget
 move_tasks: dict[UUID, asyncio.Task[None]] = {}
 move_listeners: list[WebSocket] = []
 
+# Binary targets kept per WebSocket until they are acknowledged
+MAX_PENDING_ACKS = 1000
+
 
 router = APIRouter(prefix="/move")
 
@@ -178,7 +189,7 @@ async def list_recorded_move_dataset(
 ) -> list[str]:
     """List available recorded moves in a dataset."""
     try:
-        moves = RecordedMoves(dataset_name)
+        moves = get_recorded_moves(dataset_name)
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -193,7 +204,7 @@ async def play_recorded_move_dataset(
 ) -> MoveUUID:
     """Request the robot to play a predefined recorded move from a dataset."""
     try:
-        recorded_moves = RecordedMoves(dataset_name)
+        recorded_moves = get_recorded_moves(dataset_name)
     except RepositoryNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     try:
@@ -230,28 +241,69 @@ async def set_target(
     backend: Backend = Depends(get_backend),
 ) -> dict[str, str]:
     """POST route to set a single FullBodyTarget."""
-    backend.set_target(
+    _submit_target(target, backend, source="api")
+    return {"status": "ok"}
+
+
+def _submit_target(target: FullBodyTarget, backend: Backend, source: str) -> None:
+    """Submit a target to the backend command arbiter, applied at the next tick."""
+    backend.command_arbiter.submit(
+        source=source,
         head=target.target_head_pose.to_pose_array()
         if target.target_head_pose
         else None,
         antennas=np.array(target.target_antennas) if target.target_antennas else None,
         body_yaw=target.target_body_yaw,
     )
-    return {"status": "ok"}
 
 
 @router.websocket("/ws/set_target")
 async def ws_set_target(
-    websocket: WebSocket, backend: Backend = Depends(ws_get_backend)
+    websocket: WebSocket,
+    ack: bool = False,
+    backend: Backend = Depends(ws_get_backend),
 ) -> None:
-    """WebSocket route to stream FullBodyTarget set_target calls."""
+    """WebSocket route to stream FullBodyTarget set_target calls.
+
+    Text frames hold JSON FullBodyTarget, binary frames hold TARGET messages (see
+    reachy_mini.io.wire). Binary frames are the fast path for teleoperation: they are
+    decoded without any pydantic validation nor scipy conversion. Both can be mixed.
+
+    Targets are coalesced by the command arbiter: only the latest one received
+    before a control loop tick is applied. With `ack=true`, a binary TARGET_ACK
+    message is sent back each time a binary target is applied, with the time
+    between its reception and its application.
+    """
     await websocket.accept()
+    source = f"ws-{id(websocket)}"
+    # Binary targets not acknowledged yet, with their reception time
+    received: deque[tuple[float, TargetSample]] = deque(maxlen=MAX_PENDING_ACKS)
+    ack_task = (
+        asyncio.create_task(_send_target_acks(websocket, backend, source, received))
+        if ack
+        else None
+    )
     try:
         while True:
-            data = await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
             try:
-                target = FullBodyTarget.model_validate_json(data)
-                await set_target(target, backend)
+                data = message.get("bytes")
+                if data is not None:
+                    received_at = time.monotonic()
+                    sample = decode_target(data)
+                    backend.command_arbiter.submit(
+                        source=source,
+                        head=sample.head_pose,
+                        antennas=sample.antennas,
+                        body_yaw=sample.body_yaw,
+                    )
+                    if ack:
+                        received.append((received_at, sample))
+                else:
+                    target = FullBodyTarget.model_validate_json(message["text"])
+                    _submit_target(target, backend, source)
 
             except Exception as e:
                 await websocket.send_text(
@@ -259,3 +311,45 @@ async def ws_set_target(
                 )
     except WebSocketDisconnect:
         pass
+    finally:
+        if ack_task is not None:
+            ack_task.cancel()
+        backend.command_arbiter.forget(source)
+
+
+async def _send_target_acks(
+    websocket: WebSocket,
+    backend: Backend,
+    source: str,
+    received: "deque[tuple[float, TargetSample]]",
+) -> None:
+    """Acknowledge the binary targets of a source applied at each control loop tick."""
+    last_applied = None
+    while True:
+        await backend.tick_notifier.wait_async()
+        applied = backend.command_arbiter.get_last_applied(source)
+        if applied is None or applied == last_applied:
+            continue
+        last_applied = applied
+        submitted_at, applied_at = applied
+
+        # The applied target is the latest received before its submission
+        nb_received = 0
+        latest = None
+        while received and received[0][0] <= submitted_at:
+            latest = received.popleft()
+            nb_received += 1
+        if latest is None:
+            continue
+
+        received_at, sample = latest
+        await websocket.send_bytes(
+            encode_target_ack(
+                TargetAck(
+                    seq=sample.seq,
+                    timestamp=sample.timestamp,
+                    latency=applied_at - received_at,
+                    nb_coalesced=nb_received - 1,
+                )
+            )
+        )
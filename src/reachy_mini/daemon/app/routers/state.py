@@ -2,21 +2,47 @@
 
 This exposes:
 - basic get routes to retrieve most common fields
-- full state and streaming state updates
+- full state and streaming state updates, as JSON or as binary STATE messages
+  (`format=binary`, see reachy_mini.io.wire)
+- state recordings made by the control loop, downloaded as npz files
 """
 
 import asyncio
-from datetime import datetime, timezone
-from typing import Any
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel
+
+from reachy_mini.io.wire import BINARY_MEDIA_TYPE, WireFormat
 
 from ....daemon.backend.abstract import Backend
 from ..dependencies import get_backend, ws_get_backend
 from ..models import AnyPose, FullState, as_any_pose
+from ..state_broadcaster import (
+    StateBroadcaster,
+    StateFields,
+    encode_full_state,
+    read_full_state,
+)
 
 router = APIRouter(prefix="/state")
 
+# Shared by all the /ws/full WebSockets
+state_broadcaster = StateBroadcaster()
+
+
+class StateRecordingId(BaseModel):
+    """Id of a state recording."""
+
+    recording_id: str
+
 
 @router.get("/present_head_pose")
 async def get_head_pose(
@@ -54,8 +80,13 @@ async def get_antenna_joint_positions(
     return (pos[0], pos[1])
 
 
-@router.get("/full")
+@router.get(
+    "/full",
+    response_model=FullState,
+    responses={200: {"content": {BINARY_MEDIA_TYPE: {}}}},
+)
 async def get_full_state(
+    request: Request,
     with_control_mode: bool = True,
     with_head_pose: bool = True,
     with_target_head_pose: bool = False,
@@ -67,42 +98,41 @@ async def get_full_state(
     with_target_antenna_positions: bool = False,
     with_passive_joints: bool = False,
     use_pose_matrix: bool = False,
+    format: WireFormat | None = None,
     backend: Backend = Depends(get_backend),
-) -> FullState:
-    """Get the full robot state, with optional fields."""
-    result: dict[str, Any] = {}
-
-    if with_control_mode:
-        result["control_mode"] = backend.get_motor_control_mode().value
-
-    if with_head_pose:
-        pose = backend.get_present_head_pose()
-        result["head_pose"] = as_any_pose(pose, use_pose_matrix)
-    if with_target_head_pose:
-        target_pose = backend.target_head_pose
-        assert target_pose is not None
-        result["target_head_pose"] = as_any_pose(target_pose, use_pose_matrix)
-    if with_head_joints:
-        result["head_joints"] = backend.get_present_head_joint_positions()
-    if with_target_head_joints:
-        result["target_head_joints"] = backend.target_head_joint_positions
-    if with_body_yaw:
-        result["body_yaw"] = backend.get_present_body_yaw()
-    if with_target_body_yaw:
-        result["target_body_yaw"] = backend.target_body_yaw
-    if with_antenna_positions:
-        result["antennas_position"] = backend.get_present_antenna_joint_positions()
-    if with_target_antenna_positions:
-        result["target_antennas_position"] = backend.target_antenna_joint_positions
-    if with_passive_joints:
-        joints = backend.get_present_passive_joint_positions()
-        if joints is not None:
-            result["passive_joints"] = list(joints.values())
-        else:
-            result["passive_joints"] = None
-
-    result["timestamp"] = datetime.now(timezone.utc)
-    return FullState.model_validate(result)
+) -> FullState | Response:
+    """Get the full robot state, with optional fields.
+
+    With `format=binary`, or an `Accept: application/octet-stream` header, the state
+    is returned as a binary STATE message (see reachy_mini.io.wire), which always
+    holds the same fields: present and target joints, head pose matrix and control
+    mode. The with_* parameters are then ignored.
+    """
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = WireFormat.BINARY if BINARY_MEDIA_TYPE in accept else WireFormat.JSON
+    if format == WireFormat.BINARY:
+        return Response(
+            encode_full_state(backend, StateFields(), WireFormat.BINARY),
+            media_type=BINARY_MEDIA_TYPE,
+        )
+
+    return read_full_state(
+        backend,
+        StateFields(
+            with_control_mode=with_control_mode,
+            with_head_pose=with_head_pose,
+            with_target_head_pose=with_target_head_pose,
+            with_head_joints=with_head_joints,
+            with_target_head_joints=with_target_head_joints,
+            with_body_yaw=with_body_yaw,
+            with_target_body_yaw=with_target_body_yaw,
+            with_antenna_positions=with_antenna_positions,
+            with_target_antenna_positions=with_target_antenna_positions,
+            with_passive_joints=with_passive_joints,
+            use_pose_matrix=use_pose_matrix,
+        ),
+    )
 
 
 @router.websocket("/ws/full")
@@ -119,28 +149,75 @@ async def ws_full_state(
     with_target_antenna_positions: bool = False,
     with_passive_joints: bool = False,
     use_pose_matrix: bool = False,
+    format: WireFormat = WireFormat.JSON,
     backend: Backend = Depends(ws_get_backend),
 ) -> None:
-    """WebSocket endpoint to stream the full state of the robot."""
+    """WebSocket endpoint to stream the full state of the robot.
+
+    All the WebSockets share the same broadcaster: the state is encoded once per
+    distinct set of fields, at most at the control loop frequency. A client too slow
+    to keep up skips frames.
+
+    With `format=binary`, binary frames holding STATE messages (see
+    reachy_mini.io.wire) are sent instead of JSON text frames.
+    """
     await websocket.accept()
-    period = 1.0 / frequency
+    fields = StateFields(
+        with_head_pose=with_head_pose,
+        with_target_head_pose=with_target_head_pose,
+        with_head_joints=with_head_joints,
+        with_target_head_joints=with_target_head_joints,
+        with_body_yaw=with_body_yaw,
+        with_target_body_yaw=with_target_body_yaw,
+        with_antenna_positions=with_antenna_positions,
+        with_target_antenna_positions=with_target_antenna_positions,
+        with_passive_joints=with_passive_joints,
+        use_pose_matrix=use_pose_matrix,
+    )
 
     try:
-        while True:
-            full_state = await get_full_state(
-                with_head_pose=with_head_pose,
-                with_target_head_pose=with_target_head_pose,
-                with_head_joints=with_head_joints,
-                with_target_head_joints=with_target_head_joints,
-                with_body_yaw=with_body_yaw,
-                with_target_body_yaw=with_target_body_yaw,
-                with_antenna_positions=with_antenna_positions,
-                with_target_antenna_positions=with_target_antenna_positions,
-                with_passive_joints=with_passive_joints,
-                use_pose_matrix=use_pose_matrix,
-                backend=backend,
-            )
-            await websocket.send_text(full_state.model_dump_json())
-            await asyncio.sleep(period)
+        async with state_broadcaster.subscribe(
+            backend, fields, frequency, format
+        ) as frames:
+            while True:
+                frame = await frames.get()
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
     except WebSocketDisconnect:
         pass
+
+
+@router.post("/recording/start")
+async def start_state_recording(
+    backend: Backend = Depends(get_backend),
+) -> StateRecordingId:
+    """Start recording the present and target state at each control loop tick."""
+    # Stops the current recording first, which writes its file
+    recording_id = await asyncio.to_thread(backend.start_state_recording)
+    return StateRecordingId(recording_id=recording_id)
+
+
+@router.post("/recording/stop")
+async def stop_state_recording(
+    backend: Backend = Depends(get_backend),
+) -> StateRecordingId:
+    """Stop the state recording and write its file."""
+    recording_id = await asyncio.to_thread(backend.stop_state_recording)
+    if recording_id is None:
+        raise HTTPException(status_code=404, detail="No state recording in progress.")
+    return StateRecordingId(recording_id=recording_id)
+
+
+@router.get("/recording/{recording_id}")
+async def get_state_recording(
+    recording_id: str,
+    backend: Backend = Depends(get_backend),
+) -> FileResponse:
+    """Download a state recording as a npz file (one array per field)."""
+    try:
+        path = backend.get_state_recording_path(recording_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
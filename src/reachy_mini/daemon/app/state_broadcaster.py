@@ -0,0 +1,233 @@
+"""Shared broadcaster of the state streamed over the WebSockets.
+
+Each `/state/ws/full` WebSocket used to read and serialize the state on its own.
+Instead, the WebSockets subscribe to a single `StateBroadcaster` task which waits
+for each control loop tick (see backend/tick.py) and then:
+
+- reads and encodes the state once for each distinct set of fields requested by
+  the subscribers, and only for the streams whose rate is due. Rates are
+  decimations of the control loop rate, so a stream never skips nor repeats a tick,
+- puts the same encoded frame in the queue of each subscriber of the stream.
+
+Frames are JSON encoded `FullState` (text), or binary STATE messages (bytes, see
+io/wire.py) which always hold the same fields.
+
+The queue of a subscriber only holds the latest frame: a client too slow to keep
+up drops the older frames, without slowing down the others.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+import numpy as np
+
+from reachy_mini.io.wire import RobotStateSample, WireFormat, encode_state
+
+from ..backend.abstract import Backend
+from .models import FullState, as_any_pose
+
+# Time waited for a tick before checking the backend again (in seconds)
+TICK_TIMEOUT = 1.0
+
+
+@dataclass(frozen=True)
+class StateFields:
+    """Fields of the full state to read, and how to represent the poses."""
+
+    with_control_mode: bool = True
+    with_head_pose: bool = True
+    with_target_head_pose: bool = False
+    with_head_joints: bool = False
+    with_target_head_joints: bool = False
+    with_body_yaw: bool = True
+    with_target_body_yaw: bool = False
+    with_antenna_positions: bool = True
+    with_target_antenna_positions: bool = False
+    with_passive_joints: bool = False
+    use_pose_matrix: bool = False
+
+
+def read_full_state(backend: Backend, fields: StateFields) -> FullState:
+    """Read the full robot state, with the requested fields only."""
+    result: dict[str, Any] = {}
+
+    if fields.with_control_mode:
+        result["control_mode"] = backend.get_motor_control_mode().value
+
+    if fields.with_head_pose:
+        pose = backend.get_present_head_pose()
+        result["head_pose"] = as_any_pose(pose, fields.use_pose_matrix)
+    if fields.with_target_head_pose:
+        target_pose = backend.target_head_pose
+        assert target_pose is not None
+        result["target_head_pose"] = as_any_pose(target_pose, fields.use_pose_matrix)
+    if fields.with_head_joints:
+        result["head_joints"] = backend.get_present_head_joint_positions()
+    if fields.with_target_head_joints:
+        result["target_head_joints"] = backend.target_head_joint_positions
+    if fields.with_body_yaw:
+        result["body_yaw"] = backend.get_present_body_yaw()
+    if fields.with_target_body_yaw:
+        result["target_body_yaw"] = backend.target_body_yaw
+    if fields.with_antenna_positions:
+        result["antennas_position"] = backend.get_present_antenna_joint_positions()
+    if fields.with_target_antenna_positions:
+        result["target_antennas_position"] = backend.target_antenna_joint_positions
+    if fields.with_passive_joints:
+        joints = backend.get_present_passive_joint_positions()
+        if joints is not None:
+            result["passive_joints"] = list(joints.values())
+        else:
+            result["passive_joints"] = None
+
+    result["timestamp"] = datetime.now(timezone.utc)
+    return FullState.model_validate(result)
+
+
+def read_state_sample(backend: Backend) -> RobotStateSample:
+    """Read the robot state as a sample of the binary state messages."""
+    return RobotStateSample(
+        seq=backend.tick_notifier.tick,
+        timestamp=time.monotonic(),
+        control_mode=backend.get_motor_control_mode().value,
+        head_joint_positions=np.asarray(backend.get_present_head_joint_positions()),
+        antennas_joint_positions=np.asarray(
+            backend.get_present_antenna_joint_positions()
+        ),
+        target_head_joint_positions=backend.target_head_joint_positions,
+        target_antennas_joint_positions=backend.target_antenna_joint_positions,
+        head_pose=backend.get_present_head_pose(),
+    )
+
+
+def encode_full_state(
+    backend: Backend, fields: StateFields, wire_format: WireFormat
+) -> str | bytes:
+    """Read and encode the state, as JSON text or as a binary STATE message."""
+    if wire_format == WireFormat.BINARY:
+        return encode_state(read_state_sample(backend), WireFormat.BINARY)
+    return read_full_state(backend, fields).model_dump_json()
+
+
+@dataclass
+class _Stream:
+    """Subscribers sharing the same fields and rate."""
+
+    decimation: int  # Number of ticks between two frames
+    last_tick: int | None
+    queues: set["asyncio.Queue[str | bytes]"]
+
+
+class StateBroadcaster:
+    """Read and encode the state once per tick, and fan it out to the subscribers."""
+
+    def __init__(self) -> None:
+        """Initialize the broadcaster."""
+        self.logger = logging.getLogger(__name__)
+
+        self.nb_encoded = 0  # Frames encoded, once per tick and field set
+        self.nb_sent = 0  # Frames put in the queues of the subscribers
+        self.nb_dropped = 0  # Frames replaced before their subscriber got them
+
+        self._backend: Backend | None = None
+        self._streams: dict[tuple[StateFields, WireFormat, int], _Stream] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        backend: Backend,
+        fields: StateFields,
+        frequency: float,
+        wire_format: WireFormat = WireFormat.JSON,
+    ) -> AsyncIterator["asyncio.Queue[str | bytes]"]:
+        """Subscribe to the state, encoded with the given format, at the given frequency.
+
+        The frequency is rounded to a decimation of the control loop frequency, which
+        it cannot exceed. Yields the queue in which the latest frame is put. The
+        broadcasting task runs as long as there is a subscriber.
+        """
+        if wire_format == WireFormat.BINARY:
+            # Binary messages hold all the fields: share them between subscribers
+            fields = StateFields()
+        key = (fields, wire_format, backend.tick_notifier.decimation(frequency))
+        queue: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=1)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream(key[2], None, set())
+        stream.queues.add(queue)
+
+        # The state of the last backend started is broadcast
+        self._backend = backend
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            yield queue
+        finally:
+            stream.queues.discard(queue)
+            if not stream.queues:
+                self._streams.pop(key, None)
+            if not self._streams and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the counters of subscribers, encoded, sent and dropped frames."""
+        return {
+            "nb_subscribers": sum(len(s.queues) for s in self._streams.values()),
+            "nb_encoded": self.nb_encoded,
+            "nb_sent": self.nb_sent,
+            "nb_dropped": self.nb_dropped,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            backend = self._backend
+            if backend is None:
+                return
+            try:
+                tick = await asyncio.wait_for(
+                    backend.tick_notifier.wait_async(), TICK_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                # Backend stopped, or replaced by a new one
+                continue
+            try:
+                self._broadcast(backend, tick)
+            except Exception as e:
+                self.logger.error(f"Error while broadcasting the state: {e}")
+
+    def _broadcast(self, backend: Backend, tick: int) -> None:
+        """Encode and fan out the state of the streams whose rate is due."""
+        if not backend.ready.is_set():
+            return
+
+        # Several rates may share the same fields: encode them once
+        frames: dict[tuple[StateFields, WireFormat], str | bytes] = {}
+        for (fields, wire_format, _), stream in list(self._streams.items()):
+            if (
+                stream.last_tick is not None
+                and 0 <= tick - stream.last_tick < stream.decimation
+            ):
+                continue
+            stream.last_tick = tick
+
+            frame = frames.get((fields, wire_format))
+            if frame is None:
+                frame = frames[(fields, wire_format)] = encode_full_state(
+                    backend, fields, wire_format
+                )
+                self.nb_encoded += 1
+
+            for queue in stream.queues:
+                if queue.full():
+                    queue.get_nowait()
+                    self.nb_dropped += 1
+                queue.put_nowait(frame)
+                self.nb_sent += 1
@@ -9,15 +9,18 @@ each type of backend.
 """
 
 import asyncio
+import functools
 import json
 import logging
+import operator
 import threading
 import time
 import typing
+import weakref
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
-from typing import Annotated, Any, Dict, Optional
+from typing import Annotated, Any, Callable, Dict, Optional
 
 import numpy as np
 import zenoh
@@ -28,14 +31,42 @@ if typing.TYPE_CHECKING:
     from reachy_mini.daemon.backend.mujoco.backend import MujocoBackendStatus
     from reachy_mini.daemon.backend.robot.backend import RobotBackendStatus
     from reachy_mini.kinematics import AnyKinematics
+from reachy_mini.daemon.backend.arbiter import CommandArbiter
+from reachy_mini.daemon.backend.ik_worker import IKWorker
+from reachy_mini.daemon.backend.kinematics_cache import (
+    QuantizedCache,
+    fk_key,
+    ik_key,
+)
+from reachy_mini.daemon.backend.motion_executor import (
+    MotionExecutor,
+    MotionState,
+    PresentMotionEstimator,
+)
+from reachy_mini.daemon.backend.recording import Recorder, StateRecorder
+from reachy_mini.daemon.backend.tick import TickNotifier
+from reachy_mini.io.wire import (
+    CONTROL_MODES,
+    RobotStateSample,
+    WireFormat,
+    encode_state,
+)
 from reachy_mini.media.audio_sounddevice import SoundDeviceAudio
-from reachy_mini.motion.goto import GotoMove
-from reachy_mini.motion.move import Move
+from reachy_mini.motion.compiled_move import CompiledMove, compiled_moves
+from reachy_mini.motion.goto import BlendedGotoMove, GotoMove, JointGotoMove
+from reachy_mini.motion.move import JointMove, Move
+from reachy_mini.motion.recorded_move import RecordedMove
 from reachy_mini.utils.constants import MODELS_ROOT_PATH, URDF_ROOT_PATH
 from reachy_mini.utils.interpolation import (
     InterpolationTechnique,
     distance_between_poses,
-    time_trajectory,
+)
+from reachy_mini.utils.metrics import metrics
+from reachy_mini.utils.stats import TimingStats
+
+# Durations of the control loop updates, exported to /api/metrics (see utils/metrics.py)
+_update_duration = metrics.histogram(
+    "control_loop_update_seconds", "Duration of the control loop updates."
 )
 
 
@@ -66,6 +97,9 @@ class Backend:
         self.should_stop = threading.Event()
         self.ready = threading.Event()
 
+        # Durations of the sections of the control loop (update, ik, fk, ...)
+        self.timings = TimingStats()
+
         self.check_collision = (
             check_collision  # Flag to enable/disable collision checking
         )
@@ -85,24 +119,21 @@ class Backend:
                 "Gravity compensation is only available with Placo kinematics"
             )
 
-        if self.kinematics_engine == "Placo":
-            from reachy_mini.kinematics import PlacoKinematics
-
-            self.head_kinematics: AnyKinematics = PlacoKinematics(
-                URDF_ROOT_PATH, check_collision=self.check_collision
-            )
-        elif self.kinematics_engine == "NN":
-            from reachy_mini.kinematics import NNKinematics
+        self.head_kinematics: AnyKinematics = self._create_head_kinematics()
 
-            self.head_kinematics = NNKinematics(MODELS_ROOT_PATH)
-        elif self.kinematics_engine == "AnalyticalKinematics":
-            from reachy_mini.kinematics import AnalyticalKinematics
-
-            self.head_kinematics = AnalyticalKinematics()
-        else:
-            raise ValueError(
-                f"Unknown kinematics engine: {self.kinematics_engine}. Use 'Placo', 'NN' or 'AnalyticalKinematics'."
-            )
+        # The IK of the control loop is solved in a background thread, on its own
+        # kinematics instance (see ik_worker.py)
+        self.ik_worker = IKWorker(
+            self._create_head_kinematics(), solve=self._solve_ik, logger=self.logger
+        )
+        # Incremented when the head joints are set directly, to drop pending IK solutions
+        self._ik_epoch = 0
+        # Last (pose, body yaw, epoch) submitted to the IK worker, not submitted again
+        self._last_ik_submission: (
+            tuple[Annotated[NDArray[np.float64], (4, 4)], float, int] | None
+        ) = None
+        # Solves the IK of whole moves when compiling them (see play_move)
+        self._compile_kinematics: AnyKinematics | None = None
 
         self.current_head_pose: Annotated[NDArray[np.float64], (4, 4)] | None = (
             None  # 4x4 pose matrix
@@ -129,10 +160,10 @@ class Backend:
 
         self.joint_positions_publisher: zenoh.Publisher | None = None
         self.pose_publisher: zenoh.Publisher | None = None
-        self.recording_publisher: zenoh.Publisher | None = None
+        self.state_publisher: zenoh.Publisher | None = None
+        self.state_wire_format = WireFormat.BINARY
+        self._publish_seq = 0  # Sequence number of the published state samples
         self.error: str | None = None  # To store any error that occurs during execution
-        self.is_recording = False  # Flag to indicate if recording is active
-        self.recorded_data: list[dict[str, Any]] = []  # List to store recorded data
 
         # variables to store the last computed head joint positions and pose
         self._last_target_body_yaw: float | None = (
@@ -158,23 +189,118 @@ class Backend:
             "rad": 2e-3,  # rads
             "m": 0.5e-3,  # m
         }
+        # Kinematics results cached with the above tolerances (see kinematics_cache.py)
+        self.fk_cache: QuantizedCache[NDArray[np.float64]] = QuantizedCache()
+        self.ik_cache: QuantizedCache[NDArray[np.float64]] = QuantizedCache()
+
+        # Plays the gotos and moves at each control loop tick (see motion_executor.py)
+        self.motion_executor = MotionExecutor(
+            self.set_target, self._set_joint_target, self._set_end_target
+        )
+        # Velocity of the measured state, gotos start with it when no move is active
+        self.present_motion = PresentMotionEstimator()
+
+        # Signaled at the end of each control loop tick, for the state streams (see tick.py)
+        self.tick_notifier = TickNotifier()
 
-        # Recording lock to guard buffer swaps and appends
-        self._rec_lock = threading.Lock()
+        # Targets streamed by the clients, applied once per control loop tick (see arbiter.py)
+        self.command_arbiter = CommandArbiter()
+
+        # Streams the recorded targets to disk and to the clients (see recording.py)
+        self.recorder = Recorder(logger=self.logger)
+        # Records the measured state at each control loop tick (see recording.py)
+        self.state_recorder = StateRecorder(logger=self.logger)
 
         self.audio: Optional[SoundDeviceAudio] = None
         if self.use_audio:
             self.audio = SoundDeviceAudio(log_level=log_level)
 
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        """Export the counters of the control loop, read at scrape time only.
+
+        The metrics of the last backend created are exported. They only hold a weak
+        reference to it, so that a stopped backend can be garbage collected.
+        """
+        backend = weakref.ref(self)
+
+        def read(path: str) -> Callable[[], float | None]:
+            return functools.partial(_read_backend_attribute, backend, path)
+
+        metrics.counter(
+            "control_loop_ticks_total", "Control loop ticks since the backend started."
+        ).set_function(read("tick_notifier.tick"))
+
+        # The scheduler is created by the subclasses, possibly when started
+        scheduler = metrics.counter(
+            "control_loop_scheduler_events_total",
+            "Ticks of the control loop which overran or were skipped.",
+            ("event",),
+        )
+        scheduler.labels(event="overruns").set_function(read("scheduler.nb_overruns"))
+        scheduler.labels(event="skipped_ticks").set_function(
+            read("scheduler.nb_skipped_ticks")
+        )
+
+        caches = metrics.counter(
+            "kinematics_cache_lookups_total",
+            "Hits and misses of the FK and IK caches.",
+            ("cache", "result"),
+        )
+        for cache in ("fk", "ik"):
+            caches.labels(cache=cache, result="hit").set_function(
+                read(f"{cache}_cache.hits")
+            )
+            caches.labels(cache=cache, result="miss").set_function(
+                read(f"{cache}_cache.misses")
+            )
+
+        targets = metrics.counter(
+            "command_arbiter_targets_total",
+            "Client targets applied, coalesced or dropped by the command arbiter.",
+            ("result",),
+        )
+        for result in ("applied", "coalesced", "dropped"):
+            targets.labels(result=result).set_function(
+                read(f"command_arbiter.nb_{result}")
+            )
+
+    def observe_update(self, update_duration: float) -> None:
+        """Add the duration of a control loop update to the metrics."""
+        _update_duration.observe(update_duration)
+
+    def _create_head_kinematics(self) -> "AnyKinematics":
+        """Create an instance of the selected kinematics engine."""
+        if self.kinematics_engine == "Placo":
+            from reachy_mini.kinematics import PlacoKinematics
+
+            return PlacoKinematics(URDF_ROOT_PATH, check_collision=self.check_collision)
+        elif self.kinematics_engine == "NN":
+            from reachy_mini.kinematics import NNKinematics
+
+            return NNKinematics(MODELS_ROOT_PATH)
+        elif self.kinematics_engine == "AnalyticalKinematics":
+            from reachy_mini.kinematics import AnalyticalKinematics
+
+            return AnalyticalKinematics()
+        else:
+            raise ValueError(
+                f"Unknown kinematics engine: {self.kinematics_engine}. Use 'Placo', 'NN' or 'AnalyticalKinematics'."
+            )
+
     # Life cycle methods
     def wrapped_run(self) -> None:
         """Run the backend in a try-except block to store errors."""
+        self.ik_worker.start()
         try:
             self.run()
         except Exception as e:
             self.error = str(e)
             self.close()
             raise e
+        finally:
+            self.ik_worker.stop()
 
     def run(self) -> None:
         """Run the backend.
@@ -203,7 +329,7 @@ class Backend:
 
     # Present/Target joint positions
     def set_joint_positions_publisher(self, publisher: zenoh.Publisher) -> None:
-        """Set the publisher for joint positions.
+        """Set the publisher for joint positions (JSON, for older clients).
 
         Args:
             publisher: A publisher object that will be used to publish joint positions.
@@ -212,7 +338,7 @@ class Backend:
         self.joint_positions_publisher = publisher
 
     def set_pose_publisher(self, publisher: zenoh.Publisher) -> None:
-        """Set the publisher for head pose.
+        """Set the publisher for head pose (JSON, for older clients).
 
         Args:
             publisher: A publisher object that will be used to publish head pose.
@@ -220,6 +346,90 @@ class Backend:
         """
         self.pose_publisher = publisher
 
+    def set_state_publisher(
+        self,
+        publisher: zenoh.Publisher,
+        wire_format: WireFormat = WireFormat.BINARY,
+    ) -> None:
+        """Set the publisher for the combined robot state.
+
+        Args:
+            publisher: A publisher object that will be used to publish one state sample per control loop tick.
+            wire_format (WireFormat): Encoding used for the published samples.
+
+        """
+        self.state_publisher = publisher
+        self.state_wire_format = wire_format
+
+    def publish_present_state(
+        self,
+        head_joint_positions: Annotated[NDArray[np.float64], (7,)] | list[float],
+        antennas_joint_positions: Annotated[NDArray[np.float64], (2,)] | list[float],
+        head_pose: Annotated[NDArray[np.float64], (4, 4)],
+    ) -> None:
+        """Publish the present state of the robot.
+
+        Called once per control loop tick by the subclasses, after the present state has been read.
+        A single atomic sample (present and target joints, head pose and control mode) is published
+        on the state topic, with the wire format configured with its publisher. The JSON joint_positions
+        and head_pose topics are kept for older clients and are only published if their publishers are set.
+        """
+        self._publish_seq += 1
+
+        if self.state_publisher is not None:
+            sample = RobotStateSample(
+                seq=self._publish_seq,
+                timestamp=time.monotonic(),
+                control_mode=self.get_motor_control_mode().value,
+                head_joint_positions=np.asarray(head_joint_positions),
+                antennas_joint_positions=np.asarray(antennas_joint_positions),
+                target_head_joint_positions=self.target_head_joint_positions,
+                target_antennas_joint_positions=self.target_antenna_joint_positions,
+                head_pose=head_pose,
+            )
+            self.state_publisher.put(encode_state(sample, self.state_wire_format))
+
+        if self.joint_positions_publisher is not None:
+            self.joint_positions_publisher.put(
+                json.dumps(
+                    {
+                        "head_joint_positions": np.asarray(
+                            head_joint_positions
+                        ).tolist(),
+                        "antennas_joint_positions": np.asarray(
+                            antennas_joint_positions
+                        ).tolist(),
+                    }
+                )
+            )
+        if self.pose_publisher is not None:
+            self.pose_publisher.put(json.dumps({"head_pose": head_pose.tolist()}))
+
+    def record_present_state(self, update_duration: float) -> None:
+        """Append the present and target state to the current state recording.
+
+        Called once per control loop tick by the subclasses, after the update. Does
+        nothing if no state recording is in progress.
+
+        Args:
+            update_duration (float): Duration of the control loop update (in seconds).
+
+        """
+        if not self.state_recorder.is_recording:
+            return
+        self.state_recorder.append(
+            update_duration=update_duration,
+            control_mode=CONTROL_MODES.index(self.get_motor_control_mode().value),
+            head_joint_positions=self.current_head_joint_positions,
+            antennas_joint_positions=self.current_antenna_joint_positions,
+            head_pose=self.current_head_pose,
+            target_head_joint_positions=self.target_head_joint_positions,
+            target_antennas_joint_positions=self.target_antenna_joint_positions,
+            target_head_pose=self.target_head_pose,
+            target_body_yaw=self.target_body_yaw,
+            target_head_joint_current=self.target_head_joint_current,
+        )
+
     def update_target_head_joints_from_ik(
         self,
         pose: Annotated[NDArray[np.float64], (4, 4)] | None = None,
@@ -243,7 +453,7 @@ class Backend:
             body_yaw = self.target_body_yaw if self.target_body_yaw is not None else 0.0
 
         # Compute the inverse kinematics to get the head joint positions
-        joints = self.head_kinematics.ik(pose, body_yaw=body_yaw)
+        joints = self._solve_ik(self.head_kinematics, pose, body_yaw)
         if joints is None or np.any(np.isnan(joints)):
             raise ValueError("WARNING: Collision detected or head pose not achievable!")
 
@@ -253,6 +463,96 @@ class Backend:
 
         self.target_head_joint_positions = joints
 
+    def _solve_ik(
+        self,
+        kinematics: "AnyKinematics",
+        pose: Annotated[NDArray[np.float64], (4, 4)],
+        body_yaw: float,
+    ) -> Annotated[NDArray[np.float64], (7,)] | None:
+        """Solve the IK with the given kinematics instance, going through the IK cache."""
+        key = ik_key(
+            pose, body_yaw, self._ik_kin_tolerance, kinematics.automatic_body_yaw
+        )
+        joints = self.ik_cache.get(key)
+        if joints is not None:
+            return joints
+
+        t0 = time.perf_counter()
+        joints = kinematics.ik(pose, body_yaw=body_yaw)
+        self.timings.record("ik", time.perf_counter() - t0)
+
+        if joints is not None and not np.any(np.isnan(joints)):
+            self.ik_cache.put(key, joints)
+        return joints
+
+    def get_kinematics_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Get the hit and miss counters of the FK and IK caches."""
+        return {
+            "fk_cache": self.fk_cache.get_stats(),
+            "ik_cache": self.ik_cache.get_stats(),
+        }
+
+    def apply_arbitrated_target(self) -> None:
+        """Apply the target of the client holding the lease, then the active move.
+
+        Called once per control loop tick by the subclasses, before the IK is updated.
+        While a goto or a task-space move is played, its targets take precedence over
+        the targets streamed by the clients. The velocity of the measured state is
+        updated at the same time.
+        """
+        self.present_motion.update(
+            self.current_head_pose,
+            self.current_head_joint_positions,
+            self.current_antenna_joint_positions,
+        )
+        self.command_arbiter.apply(self.set_target)
+        self.motion_executor.step()
+
+    def get_command_arbiter_stats(self) -> dict[str, dict[str, Any]]:
+        """Get the counters of applied, coalesced and dropped client targets."""
+        return {"command_arbiter": self.command_arbiter.get_stats()}
+
+    def update_target_head_joints_from_ik_worker(self) -> None:
+        """Update the target head joint positions from the IK worker, without blocking.
+
+        Meant to be called at each tick of the control loop: submits the current
+        target to the IK worker if it changed, and applies the latest solution of
+        the worker if a new one is available. Solutions of targets submitted before
+        the head joints were set directly are dropped.
+
+        Raises:
+            ValueError: If the latest solved pose is not reachable.
+
+        """
+        if self.ik_required:
+            pose = (
+                self.target_head_pose
+                if self.target_head_pose is not None
+                else np.eye(4)
+            )
+            body_yaw = self.target_body_yaw if self.target_body_yaw is not None else 0.0
+            last = self._last_ik_submission
+            if (
+                last is None
+                or last[2] != self._ik_epoch
+                or last[1] != body_yaw
+                or not np.array_equal(last[0], pose)
+            ):
+                self.ik_worker.submit(pose, body_yaw, self._ik_epoch)
+                # Copied, the target may be modified in place
+                self._last_ik_submission = (pose.copy(), body_yaw, self._ik_epoch)
+
+        result = self.ik_worker.poll()
+        if result is None or result.request.epoch != self._ik_epoch:
+            return
+
+        if result.joints is None:
+            raise ValueError("WARNING: Collision detected or head pose not achievable!")
+
+        self._last_target_head_pose = result.request.pose
+        self._last_target_body_yaw = result.request.body_yaw
+        self.target_head_joint_positions = result.joints
+
     def set_target_head_pose(
         self,
         pose: Annotated[NDArray[np.float64], (4, 4)],
@@ -289,6 +589,7 @@ class Backend:
         """
         self.target_head_joint_positions = positions
         self.ik_required = False
+        self._ik_epoch += 1
 
     def set_target(
         self,
@@ -331,12 +632,14 @@ class Backend:
         """
         self.target_head_joint_current = current
         self.ik_required = False
+        self._ik_epoch += 1
 
     async def play_move(
         self,
         move: Move,
         play_frequency: float = 100.0,
         initial_goto_duration: float = 0.0,
+        on_started: Callable[[], None] | None = None,
     ) -> None:
         """Asynchronously play a Move.
 
@@ -344,8 +647,34 @@ class Backend:
             move (Move): The Move object to be played.
             play_frequency (float): The frequency at which to evaluate the move (in Hz).
             initial_goto_duration (float): Duration for an initial goto to the move's starting position. If 0.0, no initial goto is performed.
+            on_started (Callable[[], None] | None): Called once the move is ready, when the initial goto (or the move itself) starts.
+
+        Recorded moves are first compiled to joint space (see motion/compiled_move.py),
+        then played without solving any IK. Other moves are played in task space. Both
+        are played by the motion executor, at the control loop rate, preempting the
+        active goto or move. The compilation is done before the initial goto, so that
+        the move follows it without a pause.
 
         """
+        compiled = None
+        if isinstance(move, RecordedMove):
+            try:
+                compiled = await asyncio.to_thread(
+                    compiled_moves.get_or_compile,
+                    move.fingerprint,
+                    move,
+                    self._get_compile_kinematics(),
+                    self.kinematics_engine,
+                    play_frequency,
+                )
+            except ValueError as e:
+                self.logger.warning(
+                    f"Could not compile the move ({e}), playing it in task space."
+                )
+
+        if on_started is not None:
+            on_started()
+
         if initial_goto_duration > 0.0:
             start_head_pose, start_antennas_positions, start_body_yaw = move.evaluate(
                 0.0
@@ -356,25 +685,66 @@ class Backend:
                 duration=initial_goto_duration,
                 body_yaw=start_body_yaw,
             )
-        sleep_period = 1.0 / play_frequency
-
-        t0 = time.time()
-        while time.time() - t0 < move.duration:
-            t = time.time() - t0
-
-            head, antennas, body_yaw = move.evaluate(t)
-            if head is not None:
-                self.set_target_head_pose(head)
-            if body_yaw is not None:
-                self.set_target_body_yaw(body_yaw)
-            if antennas is not None:
-                self.set_target_antenna_joint_positions(antennas)
-
-            elapsed = time.time() - t0 - t
-            if elapsed < sleep_period:
-                await asyncio.sleep(sleep_period - elapsed)
-            else:
-                await asyncio.sleep(0.001)
+
+        if compiled is not None:
+            await self.play_compiled_move(compiled)
+        else:
+            await self._play_on_executor(move)
+
+    async def _play_on_executor(
+        self, build: Callable[[MotionState | None], Move] | Move | JointMove
+    ) -> None:
+        """Play a move with the motion executor, preempting the active one.
+
+        Returns when the move ends or is preempted. If the calling task is
+        cancelled, the move is stopped.
+        """
+        await asyncio.wrap_future(self.motion_executor.play(build))
+
+    async def play_compiled_move(self, compiled: CompiledMove) -> None:
+        """Asynchronously play a compiled move, streaming its joint positions.
+
+        The move is played by the motion executor, preempting the active goto or move.
+        No IK is solved during the playback. At the end, the task-space targets are
+        set to the final pose of the move, so that the next targets start from it.
+
+        Args:
+            compiled (CompiledMove): The compiled move to play.
+
+        """
+        await self._play_on_executor(compiled)
+
+    def _set_joint_target(
+        self,
+        head_joints: Annotated[NDArray[np.float64], (7,)] | None,
+        antennas: Annotated[NDArray[np.float64], (2,)] | None,
+    ) -> None:
+        """Set the joint targets of the joint move played by the motion executor."""
+        if head_joints is not None:
+            self.set_target_head_joint_positions(head_joints)
+        if antennas is not None:
+            self.set_target_antenna_joint_positions(antennas)
+
+    def _set_end_target(
+        self,
+        head: Annotated[NDArray[np.float64], (4, 4)] | None,
+        body_yaw: float | None,
+    ) -> None:
+        """Set the task-space target reached by a joint move, without solving its IK."""
+        if head is not None:
+            self.target_head_pose = head
+        if body_yaw is not None:
+            self.target_body_yaw = body_yaw
+
+    def _get_compile_kinematics(self) -> "AnyKinematics":
+        """Get the kinematics instance dedicated to move compilation, created on first use."""
+        if self._compile_kinematics is None:
+            kinematics = self._create_head_kinematics()
+            kinematics.set_automatic_body_yaw(
+                automatic_body_yaw=self.head_kinematics.automatic_body_yaw
+            )
+            self._compile_kinematics = kinematics
+        return self._compile_kinematics
 
     async def goto_target(
         self,
@@ -387,6 +757,11 @@ class Backend:
     ) -> None:
         """Asynchronously go to a target head pose and/or antennas position using task space interpolation, in "duration" seconds.
 
+        The goto preempts the active goto or move of the motion executor. Minimum jerk
+        gotos blend into it, starting with its position, velocity and acceleration.
+        When no move is active, they start with the measured velocity. A goto with no
+        duration stops the active move and sets the target immediately.
+
         Args:
             head (np.ndarray | None): 4x4 pose matrix representing the target head pose.
             antennas (np.ndarray | list[float] | None): 1D array with two elements representing the angles of the antennas in radians.
@@ -394,22 +769,60 @@ class Backend:
             method (str): Interpolation method to use ("linear", "minjerk", "ease", "cartoon"). Default is "minjerk".
             body_yaw (float | None): Body yaw angle in radians.
 
-        Raises:
-            ValueError: If neither head nor antennas are provided, or if duration is not positive.
-
         """
-        return await self.play_move(
-            move=GotoMove(
-                start_head_pose=self.get_present_head_pose(),
+        target_antennas = np.array(antennas) if antennas is not None else None
+
+        if duration <= 0.0:
+            # e.g. wake_up when the head already is at its initial pose
+            self.motion_executor.stop()
+            self.set_target(head=head, antennas=target_antennas, body_yaw=body_yaw)
+            return
+
+        def build(state: MotionState | None) -> Move:
+            # Start from the preempted move if any, else from the present state
+            start_head_pose = self.get_present_head_pose()
+            start_antennas = np.array(self.get_present_antenna_joint_positions())
+            start_body_yaw = self.get_present_body_yaw()
+            if state is not None:
+                if state.head_pose is not None:
+                    start_head_pose = state.head_pose
+                if state.antennas is not None:
+                    start_antennas = np.array(state.antennas)
+                if state.body_yaw is not None:
+                    start_body_yaw = state.body_yaw
+
+            if method == InterpolationTechnique.MIN_JERK:
+                # Blend into the preempted move, or into the measured motion
+                return BlendedGotoMove(
+                    start_head_pose=start_head_pose,
+                    target_head_pose=head,
+                    start_antennas=start_antennas,
+                    target_antennas=target_antennas,
+                    start_body_yaw=start_body_yaw,
+                    target_body_yaw=body_yaw,
+                    duration=duration,
+                    start_velocity=(
+                        state.velocity
+                        if state is not None
+                        else self.present_motion.task_velocity()
+                    ),
+                    start_acceleration=(
+                        state.acceleration if state is not None else None
+                    ),
+                )
+
+            return GotoMove(
+                start_head_pose=start_head_pose,
                 target_head_pose=head,
-                start_body_yaw=self.get_present_body_yaw(),
+                start_body_yaw=start_body_yaw,
                 target_body_yaw=body_yaw,
-                start_antennas=np.array(self.get_present_antenna_joint_positions()),
-                target_antennas=np.array(antennas) if antennas is not None else None,
+                start_antennas=start_antennas,
+                target_antennas=target_antennas,
                 duration=duration,
                 method=method,
             )
-        )
+
+        await self._play_on_executor(build)
 
     async def goto_joint_positions(
         self,
@@ -423,6 +836,8 @@ class Backend:
         """Asynchronously go to a target head joint positions and/or antennas joint positions using joint space interpolation, in "duration" seconds.
 
         Go to a target head joint positions and/or antennas joint positions using joint space interpolation, in "duration" seconds.
+        The goto is played by the motion executor, preempting the active goto or move.
+        Minimum jerk gotos start with the measured joint velocities.
 
         Args:
             head_joint_positions (Optional[List[float]]): List of head joint positions in radians (length 7).
@@ -453,29 +868,29 @@ class Backend:
             else start_antennas
         )
 
-        t0 = time.time()
-        while time.time() - t0 < duration:
-            t = time.time() - t0
-
-            interp_time = time_trajectory(t / duration, method=method)
-
-            head_joint = start_head + (target_head - start_head) * interp_time
-            antennas_joint = (
-                start_antennas + (target_antennas - start_antennas) * interp_time
+        await self._play_on_executor(
+            JointGotoMove(
+                start_joints=np.concatenate((start_head, start_antennas)),
+                target_joints=np.concatenate((target_head, target_antennas)),
+                duration=duration,
+                method=method,
+                start_velocity=self.present_motion.joint_velocity(),
             )
-
-            self.set_target_head_joint_positions(head_joint)
-            self.set_target_antenna_joint_positions(antennas_joint)
-            await asyncio.sleep(0.01)
+        )
 
     def set_recording_publisher(self, publisher: zenoh.Publisher) -> None:
         """Set the publisher for recording data.
 
         Args:
-            publisher: A publisher object that will be used to publish recorded data.
+            publisher: A publisher object that will be used to publish the recorded chunks.
 
         """
-        self.recording_publisher = publisher
+        self.recorder.publisher = publisher
+
+    @property
+    def is_recording(self) -> bool:
+        """Whether a recording is in progress."""
+        return self.recorder.is_recording
 
     def append_record(self, record: dict[str, Any]) -> None:
         """Append a record to the recorded data.
@@ -484,32 +899,44 @@ class Backend:
             record (dict): A dictionary containing the record data to be appended.
 
         """
-        if not self.is_recording:
-            return
-        # Double-check under lock to avoid race with stop_recording
-        with self._rec_lock:
-            if self.is_recording:
-                self.recorded_data.append(record)
-
-    def start_recording(self) -> None:
-        """Start recording data."""
-        with self._rec_lock:
-            self.recorded_data = []
-            self.is_recording = True
-
-    def stop_recording(self) -> None:
-        """Stop recording data and publish the recorded data."""
-        # Swap buffer under lock so writers cannot touch the published list
-        with self._rec_lock:
-            self.is_recording = False
-            recorded_data, self.recorded_data = self.recorded_data, []
-        # Publish outside the lock
-        if self.recording_publisher is not None:
-            self.recording_publisher.put(json.dumps(recorded_data))
-        else:
-            self.logger.warning(
-                "stop_recording called but recording_publisher is not set; dropping data."
-            )
+        self.recorder.append(record)
+
+    def start_recording(self) -> str:
+        """Start recording data and return the id of the recording."""
+        return self.recorder.start()
+
+    def stop_recording(self) -> str | None:
+        """Stop recording data, publish the last chunk and return the recording id."""
+        return self.recorder.stop()
+
+    def publish_recording(self, recording_id: str) -> None:
+        """Publish again all the chunks of a finished recording.
+
+        Args:
+            recording_id (str): The id returned by start_recording.
+
+        """
+        self.recorder.publish_recording(recording_id)
+
+    def start_state_recording(self) -> str:
+        """Start recording the state at each control loop tick and return the recording id."""
+        return self.state_recorder.start()
+
+    def stop_state_recording(self) -> str | None:
+        """Stop recording the state, write the recording file and return its id."""
+        return self.state_recorder.stop()
+
+    def get_state_recording_path(self, recording_id: str) -> Path:
+        """Get the npz file of a finished state recording.
+
+        Args:
+            recording_id (str): The id returned by start_state_recording.
+
+        Raises:
+            KeyError: If there is no finished state recording with this id.
+
+        """
+        return self.state_recorder.path(recording_id)
 
     def get_present_head_joint_positions(self) -> Annotated[NDArray[np.float64], (7,)]:
         """Return the present head joint positions.
@@ -564,7 +991,7 @@ class Backend:
 
         This method updates the head kinematics model with the given joint positions.
         - If the joint positions are not provided, it will use the current joint positions.
-        - If the head joint positions have not changed, it will return without recomputing the forward kinematics.
+        - If the head joint positions have not changed by more than `_fk_kin_tolerance`, the cached head pose is used instead of recomputing the forward kinematics.
         - If the head joint positions have changed, it will compute the forward kinematics to get the current head pose.
         - If the forward kinematics fails, it will raise an assertion error.
         - If the antennas joint positions are provided, it will update the current antenna joint positions.
@@ -577,8 +1004,17 @@ class Backend:
         if head_joint_positions is None:
             head_joint_positions = self.get_present_head_joint_positions()
 
-        # Compute the forward kinematics to get the current head pose
-        self.current_head_pose = self.head_kinematics.fk(head_joint_positions)
+        # Compute the forward kinematics to get the current head pose,
+        # unless the joints did not move by more than the FK tolerance
+        key = fk_key(head_joint_positions, self._fk_kin_tolerance)
+        head_pose = self.fk_cache.get(key)
+        if head_pose is None:
+            t0 = time.perf_counter()
+            head_pose = self.head_kinematics.fk(head_joint_positions)
+            self.timings.record("fk", time.perf_counter() - t0)
+            if head_pose is not None:
+                self.fk_cache.put(key, head_pose)
+        self.current_head_pose = head_pose
 
         # Check if the FK was successful
         assert self.current_head_pose is not None, (
@@ -594,11 +1030,26 @@ class Backend:
     def set_automatic_body_yaw(self, body_yaw: bool) -> None:
         """Set the automatic body yaw.
 
+        The setting is applied to every kinematics instance: the one of the IK worker
+        (driving the motors), the one compiling the moves and the main one. The IK
+        solutions pending with the previous setting are dropped.
+
         Args:
-            body_yaw (bool): The yaw angle of the body.
+            body_yaw (bool): Whether the body yaw is used to compute the IK and FK.
 
         """
         self.head_kinematics.set_automatic_body_yaw(automatic_body_yaw=body_yaw)
+        self.ik_worker.configure(
+            lambda kinematics: kinematics.set_automatic_body_yaw(
+                automatic_body_yaw=body_yaw
+            )
+        )
+        if self._compile_kinematics is not None:
+            with compiled_moves.kinematics_lock(self._compile_kinematics):
+                self._compile_kinematics.set_automatic_body_yaw(
+                    automatic_body_yaw=body_yaw
+                )
+        self._ik_epoch += 1
 
     def get_urdf(self) -> str:
         """Get the URDF representation of the robot."""
@@ -764,3 +1215,14 @@ class Backend:
             "passive_7_y": self.head_kinematics.get_joint("passive_7_y"),  # type: ignore [union-attr]
             "passive_7_z": self.head_kinematics.get_joint("passive_7_z"),  # type: ignore [union-attr]
         }
+
+
+def _read_backend_attribute(backend: "weakref.ref[Backend]", path: str) -> float | None:
+    """Read a counter of a backend for the metrics (None if not available)."""
+    instance = backend()
+    if instance is None:
+        return None
+    try:
+        return float(operator.attrgetter(path)(instance))
+    except (AttributeError, TypeError):
+        return None
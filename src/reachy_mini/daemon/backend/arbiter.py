@@ -0,0 +1,176 @@
+"""Arbitration of the targets sent by several clients.
+
+Apps, the dashboard and other clients may stream targets at the same time. Instead
+of applying each target as soon as it is received, the targets are submitted to a
+`CommandArbiter`, tagged with their source:
+
+- only the latest target of each source is kept: a target received before the
+  previous one of the same source was applied is merged into it (coalesced),
+- at each control loop tick, the backend applies the pending target of a single
+  source, the lease holder, so at most one target per tick reaches the backend,
+- the lease is held by the source that last won, as long as it keeps sending
+  targets within `lease_duration`. A source with a higher priority takes the lease
+  immediately, other sources have to wait for the lease to expire,
+- pending targets of the other sources are dropped.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Time after its last target after which a source loses the lease (in seconds)
+DEFAULT_LEASE_DURATION = 0.5
+
+
+@dataclass
+class PendingTarget:
+    """Latest target of a source, not applied yet."""
+
+    priority: int
+    timestamp: float
+    head: Annotated[NDArray[np.float64], (4, 4)] | None = None
+    antennas: Annotated[NDArray[np.float64], (2,)] | None = None
+    body_yaw: float | None = None
+
+
+class CommandArbiter:
+    """Keep the latest target of each source and apply the one of the lease holder."""
+
+    def __init__(self, lease_duration: float = DEFAULT_LEASE_DURATION) -> None:
+        """Initialize the arbiter.
+
+        Args:
+            lease_duration (float): Time after its last target after which a source loses the lease (in seconds).
+
+        """
+        self.lease_duration = lease_duration
+
+        self.nb_coalesced = 0  # Targets merged into a newer one of the same source
+        self.nb_dropped = 0  # Targets of sources not holding the lease
+        self.nb_applied = 0
+
+        self._pending: dict[str, PendingTarget] = {}
+        # Source -> (submission time, application time) of its last applied target
+        self._last_applied: dict[str, tuple[float, float]] = {}
+        self._lease_source: str | None = None
+        self._lease_priority = 0
+        self._lease_timestamp = 0.0
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        source: str,
+        head: Annotated[NDArray[np.float64], (4, 4)] | None = None,
+        antennas: Annotated[NDArray[np.float64], (2,)] | None = None,
+        body_yaw: float | None = None,
+        priority: int = 0,
+    ) -> None:
+        """Submit a target, applied at the next control loop tick if its source wins.
+
+        Args:
+            source (str): Identifier of the client sending the target.
+            head (np.ndarray | None): 4x4 head pose.
+            antennas (np.ndarray | None): Antennas joint positions.
+            body_yaw (float | None): Body yaw.
+            priority (int): Priority of the source, higher wins.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(source)
+            if pending is None:
+                pending = self._pending[source] = PendingTarget(priority, now)
+            else:
+                self.nb_coalesced += 1
+                pending.priority = priority
+                pending.timestamp = now
+
+            if head is not None:
+                pending.head = head
+            if antennas is not None:
+                pending.antennas = antennas
+            if body_yaw is not None:
+                pending.body_yaw = body_yaw
+
+    def apply(
+        self,
+        set_target: Callable[
+            [
+                Annotated[NDArray[np.float64], (4, 4)] | None,
+                Annotated[NDArray[np.float64], (2,)] | None,
+                float | None,
+            ],
+            None,
+        ],
+    ) -> None:
+        """Apply the pending target of the lease holder (called at each control loop tick).
+
+        Args:
+            set_target (Callable): Called with the head, antennas and body yaw of the target.
+
+        """
+        with self._lock:
+            if not self._pending:
+                return
+
+            now = time.monotonic()
+            holder = (
+                self._lease_source
+                if now - self._lease_timestamp < self.lease_duration
+                else None
+            )
+            nb_pending = len(self._pending)
+            candidates = list(self._pending.items())
+            if holder is not None and holder not in self._pending:
+                # Only a source with a higher priority can take a held lease
+                candidates = [
+                    (source, pending)
+                    for source, pending in candidates
+                    if pending.priority > self._lease_priority
+                ]
+            self._pending.clear()
+
+            if not candidates:
+                self.nb_dropped += nb_pending
+                return
+            # Highest priority first, then the lease holder, then the most recent
+            winner, target = max(
+                candidates,
+                key=lambda c: (c[1].priority, c[0] == holder, c[1].timestamp),
+            )
+            self.nb_dropped += nb_pending - 1
+
+            self._lease_source = winner
+            self._lease_priority = target.priority
+            self._lease_timestamp = target.timestamp
+            self._last_applied[winner] = (target.timestamp, now)
+            self.nb_applied += 1
+
+        set_target(target.head, target.antennas, target.body_yaw)
+
+    def get_last_applied(self, source: str) -> tuple[float, float] | None:
+        """Get the submission and application times of the last applied target of a source.
+
+        Times are on the monotonic clock. The submission time is the one of the latest
+        target merged into the applied one.
+        """
+        with self._lock:
+            return self._last_applied.get(source)
+
+    def forget(self, source: str) -> None:
+        """Drop the history of a source that disconnected."""
+        with self._lock:
+            self._last_applied.pop(source, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get the counters of applied, coalesced and dropped targets."""
+        return {
+            "nb_applied": self.nb_applied,
+            "nb_coalesced": self.nb_coalesced,
+            "nb_dropped": self.nb_dropped,
+            "lease_source": self._lease_source,
+        }
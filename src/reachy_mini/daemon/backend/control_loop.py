@@ -0,0 +1,155 @@
+"""Fixed-rate scheduler for the backend control loops.
+
+Sleeping for `period - took` after each iteration accumulates the sleep jitter and
+makes the loop drift under load. The `ControlLoopScheduler` instead computes
+absolute deadlines (t0 + k * period) so that a late tick does not delay the
+following ones. When an iteration overruns by more than a full period, the missed
+ticks are skipped rather than run back to back.
+
+The scheduler can optionally request a real-time priority (SCHED_FIFO) and pin the
+control thread to some CPUs. Both are best effort: if the OS does not support them
+or the process lacks the permissions, a warning is logged and the loop keeps
+running with the default scheduling.
+"""
+
+import logging
+import os
+import time
+from typing import Any
+
+from reachy_mini.utils.stats import RollingWindow
+
+
+class ControlLoopScheduler:
+    """Absolute-deadline scheduler for a fixed-rate control loop.
+
+    Usage::
+
+        scheduler = ControlLoopScheduler(frequency=50.0)
+        scheduler.start()
+        while not should_stop.is_set():
+            update()
+            scheduler.wait_next_tick()
+
+    """
+
+    def __init__(
+        self,
+        frequency: float,
+        realtime_priority: int | None = None,
+        cpu_affinity: set[int] | None = None,
+        window_size: int = 500,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            frequency (float): Loop frequency in Hz.
+            realtime_priority (int | None): If set, SCHED_FIFO priority (1-99) requested for the control thread.
+            cpu_affinity (set[int] | None): If set, CPUs the control thread is pinned to.
+            window_size (int): Number of ticks kept to compute the period and jitter statistics.
+            logger (logging.Logger | None): Logger used to report scheduling issues.
+
+        """
+        if frequency <= 0:
+            raise ValueError("The control loop frequency must be positive.")
+
+        self.frequency = frequency
+        self.period = 1.0 / frequency
+        self.realtime_priority = realtime_priority
+        self.cpu_affinity = cpu_affinity
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.periods = RollingWindow(window_size)
+        self.jitters = RollingWindow(window_size)
+        self.nb_overruns = 0
+        self.nb_skipped_ticks = 0
+
+        self._t0 = 0.0
+        self._tick = 0
+        self._last_tick_start: float | None = None
+
+    def start(self) -> None:
+        """Start the schedule from now.
+
+        Must be called from the control thread, as the real-time priority and
+        CPU affinity are applied to the calling thread.
+        """
+        self._apply_os_scheduling()
+
+        self._t0 = time.monotonic()
+        self._tick = 0
+        self._last_tick_start = self._t0
+
+    def wait_next_tick(self) -> float:
+        """Sleep until the deadline of the next tick.
+
+        If the deadline is already passed the tick starts immediately and an
+        overrun is counted. If more than a full period was missed, the missed
+        ticks are skipped to keep the schedule aligned on t0 + k * period.
+
+        Returns:
+            float: The start time of the tick, on the monotonic clock.
+
+        """
+        self._tick += 1
+        deadline = self._t0 + self._tick * self.period
+
+        now = time.monotonic()
+        if now < deadline:
+            time.sleep(deadline - now)
+        else:
+            self.nb_overruns += 1
+            missed = int((now - deadline) / self.period)
+            if missed > 0:
+                self._tick += missed
+                self.nb_skipped_ticks += missed
+                deadline += missed * self.period
+
+        tick_start = time.monotonic()
+        self.jitters.append(tick_start - deadline)
+        if self._last_tick_start is not None:
+            self.periods.append(tick_start - self._last_tick_start)
+        self._last_tick_start = tick_start
+
+        return tick_start
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get the scheduling statistics over the last ticks.
+
+        Periods and jitters are reported in milliseconds.
+        """
+        stats: dict[str, Any] = {
+            "nb_overruns": self.nb_overruns,
+            "nb_skipped_ticks": self.nb_skipped_ticks,
+        }
+
+        period = self.periods.summary(scale=1e3)
+        if period:
+            stats["mean_control_loop_frequency"] = 1e3 / period["mean"]
+            stats["max_control_loop_interval"] = period["max"] / 1e3
+            stats["period_ms"] = period
+        jitter = self.jitters.summary(scale=1e3)
+        if jitter:
+            stats["jitter_ms"] = jitter
+
+        return stats
+
+    def _apply_os_scheduling(self) -> None:
+        if self.cpu_affinity is not None:
+            try:
+                os.sched_setaffinity(0, self.cpu_affinity)
+            except (AttributeError, OSError) as e:
+                self.logger.warning(
+                    f"Could not set the CPU affinity of the control loop: {e}"
+                )
+
+        if self.realtime_priority is not None:
+            try:
+                os.sched_setscheduler(
+                    0, os.SCHED_FIFO, os.sched_param(self.realtime_priority)
+                )
+            except (AttributeError, OSError) as e:
+                self.logger.warning(
+                    f"Could not set the real-time priority of the control loop: {e}"
+                )
@@ -0,0 +1,155 @@
+"""Inverse kinematics worker for the backend control loops.
+
+Solving the head IK can take longer than a control loop period, especially with
+the Placo engine or when collision checking is enabled. The `IKWorker` solves it
+in a background thread so that the motor I/O cadence does not depend on the
+solver time:
+
+- the control loop posts the newest target (head pose, body yaw) in a single-slot
+  request mailbox, overwriting any request the worker did not pick up yet,
+- the worker posts each solution in a single-slot result mailbox, which the
+  control loop polls at each tick without blocking.
+
+Both mailboxes are `collections.deque(maxlen=1)`, whose append and popleft are
+atomic, so neither side ever waits for the other.
+
+The worker owns its own kinematics instance: the engines keep an internal state
+(warm start of the solvers), which must not be shared with the forward kinematics
+computed by the control loop.
+"""
+
+import logging
+import threading
+import typing
+from collections import deque
+from dataclasses import dataclass
+from typing import Annotated, Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+if typing.TYPE_CHECKING:
+    from reachy_mini.kinematics import AnyKinematics
+
+IKSolver = Callable[
+    ["AnyKinematics", NDArray[np.float64], float], NDArray[np.float64] | None
+]
+
+
+@dataclass
+class IKRequest:
+    """Target to solve, tagged with the epoch of the backend when it was submitted."""
+
+    pose: Annotated[NDArray[np.float64], (4, 4)]
+    body_yaw: float
+    epoch: int
+
+
+@dataclass
+class IKResult:
+    """Solution of an IK request. `joints` is None if the pose is not reachable."""
+
+    request: IKRequest
+    joints: Annotated[NDArray[np.float64], (7,)] | None
+
+
+class IKWorker:
+    """Background thread solving the head IK, always on the newest target."""
+
+    def __init__(
+        self,
+        kinematics: "AnyKinematics",
+        solve: IKSolver | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize the worker.
+
+        Args:
+            kinematics (AnyKinematics): Kinematics instance dedicated to the worker.
+            solve (IKSolver | None): Function called as solve(kinematics, pose, body_yaw) to solve a request.
+                Defaults to kinematics.ik.
+            logger (logging.Logger | None): Logger used to report solver errors.
+
+        """
+        self.kinematics = kinematics
+        self.solve = solve or _solve_ik
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._requests: deque[IKRequest] = deque(maxlen=1)
+        self._results: deque[IKResult] = deque(maxlen=1)
+        self._wakeup = threading.Event()
+        self._should_stop = threading.Event()
+        # Held while solving, so the kinematics is not reconfigured mid-solve
+        self._solve_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread is not None:
+            return
+
+        self._should_stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker thread, dropping any pending request."""
+        if self._thread is None:
+            return
+
+        self._should_stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self._requests.clear()
+
+    def submit(
+        self,
+        pose: Annotated[NDArray[np.float64], (4, 4)],
+        body_yaw: float,
+        epoch: int = 0,
+    ) -> None:
+        """Post a new target, replacing the pending one if it was not solved yet."""
+        self._requests.append(IKRequest(pose=pose, body_yaw=body_yaw, epoch=epoch))
+        self._wakeup.set()
+
+    def configure(self, update: Callable[["AnyKinematics"], None]) -> None:
+        """Apply update(kinematics) to the kinematics of the worker, between two solves."""
+        with self._solve_lock:
+            update(self.kinematics)
+
+    def poll(self) -> IKResult | None:
+        """Take the latest solution, if a new one is available. Never blocks."""
+        try:
+            return self._results.popleft()
+        except IndexError:
+            return None
+
+    def _run(self) -> None:
+        while not self._should_stop.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+            try:
+                request = self._requests.popleft()
+            except IndexError:
+                continue
+
+            try:
+                with self._solve_lock:
+                    joints = self.solve(self.kinematics, request.pose, request.body_yaw)
+            except Exception as e:
+                self.logger.debug(f"IK solver error: {e}")
+                joints = None
+
+            if joints is not None and np.any(np.isnan(joints)):
+                joints = None
+            self._results.append(IKResult(request=request, joints=joints))
+
+
+def _solve_ik(
+    kinematics: "AnyKinematics",
+    pose: NDArray[np.float64],
+    body_yaw: float,
+) -> NDArray[np.float64] | None:
+    return kinematics.ik(pose, body_yaw=body_yaw)
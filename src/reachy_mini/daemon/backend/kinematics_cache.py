@@ -0,0 +1,102 @@
+"""Caches for the head kinematics computed by the control loop.
+
+The control loop computes the FK of the present joints at each tick, and the IK of
+the target pose as long as a pose target is set. When the robot idles or holds a
+pose, these inputs only change by the sensor noise, so the results are cached:
+
+- the FK results are keyed on the joint positions quantized with the backend FK
+  tolerance (`_fk_kin_tolerance`),
+- the IK results are keyed on the pose translation and rotation quantized with the
+  backend IK tolerances (`_ik_kin_tolerance`), on the quantized body yaw, and on
+  the automatic body yaw setting of the solver.
+
+Two inputs falling in the same quantization cell share the same result, so the
+error introduced by the cache is bounded by the tolerances.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Annotated, Generic, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+T = TypeVar("T")
+
+
+class QuantizedCache(Generic[T]):
+    """Thread-safe LRU cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 64) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept.
+
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[bytes, T] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> T | None:
+        """Get the value cached for a key, None if there is none."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: T) -> None:
+        """Cache a value, evicting the least recently used entry if the cache is full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all the entries (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the hit and miss counters."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def fk_key(
+    joints: Annotated[NDArray[np.float64], (7,)] | list[float],
+    tolerance: float,
+) -> bytes:
+    """Quantize head joint positions (rad) into a FK cache key."""
+    return (
+        np.round(np.asarray(joints, dtype=np.float64) / tolerance)
+        .astype(np.int64)
+        .tobytes()
+    )
+
+
+def ik_key(
+    pose: Annotated[NDArray[np.float64], (4, 4)],
+    body_yaw: float,
+    tolerance: dict[str, float],
+    automatic_body_yaw: bool,
+) -> bytes:
+    """Quantize a head pose and body yaw into an IK cache key.
+
+    The rotation matrix coefficients are quantized with the angular tolerance, as
+    they vary at most as much as the rotation angle. The automatic body yaw setting
+    changes the solution, so it is part of the key.
+    """
+    values = np.empty(14, dtype=np.float64)
+    values[:9] = pose[:3, :3].ravel() / tolerance["rad"]
+    values[9:12] = pose[:3, 3] / tolerance["m"]
+    values[12] = body_yaw / tolerance["rad"]
+    values[13] = automatic_body_yaw
+    return np.round(values).astype(np.int64).tobytes()
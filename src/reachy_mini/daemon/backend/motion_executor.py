@@ -0,0 +1,339 @@
+"""Single executor of the moves played by the daemon.
+
+Gotos and moves used to be played each by its own coroutine (and thread for the
+Zenoh tasks), all setting the targets concurrently. Instead, the backend owns a
+`MotionExecutor` holding at most one active move, advanced by the control loop at
+each tick (see `MotionExecutor.step`). Moves are either task-space moves (`Move`,
+setting the head pose, antennas and body yaw) or joint moves (`JointMove`, setting
+the joint positions directly, e.g. compiled moves and joint-space gotos):
+
+- starting a move preempts the active one, whose future resolves to False,
+- the new move is built from the motion state of the active move at that time
+  (position, velocity and acceleration), so that a goto can blend into it without
+  any discontinuity of position, velocity or acceleration,
+- the future of a move resolves to True when the move reaches its end. A joint
+  move then sets the task-space target it ended at, if known, so that the next
+  targets start from it.
+
+No thread nor coroutine is needed to play a move: callers only wait for its future.
+Cancelling the future stops the move at the next tick. A move failing to evaluate is
+dropped, its future resolving to the error, without stopping the control loop.
+
+When no move is active, or the active move is a joint move, gotos start from the
+measured state instead, with the velocity estimated at each tick by a
+`PresentMotionEstimator`.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.spatial.transform import Rotation as R
+
+from reachy_mini.motion.move import JointMove, Move
+
+# Time step used to estimate the velocity of the active move (in seconds)
+VELOCITY_ESTIMATION_DT = 0.01
+# Weight of the newest sample in the moving average of the measured velocity
+MEASURED_VELOCITY_SMOOTHING = 0.3
+# Gap between two measured samples after which the velocity is reset (in seconds)
+MEASURED_VELOCITY_MAX_GAP = 0.1
+# Measured velocities below these are encoder noise, reported as zero so that a
+# goto from rest does start from rest (in m/s and rad/s)
+MEASURED_LINEAR_VELOCITY_DEADBAND = 0.005
+MEASURED_ANGULAR_VELOCITY_DEADBAND = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MotionState:
+    """Position, velocity and acceleration of the active move at a given time.
+
+    The velocity is a 9D vector: head translation velocity (3), head angular
+    velocity in the head frame (3), antennas velocities (2) and body yaw velocity (1).
+    The acceleration uses the same layout. Parts not defined by the move are None,
+    with a zero velocity and acceleration.
+    """
+
+    head_pose: Annotated[NDArray[np.float64], (4, 4)] | None
+    antennas: Annotated[NDArray[np.float64], (2,)] | None
+    body_yaw: float | None
+    velocity: Annotated[NDArray[np.float64], (9,)]
+    acceleration: Annotated[NDArray[np.float64], (9,)]
+
+
+@dataclass
+class _ActiveMove:
+    move: Move | JointMove
+    t0: float  # time.monotonic() at the start of the move
+    future: "Future[bool]"
+
+
+class MotionExecutor:
+    """Own the active move and play it at each control loop tick."""
+
+    def __init__(
+        self,
+        set_target: Callable[
+            [
+                Annotated[NDArray[np.float64], (4, 4)] | None,
+                Annotated[NDArray[np.float64], (2,)] | None,
+                float | None,
+            ],
+            None,
+        ],
+        set_joint_target: Callable[
+            [
+                Annotated[NDArray[np.float64], (7,)] | None,
+                Annotated[NDArray[np.float64], (2,)] | None,
+            ],
+            None,
+        ],
+        set_end_target: Callable[
+            [Annotated[NDArray[np.float64], (4, 4)] | None, float | None], None
+        ],
+    ) -> None:
+        """Initialize the executor.
+
+        Args:
+            set_target (Callable): Called at each tick with the head pose, antennas and body yaw of the active move.
+            set_joint_target (Callable): Called at each tick with the head and antennas joint positions of the active joint move.
+            set_end_target (Callable): Called with the head pose and body yaw reached at the end of a joint move.
+
+        """
+        self._set_target = set_target
+        self._set_joint_target = set_joint_target
+        self._set_end_target = set_end_target
+        self._active: _ActiveMove | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self) -> bool:
+        """Whether a move is being played."""
+        return self._active is not None
+
+    def play(
+        self, build: Callable[[MotionState | None], Move] | Move | JointMove
+    ) -> "Future[bool]":
+        """Play a move, preempting the active one.
+
+        Args:
+            build (Callable | Move | JointMove): The move to play, or a function building it
+                from the motion state of the preempted move (None if no task-space move is active).
+
+        Returns:
+            Future[bool]: Resolves to True when the move ends, False if it is preempted.
+
+        """
+        future: Future[bool] = Future()
+        with self._lock:
+            now = time.monotonic()
+            move: Move | JointMove
+            if isinstance(build, (Move, JointMove)):
+                move = build
+            else:
+                move = build(self._motion_state(now))
+            self._preempt()
+            self._active = _ActiveMove(move=move, t0=now, future=future)
+        return future
+
+    def stop(self) -> None:
+        """Stop the active move, if any."""
+        with self._lock:
+            self._preempt()
+
+    def step(self) -> None:
+        """Set the targets of the active move at the present time (called at each tick)."""
+        with self._lock:
+            active = self._active
+            if active is None:
+                return
+            if active.future.cancelled():
+                self._active = None
+                return
+
+            move = active.move
+            t = time.monotonic() - active.t0
+            finished = t >= move.duration
+            t = min(t, move.duration)
+            if finished:
+                self._active = None
+
+            # Set with the lock held, so a preempting move cannot be overwritten
+            try:
+                if isinstance(move, JointMove):
+                    self._set_joint_target(*move.evaluate_joints(t))
+                    if finished:
+                        self._set_end_target(*move.end_target())
+                else:
+                    self._set_target(*move.evaluate(t))
+            except Exception as e:
+                logger.error(f"Stopping the move {move!r}, which failed at t={t}: {e}")
+                self._active = None
+                _fail(active.future, e)
+                return
+
+        if finished:
+            _resolve(active.future, True)
+
+    def _preempt(self) -> None:
+        """Drop the active move (called with the lock held)."""
+        if self._active is not None:
+            _resolve(self._active.future, False)
+            self._active = None
+
+    def _motion_state(self, now: float) -> MotionState | None:
+        """Get the position, velocity and acceleration of the active move (called with the lock held)."""
+        active = self._active
+        if active is None or active.future.done():
+            return None
+        move = active.move
+        if isinstance(move, JointMove):
+            return None
+
+        dt = VELOCITY_ESTIMATION_DT
+        duration = move.duration
+        t = min(now - active.t0, duration)
+        head, antennas, body_yaw = move.evaluate(t)
+        if t >= duration or duration < 2 * dt:
+            return MotionState(head, antennas, body_yaw, np.zeros(9), np.zeros(9))
+
+        # Second order differences on three samples around t, within the move
+        t_first = min(max(t - dt, 0.0), duration - 2 * dt)
+        s0, s1, s2 = [_task_sample(*move.evaluate(t_first + i * dt)) for i in range(3)]
+        d01 = _task_difference(s0, s1)
+        d12 = _task_difference(s1, s2)
+        acceleration = (d12 - d01) / dt**2
+        velocity = (d01 + d12) / (2 * dt) + acceleration * (t - t_first - dt)
+
+        return MotionState(head, antennas, body_yaw, velocity, acceleration)
+
+
+class PresentMotionEstimator:
+    """Estimate the velocity of the measured state, updated at each control loop tick.
+
+    The velocity is estimated by finite differences between successive samples,
+    smoothed by an exponential moving average. It is estimated both in task space
+    (same layout as `MotionState.velocity`) and in joint space (7 head joints, then
+    2 antennas). Components within the deadbands are reported as zero.
+    """
+
+    def __init__(self, smoothing: float = MEASURED_VELOCITY_SMOOTHING) -> None:
+        """Initialize the estimator.
+
+        Args:
+            smoothing (float): Weight of the newest sample in the moving average, in ]0, 1].
+
+        """
+        self.smoothing = smoothing
+        self._task_velocity = np.zeros(9)
+        self._joint_velocity = np.zeros(9)
+        self._last: tuple[float, tuple[Any, Any, Any], NDArray[np.float64]] | None = (
+            None
+        )
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        head_pose: Annotated[NDArray[np.float64], (4, 4)] | None,
+        head_joint_positions: Annotated[NDArray[np.float64], (7,)] | None,
+        antennas_joint_positions: Annotated[NDArray[np.float64], (2,)] | None,
+    ) -> None:
+        """Add a sample of the measured state (ignored until the state is known)."""
+        if (
+            head_pose is None
+            or head_joint_positions is None
+            or antennas_joint_positions is None
+        ):
+            return
+
+        now = time.monotonic()
+        antennas = np.asarray(antennas_joint_positions, dtype=np.float64)
+        task = _task_sample(head_pose, antennas, float(head_joint_positions[0]))
+        joints = np.concatenate((head_joint_positions, antennas))
+
+        with self._lock:
+            last = self._last
+            self._last = (now, task, joints)
+            if last is None:
+                return
+            dt = now - last[0]
+            if dt <= 0.0:
+                return
+            if dt > MEASURED_VELOCITY_MAX_GAP:
+                self._task_velocity[:] = 0.0
+                self._joint_velocity[:] = 0.0
+                return
+
+            a = self.smoothing
+            self._task_velocity += a * (
+                _task_difference(last[1], task) / dt - self._task_velocity
+            )
+            self._joint_velocity += a * ((joints - last[2]) / dt - self._joint_velocity)
+
+    def task_velocity(self) -> Annotated[NDArray[np.float64], (9,)]:
+        """Get the measured velocity in task space (see `MotionState.velocity`)."""
+        with self._lock:
+            return _deadband(self._task_velocity, _TASK_VELOCITY_DEADBAND)
+
+    def joint_velocity(self) -> Annotated[NDArray[np.float64], (9,)]:
+        """Get the measured velocity of the 7 head joints and the 2 antennas."""
+        with self._lock:
+            return _deadband(self._joint_velocity, MEASURED_ANGULAR_VELOCITY_DEADBAND)
+
+
+# Deadband of each component of a task-space velocity (see MotionState.velocity)
+_TASK_VELOCITY_DEADBAND = np.array(
+    [MEASURED_LINEAR_VELOCITY_DEADBAND] * 3 + [MEASURED_ANGULAR_VELOCITY_DEADBAND] * 6
+)
+
+
+def _deadband(
+    velocity: NDArray[np.float64], deadband: float | NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Copy of the velocity, with the components within the deadband set to zero."""
+    return np.where(np.abs(velocity) < deadband, 0.0, velocity)
+
+
+def _task_sample(
+    head: Annotated[NDArray[np.float64], (4, 4)] | None,
+    antennas: Annotated[NDArray[np.float64], (2,)] | None,
+    body_yaw: float | None,
+) -> tuple[Any, Any, Any]:
+    return head, None if antennas is None else np.asarray(antennas), body_yaw
+
+
+def _task_difference(
+    a: tuple[Any, Any, Any], b: tuple[Any, Any, Any]
+) -> Annotated[NDArray[np.float64], (9,)]:
+    """Difference b - a of two task-space samples, rotation in the frame of a."""
+    diff = np.zeros(9)
+    if a[0] is not None and b[0] is not None:
+        diff[0:3] = b[0][:3, 3] - a[0][:3, 3]
+        diff[3:6] = R.from_matrix(a[0][:3, :3].T @ b[0][:3, :3]).as_rotvec()
+    if a[1] is not None and b[1] is not None:
+        diff[6:8] = b[1] - a[1]
+    if a[2] is not None and b[2] is not None:
+        diff[8] = b[2] - a[2]
+    return diff
+
+
+def _resolve(future: "Future[bool]", result: bool) -> None:
+    # The future may have been cancelled by its caller meanwhile
+    try:
+        future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _fail(future: "Future[bool]", error: Exception) -> None:
+    try:
+        future.set_exception(error)
+    except InvalidStateError:
+        pass
@@ -6,9 +6,8 @@ It includes methods for running the simulation, getting joint positions, and con
 
 """
 
-import json
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from importlib.resources import files
 from threading import Thread
 from typing import Annotated, Any, Optional
@@ -24,6 +23,7 @@ import reachy_mini
 from reachy_mini.io.video_ws import AsyncWebSocketFrameSender
 
 from ..abstract import Backend, MotorControlMode
+from ..control_loop import ControlLoopScheduler
 from .utils import (
     get_actuator_names,
     get_joint_addr_from_name,
@@ -89,6 +89,7 @@ class MujocoBackend(Backend):
         self.data = mujoco.MjData(self.model)
         self.model.opt.timestep = 0.002  # s, simulation timestep, 500hz
         self.decimation = 10  # -> 50hz control loop
+        self.tick_notifier.frequency = 1.0 / (self.model.opt.timestep * self.decimation)
         self.rendering_timestep = 0.04  # s, rendering loop # 25Hz
         self.streaming_timestep = 0.04  # s, streaming loop # 25Hz
 
@@ -99,6 +100,7 @@ class MujocoBackend(Backend):
         )
 
         self.current_head_pose = np.eye(4)
+        self.scheduler: ControlLoopScheduler | None = None
 
         self.joint_names = get_actuator_names(self.model)
 
@@ -245,15 +247,20 @@ class MujocoBackend(Backend):
         # Update the internal states of the IK and FK to the current configuration
         # This is important to avoid jumps when starting the robot (beore wake-up)
         self.head_kinematics.ik(self.get_mj_present_head_pose(), no_iterations=20)
+        self.ik_worker.kinematics.ik(self.get_mj_present_head_pose(), no_iterations=20)
         self.head_kinematics.fk(
             self.get_present_head_joint_positions(), no_iterations=20
         )
 
         # 3) now enter your normal loop
+        self.scheduler = ControlLoopScheduler(
+            frequency=1.0 / self.model.opt.timestep, logger=self.logger
+        )
+        self.scheduler.start()
         while not self.should_stop.is_set():
-            start_t = time.time()
-
             if step % self.decimation == 0:
+                update_t0 = time.perf_counter()
+
                 # update the current states
                 self.current_head_joint_positions = (
                     self.get_present_head_joint_positions()
@@ -268,53 +275,43 @@ class MujocoBackend(Backend):
                 )
                 self.current_head_pose = self.get_mj_present_head_pose()
 
-                # Update the target head joint positions from IK if necessary
-                # - does nothing if the targets did not change
-                if self.ik_required:
-                    try:
-                        self.update_target_head_joints_from_ik(
-                            self.target_head_pose, self.target_body_yaw
-                        )
-                    except ValueError as e:
-                        log_throttling.by_time(self.logger, interval=0.5).warning(
-                            f"IK error: {e}"
-                        )
+                self.apply_arbitrated_target()
+
+                # Submit the new IK target to the IK worker and apply its latest solution
+                # - never waits for the solver
+                try:
+                    self.update_target_head_joints_from_ik_worker()
+                except ValueError as e:
+                    log_throttling.by_time(self.logger, interval=0.5).warning(
+                        f"IK error: {e}"
+                    )
 
                 if self.target_head_joint_positions is not None:
                     self.data.ctrl[:7] = self.target_head_joint_positions
                 if self.target_antenna_joint_positions is not None:
                     self.data.ctrl[-2:] = -self.target_antenna_joint_positions
 
-                if (
-                    self.joint_positions_publisher is not None
-                    and self.pose_publisher is not None
-                ):
+                if self.state_publisher is not None:
                     if not self.is_shutting_down:
-                        self.joint_positions_publisher.put(
-                            json.dumps(
-                                {
-                                    "head_joint_positions": self.current_head_joint_positions.tolist(),
-                                    "antennas_joint_positions": self.current_antenna_joint_positions.tolist(),
-                                }
-                            ).encode("utf-8")
-                        )
-                        self.pose_publisher.put(
-                            json.dumps(
-                                {
-                                    "head_pose": self.get_present_head_pose().tolist(),
-                                }
-                            ).encode("utf-8")
+                        self.publish_present_state(
+                            self.current_head_joint_positions,
+                            self.current_antenna_joint_positions,
+                            self.get_present_head_pose(),
                         )
                     self.ready.set()
 
                 if not self.headless:
                     viewer.sync()
 
+                update_duration = time.perf_counter() - update_t0
+                self.timings.record("update", update_duration)
+                self.observe_update(update_duration)
+                self.record_present_state(update_duration)
+                self.tick_notifier.notify()
+
             mujoco.mj_step(self.model, self.data)
 
-            took = time.time() - start_t
-            time.sleep(max(0, self.model.opt.timestep - took))
-            # print(f"Step {step}: took {took*1e6:.1f}us")
+            self.scheduler.wait_next_tick()
             step += 1
 
         if not self.headless:
@@ -348,10 +345,18 @@ class MujocoBackend(Backend):
         """Get the status of the Mujoco backend.
 
         Returns:
-            dict: An empty dictionary as the Mujoco backend does not have a specific status to report.
+            MujocoBackendStatus: The motor control mode and the simulation loop statistics.
 
         """
-        return MujocoBackendStatus(motor_control_mode=self.get_motor_control_mode())
+        return MujocoBackendStatus(
+            motor_control_mode=self.get_motor_control_mode(),
+            control_loop_stats=self.scheduler.get_stats()
+            | self.timings.summary()
+            | self.get_kinematics_cache_stats()
+            | self.get_command_arbiter_stats()
+            if self.scheduler is not None
+            else {},
+        )
 
     def get_present_head_joint_positions(
         self,
@@ -386,10 +391,8 @@ class MujocoBackend(Backend):
 
 @dataclass
 class MujocoBackendStatus:
-    """Dataclass to represent the status of the Mujoco backend.
-
-    Empty for now, as the Mujoco backend does not have a specific status to report.
-    """
+    """Dataclass to represent the status of the Mujoco backend."""
 
     motor_control_mode: MotorControlMode
+    control_loop_stats: dict[str, Any] = field(default_factory=dict)
     error: str | None = None
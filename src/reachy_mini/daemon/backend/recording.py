@@ -0,0 +1,434 @@
+"""Recordings made by the daemon.
+
+The targets set by the clients are recorded with a `Recorder`. Records are not kept
+in memory for the whole recording. They are buffered in chunks of
+`RECORDING_CHUNK_SIZE` records, and each full chunk is:
+
+- appended to the JSON Lines file of the recording (one record per line), in
+  `RECORDINGS_DIR/<recording_id>.jsonl`,
+- published on the recorded_data topic, as a JSON message::
+
+    {"recording_id": str, "seq": int, "records": [...], "last": bool}
+
+The chunks of a recording are numbered from 0, and the last one (possibly empty) is
+published when the recording stops. Clients reassemble the chunks of a recording,
+and can ask the daemon to publish a finished recording again from its file (see
+`Recorder.publish_recording`), e.g. if they missed some chunks.
+
+The recording files are not kept forever: `RECORDINGS_DIR` is usually in a tmpfs,
+i.e. in RAM. When a recording starts, the oldest finished recordings are deleted so
+that at most `MAX_RECORDINGS` of them, totalling at most `MAX_RECORDINGS_BYTES`, are
+kept (for each kind of recording).
+
+The measured state of the robot can also be recorded by the control loop itself, at
+its own rate, with a `StateRecorder`. Each tick appends one row of float64 values
+(see `STATE_RECORD_LAYOUT`) to a preallocated ring buffer, without any allocation
+nor I/O. A writer thread appends the filled rows to a raw file, converted to a
+compressed `RECORDINGS_DIR/<recording_id>.npz` file (one array per field) when the
+recording stops.
+"""
+
+import json
+import logging
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Any, TextIO
+from uuid import uuid4
+
+import numpy as np
+import zenoh
+from numpy.typing import NDArray
+
+# Default directory of the recording files
+RECORDINGS_DIR = Path(tempfile.gettempdir()) / "reachy_mini_recordings"
+# Number of records per published chunk
+RECORDING_CHUNK_SIZE = 500
+# Finished recordings kept on disk, of each kind (the oldest are deleted first)
+MAX_RECORDINGS = 16
+MAX_RECORDINGS_BYTES = 64 * 1024 * 1024
+
+# Row of a state recording: field name -> slice in the float64 row.
+# Values that are not set (e.g. no target yet) are recorded as NaN.
+STATE_RECORD_LAYOUT = {
+    "time": slice(0, 1),  # time.monotonic() of the tick (in seconds)
+    "update_duration": slice(1, 2),  # duration of the control loop update (in seconds)
+    "control_mode": slice(2, 3),  # index in reachy_mini.io.wire.CONTROL_MODES
+    "head_joint_positions": slice(3, 10),
+    "antennas_joint_positions": slice(10, 12),
+    "head_pose": slice(12, 28),
+    "target_head_joint_positions": slice(28, 35),
+    "target_antennas_joint_positions": slice(35, 37),
+    "target_head_pose": slice(37, 53),
+    "target_body_yaw": slice(53, 54),
+    "target_head_joint_current": slice(54, 61),
+}
+STATE_RECORD_SIZE = 61
+# Number of rows of the ring buffer (about 10s at 100Hz)
+STATE_RECORD_BUFFER_SIZE = 1024
+
+
+class Recorder:
+    """Write records to disk and publish them in chunks while recording."""
+
+    def __init__(
+        self,
+        directory: Path = RECORDINGS_DIR,
+        chunk_size: int = RECORDING_CHUNK_SIZE,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize the recorder.
+
+        Args:
+            directory (Path): Directory where the recording files are written.
+            chunk_size (int): Number of records per chunk.
+            logger (logging.Logger | None): Logger used to report publishing issues.
+
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.logger = logger or logging.getLogger(__name__)
+        self.publisher: zenoh.Publisher | None = None
+
+        self.recording_id: str | None = None  # Id of the current recording
+        self._file: TextIO | None = None
+        self._chunk: list[dict[str, Any]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_recording(self) -> bool:
+        """Whether a recording is in progress."""
+        return self.recording_id is not None
+
+    def start(self) -> str:
+        """Start a new recording (stopping the current one) and return its id."""
+        self.stop()
+
+        recording_id = uuid4().hex
+        self.directory.mkdir(parents=True, exist_ok=True)
+        prune_recordings(self.directory, ".jsonl", self.logger)
+        with self._lock:
+            self._file = open(self._path(recording_id), "w")
+            self._chunk = []
+            self._seq = 0
+            self.recording_id = recording_id
+        return recording_id
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Append a record to the current recording (ignored if not recording)."""
+        if not self.is_recording:
+            return
+        # Double-check under lock to avoid race with stop
+        with self._lock:
+            if self.recording_id is None:
+                return
+            self._chunk.append(record)
+            if len(self._chunk) >= self.chunk_size:
+                self._flush(last=False)
+
+    def stop(self) -> str | None:
+        """Stop the current recording and return its id (None if not recording)."""
+        with self._lock:
+            recording_id = self.recording_id
+            if recording_id is None:
+                return None
+            self._flush(last=True)
+            assert self._file is not None
+            self._file.close()
+            self._file = None
+            self.recording_id = None
+        return recording_id
+
+    def load(self, recording_id: str) -> list[dict[str, Any]]:
+        """Load all the records of a finished recording.
+
+        Raises:
+            KeyError: If there is no recording with this id.
+
+        """
+        return [record for chunk in self._read_chunks(recording_id) for record in chunk]
+
+    def publish_recording(self, recording_id: str) -> None:
+        """Publish again all the chunks of a finished recording, read from its file.
+
+        Raises:
+            KeyError: If there is no recording with this id.
+
+        """
+        chunks = list(self._read_chunks(recording_id)) or [[]]
+        for seq, chunk in enumerate(chunks):
+            self._publish(recording_id, seq, chunk, last=seq == len(chunks) - 1)
+
+    def _flush(self, last: bool) -> None:
+        """Write and publish the current chunk (called with the lock held)."""
+        assert self._file is not None and self.recording_id is not None
+        for record in self._chunk:
+            self._file.write(json.dumps(record))
+            self._file.write("\n")
+        self._file.flush()
+
+        self._publish(self.recording_id, self._seq, self._chunk, last)
+        self._chunk = []
+        self._seq += 1
+
+    def _publish(
+        self, recording_id: str, seq: int, records: list[dict[str, Any]], last: bool
+    ) -> None:
+        if self.publisher is None:
+            if last:
+                self.logger.warning(
+                    f"Recording {recording_id} not published, no publisher is set."
+                )
+            return
+        self.publisher.put(
+            json.dumps(
+                {
+                    "recording_id": recording_id,
+                    "seq": seq,
+                    "records": records,
+                    "last": last,
+                }
+            )
+        )
+
+    def _read_chunks(self, recording_id: str) -> list[list[dict[str, Any]]]:
+        path = self._path(recording_id)
+        if recording_id == self.recording_id or not path.exists():
+            raise KeyError(f"No finished recording with id {recording_id}.")
+
+        chunks: list[list[dict[str, Any]]] = []
+        with open(path) as f:
+            for line in f:
+                if not chunks or len(chunks[-1]) >= self.chunk_size:
+                    chunks.append([])
+                chunks[-1].append(json.loads(line))
+        return chunks
+
+    def _path(self, recording_id: str) -> Path:
+        # Only hexadecimal ids are generated, refuse anything that could escape the directory
+        if not recording_id.isalnum():
+            raise KeyError(f"Invalid recording id {recording_id}.")
+        return self.directory / f"{recording_id}.jsonl"
+
+
+def prune_recordings(
+    directory: Path,
+    suffix: str,
+    logger: logging.Logger,
+    max_recordings: int = MAX_RECORDINGS,
+    max_bytes: int = MAX_RECORDINGS_BYTES,
+) -> None:
+    """Delete the oldest recording files with the given suffix, over the limits.
+
+    Called before a new recording starts, so one less recording is kept.
+    """
+    files = []
+    for path in directory.glob(f"*{suffix}"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    files.sort(reverse=True)  # Newest first
+
+    total = 0
+    for i, (_, size, path) in enumerate(files):
+        total += size
+        if i + 1 < max_recordings and total <= max_bytes:
+            continue
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not delete the recording {path}: {e}")
+
+
+class StateRecorder:
+    """Record the state of the robot at each control loop tick."""
+
+    def __init__(
+        self,
+        directory: Path = RECORDINGS_DIR,
+        buffer_size: int = STATE_RECORD_BUFFER_SIZE,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Initialize the state recorder.
+
+        Args:
+            directory (Path): Directory where the recording files are written.
+            buffer_size (int): Number of rows of the ring buffer.
+            logger (logging.Logger | None): Logger used to report dropped rows.
+
+        """
+        self.directory = directory
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.recording_id: str | None = None  # Id of the current recording
+        self.nb_dropped_rows = 0  # Rows dropped because the buffer was full
+
+        self._buffer = np.full((buffer_size, STATE_RECORD_SIZE), np.nan)
+        # Total number of rows written by the control loop, and flushed to the file
+        self._nb_written = 0
+        self._nb_flushed = 0
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._writer: threading.Thread | None = None
+        # Serializes start and stop
+        self._lock = threading.Lock()
+        # Held by the control loop while it writes a row, and to end the recording
+        self._row_lock = threading.Lock()
+
+    @property
+    def is_recording(self) -> bool:
+        """Whether a recording is in progress."""
+        return self.recording_id is not None
+
+    def start(self) -> str:
+        """Start a new recording (stopping the current one) and return its id."""
+        with self._lock:
+            self._stop()
+
+            recording_id = uuid4().hex
+            self.directory.mkdir(parents=True, exist_ok=True)
+            prune_recordings(self.directory, ".npz", self.logger)
+            # Raw files left by a daemon stopped while recording, all deleted
+            prune_recordings(self.directory, ".raw", self.logger, max_recordings=1)
+            self._nb_written = 0
+            self._nb_flushed = 0
+            self.nb_dropped_rows = 0
+            self._stop_event.clear()
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                args=(open(self._raw_path(recording_id), "wb"),),
+                daemon=True,
+            )
+            self._writer.start()
+            self.recording_id = recording_id
+        return recording_id
+
+    def append(
+        self,
+        update_duration: float,
+        control_mode: int,
+        head_joint_positions: Annotated[NDArray[np.float64], (7,)] | None,
+        antennas_joint_positions: Annotated[NDArray[np.float64], (2,)] | None,
+        head_pose: Annotated[NDArray[np.float64], (4, 4)] | None,
+        target_head_joint_positions: Annotated[NDArray[np.float64], (7,)] | None,
+        target_antennas_joint_positions: Annotated[NDArray[np.float64], (2,)] | None,
+        target_head_pose: Annotated[NDArray[np.float64], (4, 4)] | None,
+        target_body_yaw: float | None,
+        target_head_joint_current: Annotated[NDArray[np.float64], (7,)] | None,
+    ) -> None:
+        """Append the state of one tick (called by the control loop).
+
+        Only copies the values in the ring buffer. If the writer thread did not keep
+        up and the buffer is full, the row is dropped.
+        """
+        if self.recording_id is None:
+            return
+        with self._row_lock:
+            # Double-check under lock: a row is written before stop, or not at all
+            if self.recording_id is None:
+                return
+
+            capacity = len(self._buffer)
+            if self._nb_written - self._nb_flushed >= capacity:
+                self.nb_dropped_rows += 1
+                return
+
+            row = self._buffer[self._nb_written % capacity]
+            row[STATE_RECORD_LAYOUT["time"]] = time.monotonic()
+            row[STATE_RECORD_LAYOUT["update_duration"]] = update_duration
+            row[STATE_RECORD_LAYOUT["control_mode"]] = control_mode
+            for name, value in (
+                ("head_joint_positions", head_joint_positions),
+                ("antennas_joint_positions", antennas_joint_positions),
+                ("head_pose", head_pose),
+                ("target_head_joint_positions", target_head_joint_positions),
+                ("target_antennas_joint_positions", target_antennas_joint_positions),
+                ("target_head_pose", target_head_pose),
+                ("target_body_yaw", target_body_yaw),
+                ("target_head_joint_current", target_head_joint_current),
+            ):
+                row[STATE_RECORD_LAYOUT[name]] = (
+                    np.nan if value is None else np.ravel(value)
+                )
+            self._nb_written += 1
+
+            if self._nb_written - self._nb_flushed >= capacity // 2:
+                self._flush_event.set()
+
+    def stop(self) -> str | None:
+        """Stop the current recording, write its npz file and return its id.
+
+        Returns None if not recording. Compressing the file may take a while: call it
+        from a thread, not from an event loop.
+        """
+        with self._lock:
+            return self._stop()
+
+    def _stop(self) -> str | None:
+        """Stop the current recording (called with the lock held)."""
+        with self._row_lock:
+            recording_id = self.recording_id
+            if recording_id is None:
+                return None
+            # No row can be written anymore, the writer flushes all of them
+            self.recording_id = None
+
+        assert self._writer is not None
+        self._stop_event.set()
+        self._flush_event.set()
+        self._writer.join()
+        self._writer = None
+
+        raw_path = self._raw_path(recording_id)
+        rows = np.fromfile(raw_path, dtype=np.float64).reshape(-1, STATE_RECORD_SIZE)
+        arrays = {name: rows[:, s] for name, s in STATE_RECORD_LAYOUT.items()}
+        npz_path = self.directory / f"{recording_id}.npz"
+        np.savez_compressed(npz_path, **arrays)  # type: ignore[arg-type]
+        raw_path.unlink()
+
+        if self.nb_dropped_rows > 0:
+            self.logger.warning(
+                f"State recording {recording_id}: {self.nb_dropped_rows} rows dropped."
+            )
+        return recording_id
+
+    def path(self, recording_id: str) -> Path:
+        """Get the path of the npz file of a finished recording.
+
+        Raises:
+            KeyError: If there is no finished recording with this id.
+
+        """
+        # Only hexadecimal ids are generated, refuse anything that could escape the directory
+        if not recording_id.isalnum():
+            raise KeyError(f"Invalid recording id {recording_id}.")
+        path = self.directory / f"{recording_id}.npz"
+        if not path.exists():
+            raise KeyError(f"No finished state recording with id {recording_id}.")
+        return path
+
+    def _raw_path(self, recording_id: str) -> Path:
+        return self.directory / f"{recording_id}.raw"
+
+    def _write_loop(self, file: Any) -> None:
+        """Append the rows written by the control loop to the raw file."""
+        capacity = len(self._buffer)
+        with file:
+            while True:
+                self._flush_event.wait(timeout=0.5)
+                self._flush_event.clear()
+                stopping = self._stop_event.is_set()
+
+                nb_written = self._nb_written
+                while self._nb_flushed < nb_written:
+                    start = self._nb_flushed % capacity
+                    end = min(start + nb_written - self._nb_flushed, capacity)
+                    file.write(self._buffer[start:end].tobytes())
+                    self._nb_flushed += end - start
+
+                if stopping:
+                    return
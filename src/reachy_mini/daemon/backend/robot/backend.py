@@ -5,13 +5,11 @@ It handles the control loop, joint positions, torque enabling/disabling, and pro
 It uses the `ReachyMiniMotorController` to communicate with the robot's motors.
 """
 
-import json
 import logging
 import struct
 import time
 from dataclasses import dataclass
 from datetime import timedelta
-from multiprocessing import Event  # It seems to be more accurate than threading.Event
 from typing import Annotated, Any
 
 import log_throttling
@@ -20,8 +18,14 @@ import numpy.typing as npt
 from reachy_mini_motor_controller import ReachyMiniPyControlLoop
 
 from reachy_mini.utils.hardware_config.parser import parse_yaml_config
+from reachy_mini.utils.metrics import metrics
 
 from ..abstract import Backend, MotorControlMode
+from ..control_loop import ControlLoopScheduler
+
+_control_loop_errors = metrics.counter(
+    "control_loop_errors_total", "Failed reads or writes of the motor controller."
+)
 
 
 class RobotBackend(Backend):
@@ -36,6 +40,8 @@ class RobotBackend(Backend):
         hardware_error_check_frequency: float = 1.0,
         use_audio: bool = True,
         hardware_config_filepath: str | None = None,
+        realtime_priority: int | None = None,
+        cpu_affinity: set[int] | None = None,
     ):
         """Initialize the RobotBackend.
 
@@ -47,6 +53,8 @@ class RobotBackend(Backend):
             hardware_error_check_frequency (float): Frequency in seconds to check for hardware errors. Default is 1.0.
             use_audio (bool): If True, use audio. Default is True.
             hardware_config_filepath (str | None): Path to the hardware configuration YAML file. Default is None.
+            realtime_priority (int | None): SCHED_FIFO priority requested for the control loop thread, if any. Default is None.
+            cpu_affinity (set[int] | None): CPUs the control loop thread is pinned to, if any. Default is None.
 
         Tries to connect to the Reachy Mini motor controller and initializes the control loop.
 
@@ -61,6 +69,7 @@ class RobotBackend(Backend):
         self.logger.setLevel(log_level)
 
         self.control_loop_frequency = 50.0  # Hz
+        self.tick_notifier.frequency = self.control_loop_frequency
         self.c: ReachyMiniPyControlLoop | None = ReachyMiniPyControlLoop(
             serialport,
             read_position_loop_period=timedelta(
@@ -95,10 +104,15 @@ class RobotBackend(Backend):
         )
         self._stats_record_period = 1.0  # seconds
         self._stats: dict[str, Any] = {
-            "timestamps": [],
             "nb_error": 0,
             "record_period": self._stats_record_period,
         }
+        self.scheduler = ControlLoopScheduler(
+            frequency=self.control_loop_frequency,
+            realtime_priority=realtime_priority,
+            cpu_affinity=cpu_affinity,
+            logger=self.logger,
+        )
 
         self._current_head_operation_mode = -1  # Default to torque control mode
         self._current_antennas_operation_mode = -1  # Default to torque control mode
@@ -116,15 +130,11 @@ class RobotBackend(Backend):
         """
         assert self.c is not None, "Motor controller not initialized or already closed."
 
-        period = 1.0 / self.control_loop_frequency  # Control loop period in seconds
-
         self.retries = 5
         self.stats_record_t0 = time.time()
 
         self.last_hardware_error_check_time = time.time()
 
-        next_call_event = Event()
-
         # Compute the forward kinematics to get the initial head pose
         # IMPORTANT for wake_up
         head_positions, _ = self.get_all_joint_positions()
@@ -136,26 +146,24 @@ class RobotBackend(Backend):
         assert self.current_head_pose is not None
 
         self.head_kinematics.ik(self.current_head_pose, no_iterations=20)
+        self.ik_worker.kinematics.ik(self.current_head_pose, no_iterations=20)
 
+        self.scheduler.start()
         while not self.should_stop.is_set():
-            start_t = time.time()
-            self._stats["timestamps"].append(time.time())
+            t0 = time.perf_counter()
             self._update()
-            took = time.time() - start_t
-
-            sleep_time = period - took
-            if sleep_time < 0:
-                self.logger.debug(
-                    f"Control loop took too long: {took * 1000:.3f} ms, expected {period * 1000:.3f} ms"
-                )
-                sleep_time = 0.001
-
-            next_call_event.clear()
-            next_call_event.wait(sleep_time)
+            update_duration = time.perf_counter() - t0
+            self.timings.record("update", update_duration)
+            self.observe_update(update_duration)
+            self.record_present_state(update_duration)
+            self.tick_notifier.notify()
+            self.scheduler.wait_next_tick()
 
     def _update(self) -> None:
         assert self.c is not None, "Motor controller not initialized or already closed."
 
+        self.apply_arbitrated_target()
+
         if self._torque_enabled:
             if self._current_head_operation_mode != 0:  # if position control mode
                 if self.target_head_joint_positions is not None:
@@ -189,12 +197,11 @@ class RobotBackend(Backend):
             #            np.round(self.target_antenna_joint_current, 0).astype(int).tolist()
             #         )
 
-        if (
-            self.joint_positions_publisher is not None
-            and self.pose_publisher is not None
-        ):
+        if self.state_publisher is not None:
             try:
+                t0 = time.perf_counter()
                 head_positions, antenna_positions = self.get_all_joint_positions()
+                self.timings.record("serial_read", time.perf_counter() - t0)
 
                 # Update the head kinematics model with the current head positions
                 self.update_head_kinematics_model(
@@ -202,33 +209,20 @@ class RobotBackend(Backend):
                     np.array(antenna_positions),
                 )
 
-                # Update the target head joint positions from IK if necessary
-                # - does nothing if the targets did not change
-                if self.ik_required:
-                    try:
-                        self.update_target_head_joints_from_ik(
-                            self.target_head_pose, self.target_body_yaw
-                        )
-                    except ValueError as e:
-                        log_throttling.by_time(self.logger, interval=0.5).warning(
-                            f"IK error: {e}"
-                        )
+                # Submit the new IK target to the IK worker and apply its latest solution
+                # - never waits for the solver
+                try:
+                    self.update_target_head_joints_from_ik_worker()
+                except ValueError as e:
+                    log_throttling.by_time(self.logger, interval=0.5).warning(
+                        f"IK error: {e}"
+                    )
 
                 if not self.is_shutting_down:
-                    self.joint_positions_publisher.put(
-                        json.dumps(
-                            {
-                                "head_joint_positions": head_positions,
-                                "antennas_joint_positions": antenna_positions,
-                            }
-                        )
-                    )
-                    self.pose_publisher.put(
-                        json.dumps(
-                            {
-                                "head_pose": self.get_present_head_pose().tolist(),
-                            }
-                        )
+                    self.publish_present_state(
+                        head_positions,
+                        antenna_positions,
+                        self.get_present_head_pose(),
                     )
 
                 self.last_alive = time.time()
@@ -236,6 +230,7 @@ class RobotBackend(Backend):
                 self.ready.set()  # Mark the backend as ready
             except RuntimeError as e:
                 self._stats["nb_error"] += 1
+                _control_loop_errors.inc()
 
                 assert self.last_alive is not None
 
@@ -250,19 +245,14 @@ class RobotBackend(Backend):
                     raise e
 
             if time.time() - self.stats_record_t0 > self._stats_record_period:
-                dt = np.diff(self._stats["timestamps"])
-                if len(dt) > 1:
-                    self._status.control_loop_stats["mean_control_loop_frequency"] = (
-                        float(np.mean(1.0 / dt))
-                    )
-                    self._status.control_loop_stats["max_control_loop_interval"] = (
-                        float(np.max(dt))
-                    )
-                    self._status.control_loop_stats["nb_error"] = self._stats[
-                        "nb_error"
-                    ]
+                self._status.control_loop_stats = self.scheduler.get_stats()
+                self._status.control_loop_stats.update(self.timings.summary())
+                self._status.control_loop_stats.update(
+                    self.get_kinematics_cache_stats()
+                )
+                self._status.control_loop_stats.update(self.get_command_arbiter_stats())
+                self._status.control_loop_stats["nb_error"] = self._stats["nb_error"]
 
-                self._stats["timestamps"].clear()
                 self._stats["nb_error"] = 0
                 self.stats_record_t0 = time.time()
 
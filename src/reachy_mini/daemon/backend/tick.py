@@ -0,0 +1,76 @@
+"""Notification of the control loop ticks.
+
+The backend calls `TickNotifier.notify` at the end of each control loop tick, once
+the present state has been read and the targets applied. Streams of the state can
+then wait for the next tick instead of sleeping on their own period, unaligned
+with the control loop: their samples go out right after fresh data is read, never
+twice the same, and their rates are decimations of the control loop rate.
+
+Threads wait with `wait`, coroutines with `wait_async`, from any event loop (they
+are woken up with `loop.call_soon_threadsafe`).
+"""
+
+import asyncio
+import threading
+
+# Nominal frequency of the control loops (in Hz)
+DEFAULT_TICK_FREQUENCY = 50.0
+
+
+class TickNotifier:
+    """Wake up the threads and coroutines waiting for the next control loop tick."""
+
+    def __init__(self, frequency: float = DEFAULT_TICK_FREQUENCY) -> None:
+        """Initialize the notifier.
+
+        Args:
+            frequency (float): Nominal frequency of the ticks (in Hz), set by the backend.
+
+        """
+        self.frequency = frequency
+        self.tick = 0  # Number of ticks since the start of the backend
+
+        self._cond = threading.Condition()
+        self._waiters: list[
+            tuple[asyncio.AbstractEventLoop, "asyncio.Future[int]"]
+        ] = []
+
+    def decimation(self, frequency: float) -> int:
+        """Get the number of ticks between two samples of a stream at the given frequency."""
+        if frequency <= 0.0:
+            raise ValueError("The frequency must be positive.")
+        return max(1, round(self.frequency / frequency))
+
+    def notify(self) -> None:
+        """Signal the end of a tick (called by the control loop)."""
+        with self._cond:
+            self.tick += 1
+            tick = self.tick
+            waiters, self._waiters = self._waiters, []
+            self._cond.notify_all()
+
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_set_tick, future, tick)
+
+    def wait(self, timeout: float | None = None) -> int | None:
+        """Wait for the next tick in a thread, return its number or None on timeout."""
+        with self._cond:
+            tick = self.tick
+            if not self._cond.wait_for(lambda: self.tick != tick, timeout):
+                return None
+            return self.tick
+
+    async def wait_async(self) -> int:
+        """Wait for the next tick in a coroutine and return its number."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
+        with self._cond:
+            self._waiters.append((loop, future))
+        return await future
+
+
+def _set_tick(future: "asyncio.Future[int]", tick: int) -> None:
+    # The waiting coroutine may have been cancelled meanwhile
+    if not future.done():
+        future.set_result(tick)
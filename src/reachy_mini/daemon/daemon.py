@@ -27,6 +27,7 @@ from reachy_mini.io import (
     AsyncWebSocketFrameSender,
     ZenohServer,
 )
+from reachy_mini.io.wire import WireFormat
 from reachy_mini.media.media_manager import MediaManager
 
 from .backend.mujoco import MujocoBackend, MujocoBackendStatus
@@ -46,9 +47,21 @@ class Daemon:
         wireless_version: bool = False,
         stream: bool = False,
         desktop_app_daemon: bool = False,
+        wire_format: WireFormat = WireFormat.BINARY,
+        legacy_topics: bool = True,
+        realtime_priority: int | None = None,
+        cpu_affinity: set[int] | None = None,
     ) -> None:
-        """Initialize the Reachy Mini daemon."""
+        """Initialize the Reachy Mini daemon.
+
+        The realtime_priority and cpu_affinity (SCHED_FIFO priority and CPUs of the
+        control loop thread) only apply to the real robot backend.
+        """
         self.log_level = log_level
+        self.wire_format = wire_format
+        self.legacy_topics = legacy_topics
+        self.realtime_priority = realtime_priority
+        self.cpu_affinity = cpu_affinity
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(self.log_level)
 
@@ -175,6 +188,8 @@ class Daemon:
             prefix=self.robot_name,
             backend=self.backend,
             localhost_only=localhost_only,
+            wire_format=self.wire_format,
+            legacy_topics=self.legacy_topics,
         )
         self.zenoh_server.start()
         self._thread_publish_status = Thread(target=self._publish_status, daemon=True)
@@ -595,6 +610,8 @@ class Daemon:
                 kinematics_engine=kinematics_engine,
                 use_audio=use_audio,
                 hardware_config_filepath=hardware_config_filepath,
+                realtime_priority=self.realtime_priority,
+                cpu_affinity=self.cpu_affinity,
             )
 
 
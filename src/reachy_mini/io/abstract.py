@@ -65,6 +65,15 @@ class AbstractClient(ABC):
         pass
 
     @abstractmethod
-    def wait_for_task_completion(self, task_uid: UUID, timeout: float = 5.0) -> None:
+    def wait_for_task_completion(
+        self, task_uid: UUID, timeout: float | None = 5.0
+    ) -> None:
         """Wait for the specified task to complete."""
         pass
+
+    @abstractmethod
+    async def async_wait_for_task_completion(
+        self, task_uid: UUID, timeout: float | None = 5.0
+    ) -> None:
+        """Asynchronously wait for the specified task to complete."""
+        pass
@@ -11,8 +11,31 @@ import numpy as np
 import numpy.typing as npt
 from websockets.asyncio.client import ClientConnection, connect
 
+from reachy_mini.utils.metrics import metrics
+
 logger = logging.getLogger("reachy_mini.io.audio_ws")
 
+_chunks = metrics.counter(
+    "audio_ws_chunks_total",
+    "Audio messages sent (after batching) and received over the audio WebSocket.",
+    ("direction",),
+)
+_chunks_sent = _chunks.labels(direction="sent")
+_chunks_received = _chunks.labels(direction="received")
+_bytes = metrics.counter(
+    "audio_ws_bytes_total",
+    "Audio bytes sent and received over the audio WebSocket.",
+    ("direction",),
+)
+_bytes_sent = _bytes.labels(direction="sent")
+_bytes_received = _bytes.labels(direction="received")
+_connections = metrics.counter(
+    "audio_ws_connections_total", "Connections of the audio WebSocket."
+)
+_connected = metrics.gauge(
+    "audio_ws_connected", "Whether the audio WebSocket is connected."
+)
+
 
 class AsyncWebSocketAudioStreamer:
     """Async WebSocket audio streamer with send and receive support."""
@@ -64,6 +87,8 @@ class AsyncWebSocketAudioStreamer:
                 async with connect(self.ws_uri) as ws:
                     logger.info("[WS-AUDIO] Connected to Space")
                     self.connected.set()
+                    _connections.inc()
+                    _connected.set(1)
 
                     send_task = asyncio.create_task(self._send_loop(ws))
                     recv_task = asyncio.create_task(self._recv_loop(ws))
@@ -86,6 +111,7 @@ class AsyncWebSocketAudioStreamer:
                 await asyncio.sleep(1.0)
 
             self.connected.clear()
+            _connected.set(0)
 
     async def _send_loop(self, ws: ClientConnection) -> None:
         """Send outgoing audio chunks and keep-alive pings.
@@ -133,6 +159,8 @@ class AsyncWebSocketAudioStreamer:
                 try:
                     # Send the aggregated buffer
                     await ws.send(batch_buffer)  # type: ignore
+                    _chunks_sent.inc()
+                    _bytes_sent.inc(len(batch_buffer))
 
                     # Reset
                     batch_buffer = bytearray()
@@ -169,6 +197,8 @@ class AsyncWebSocketAudioStreamer:
                 break
 
             if isinstance(msg, bytes):
+                _chunks_received.inc()
+                _bytes_received.inc(len(msg))
                 try:
                     self.recv_queue.put_nowait(msg)
                 except Exception as e:
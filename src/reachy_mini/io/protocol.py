@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 
 from reachy_mini.utils.interpolation import InterpolationTechnique
 
@@ -19,9 +19,30 @@ class GotoTaskRequest(BaseModel):
 
 
 class PlayMoveTaskRequest(BaseModel):
-    """Class to represent a play move task."""
+    """Class to represent a play move task, executed by the daemon.
 
-    move_name: str
+    The move is either a recorded move of a Hugging Face dataset (dataset_name and
+    move_name), or a trajectory uploaded by the client, encoded with
+    reachy_mini.io.wire.encode_trajectory (base64 encoded in JSON).
+    """
+
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
+    dataset_name: str | None = None
+    move_name: str | None = None
+    trajectory: bytes | None = None
+    play_frequency: float = 100.0
+    initial_goto_duration: float = 0.0
+
+    @model_validator(mode="after")
+    def check_move(self) -> "PlayMoveTaskRequest":
+        """Check that the request defines exactly one move."""
+        from_dataset = self.dataset_name is not None and self.move_name is not None
+        if from_dataset == (self.trajectory is not None):
+            raise ValueError(
+                "Either dataset_name and move_name, or trajectory must be provided."
+            )
+        return self
 
 
 AnyTaskRequest = GotoTaskRequest | PlayMoveTaskRequest
@@ -41,4 +62,5 @@ class TaskProgress(BaseModel):
     uuid: UUID
     finished: bool = False
     error: str | None = None
+    progress: float | None = None  # fraction of the task completed, in [0, 1]
     timestamp: datetime
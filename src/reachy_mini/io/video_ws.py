@@ -12,8 +12,29 @@ import numpy.typing as npt
 from websockets.asyncio.client import ClientConnection, connect
 from websockets.exceptions import ConnectionClosed
 
+from reachy_mini.utils.metrics import metrics
+
 logger = logging.getLogger("reachy_mini.io.video_ws")
 
+_frames = metrics.counter(
+    "video_ws_frames_total",
+    "Frames given to the WebSocket frame sender, by outcome.",
+    ("result",),
+)
+_frames_sent = _frames.labels(result="sent")
+_frames_deduplicated = _frames.labels(result="deduplicated")
+_frames_dropped = _frames.labels(result="dropped")
+_frames_encode_failed = _frames.labels(result="encode_failed")
+_bytes_sent = metrics.counter(
+    "video_ws_sent_bytes_total", "JPEG bytes sent over the video WebSocket."
+)
+_connections = metrics.counter(
+    "video_ws_connections_total", "Connections of the video WebSocket."
+)
+_connected = metrics.gauge(
+    "video_ws_connected", "Whether the video WebSocket is connected."
+)
+
 
 class AsyncWebSocketFrameSender:
     """Async WebSocket frame sender."""
@@ -62,6 +83,8 @@ class AsyncWebSocketFrameSender:
                 ) as ws:
                     logger.info("[WS Video] Connected to Space")
                     self.connected.set()
+                    _connections.inc()
+                    _connected.set(1)
                     self._clear_queue()  # Ensure we start fresh
 
                     while not self.stop_flag:
@@ -69,6 +92,8 @@ class AsyncWebSocketFrameSender:
                             frame = self.queue.get_nowait()
 
                             await ws.send(frame)
+                            _frames_sent.inc()
+                            _bytes_sent.inc(len(frame))
 
                         except Empty:
                             # Queue is empty, just yield to event loop
@@ -93,6 +118,7 @@ class AsyncWebSocketFrameSender:
                 await asyncio.sleep(1)
 
             self.connected.clear()
+            _connected.set(0)
             self._last_frame = None
 
     def send_frame(self, frame: npt.NDArray[np.uint8]) -> None:
@@ -101,6 +127,7 @@ class AsyncWebSocketFrameSender:
             # 1. Frame Deduplication
             if self._last_frame is not None:
                 if np.array_equal(frame, self._last_frame):
+                    _frames_deduplicated.inc()
                     return
             self._last_frame = frame.copy()
 
@@ -111,6 +138,7 @@ class AsyncWebSocketFrameSender:
                 [int(cv2.IMWRITE_JPEG_QUALITY), 80],
             )
             if not ok:
+                _frames_encode_failed.inc()
                 return
 
             data = jpeg_bytes.tobytes()
@@ -124,6 +152,7 @@ class AsyncWebSocketFrameSender:
                 try:
                     self.queue.get_nowait()  # Pop old frame
                     self.queue.put_nowait(data)  # Push new frame
+                    _frames_dropped.inc()
                 except Empty:
                     logger.error(
                         "[WS Video] Queue is full and empty, this should not happen."
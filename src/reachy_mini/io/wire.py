@@ -0,0 +1,480 @@
+"""Wire formats for the high-rate state topics published by the daemon.
+
+The daemon publishes one robot state sample per control loop tick. Historically
+the state was JSON encoded, which is expensive on the Raspberry Pi when several
+clients are subscribed. This module defines a compact, versioned binary encoding
+for the state topic and the streamed targets, while keeping JSON as a compatibility
+fallback for older clients. The legacy joint_positions and head_pose topics are
+always JSON encoded.
+
+Binary layout (little-endian)::
+
+    offset  size  field
+    0       2     magic, always b"RM"
+    2       1     version (WIRE_VERSION)
+    3       1     message kind (see MessageKind)
+    4       2     number of float64 values in the body
+    6       2     padding
+    8       8     sequence number (uint64), incremented by the publisher
+    16      8     timestamp (float64, publisher monotonic clock, in seconds)
+    24      8*n   body: n float64 values
+
+The body of each message kind is:
+
+- STATE: one consistent robot state sample per control loop tick (see STATE_LAYOUT).
+- TARGET: a full body target streamed by a client (see TARGET_LAYOUT). The header
+  carries the sequence number and timestamp of the client.
+- TARGET_ACK: sent back when a streamed target is applied by the control loop (see
+  TARGET_ACK_LAYOUT). The header echoes the sequence number and timestamp of the
+  applied target.
+
+The daemon REST and WebSocket APIs use the same STATE and TARGET messages for
+their binary mode (`format=binary`, media type `application/octet-stream`).
+
+Trajectories uploaded to the daemon to be played (see `encode_trajectory`) can be
+much longer than a state sample, so they use their own 8-byte header::
+
+    offset  size  field
+    0       2     magic, always b"RM"
+    2       1     version (WIRE_VERSION)
+    3       1     message kind, always MessageKind.TRAJECTORY
+    4       4     number of samples n (uint32)
+    8       8*11*n  body: n samples of TRAJECTORY_SAMPLE_SIZE float64 values (see TRAJECTORY_LAYOUT)
+
+The headers are 8-byte aligned so the body can be decoded without any copy with
+`np.frombuffer`. Decoders detect the format of each sample from its magic bytes:
+anything that does not start with b"RM" is parsed as JSON, so the encoding can be
+chosen per topic on the publisher side without any change on the subscriber side.
+"""
+
+import json
+import math
+import struct
+import time
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from typing import Annotated
+
+import numpy as np
+import numpy.typing as npt
+
+from reachy_mini.utils.quaternion import matrix_to_quat_single, quat_to_pose
+
+WIRE_MAGIC = b"RM"
+WIRE_VERSION = 1
+
+_HEADER = struct.Struct("<2sBBH2xQd")
+_TRAJECTORY_HEADER = struct.Struct("<2sBBI")
+_FLOAT64 = np.dtype("<f8")
+
+
+class WireFormat(str, Enum):
+    """Encoding used to publish a state topic."""
+
+    JSON = "json"
+    BINARY = "binary"
+
+
+class MessageKind(IntEnum):
+    """Kind of message carried by a binary sample."""
+
+    # 1 and 2 were the binary joint_positions and head_pose samples, not reused
+    STATE = 3
+    TRAJECTORY = 4
+    TARGET = 5
+    TARGET_ACK = 6
+
+
+# Motor control modes, in the order of their binary code.
+# Must match the values of reachy_mini.daemon.backend.abstract.MotorControlMode.
+CONTROL_MODES = ("enabled", "disabled", "gravity_compensation")
+
+# Body of a STATE sample: field name -> slice in the float64 body.
+# Targets that are not set yet are encoded as NaN, unknown control modes as -1.
+STATE_LAYOUT = {
+    "control_mode": slice(0, 1),
+    "head_joint_positions": slice(1, 8),
+    "antennas_joint_positions": slice(8, 10),
+    "target_head_joint_positions": slice(10, 17),
+    "target_antennas_joint_positions": slice(17, 19),
+    "head_pose": slice(19, 35),
+}
+STATE_SIZE = 35
+
+# Body of a TARGET message: field name -> slice in the float64 body.
+# The head orientation is a quaternion in scalar-last (x, y, z, w) order. Parts of
+# the target that are not set are encoded as NaN.
+TARGET_LAYOUT = {
+    "head_quaternion": slice(0, 4),
+    "head_translation": slice(4, 7),
+    "antennas": slice(7, 9),
+    "body_yaw": slice(9, 10),
+}
+TARGET_SIZE = 10
+
+# Body of a TARGET_ACK message: field name -> slice in the float64 body.
+# The latency is the time between the reception of the target by the daemon and
+# its application by the control loop (in seconds). Targets received meanwhile were
+# merged into it (coalesced).
+TARGET_ACK_LAYOUT = {
+    "latency": slice(0, 1),
+    "nb_coalesced": slice(1, 2),
+}
+TARGET_ACK_SIZE = 2
+
+# Media type of the binary messages in the daemon HTTP API
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+# One sample of a TRAJECTORY message: field name -> slice in the sample values.
+# The head orientation is a quaternion in scalar-last (x, y, z, w) order.
+TRAJECTORY_LAYOUT = {
+    "time": slice(0, 1),
+    "head_quaternion": slice(1, 5),
+    "head_translation": slice(5, 8),
+    "antennas": slice(8, 10),
+    "body_yaw": slice(10, 11),
+}
+TRAJECTORY_SAMPLE_SIZE = 11
+
+
+@dataclass
+class WireHeader:
+    """Decoded header of a binary sample."""
+
+    version: int
+    kind: int
+    count: int
+    seq: int
+    timestamp: float
+
+
+def is_binary(payload: bytes | bytearray | memoryview) -> bool:
+    """Check whether a payload uses the binary wire format."""
+    return bytes(payload[:2]) == WIRE_MAGIC
+
+
+def encode_values(
+    kind: MessageKind,
+    values: npt.NDArray[np.float64],
+    seq: int,
+    timestamp: float | None = None,
+) -> bytes:
+    """Encode a flat array of float64 values as a binary sample."""
+    body = np.ascontiguousarray(values, dtype=_FLOAT64).ravel()
+    header = _HEADER.pack(
+        WIRE_MAGIC,
+        WIRE_VERSION,
+        int(kind),
+        body.size,
+        seq,
+        time.monotonic() if timestamp is None else timestamp,
+    )
+    return header + body.tobytes()
+
+
+def decode_values(
+    payload: bytes | bytearray | memoryview,
+    expected_kind: MessageKind | None = None,
+) -> tuple[WireHeader, npt.NDArray[np.float64]]:
+    """Decode a binary sample into its header and a read-only float64 view of its body.
+
+    Raises:
+        ValueError: If the payload is not a supported binary sample.
+
+    """
+    if len(payload) < _HEADER.size:
+        raise ValueError("Payload too short to be a binary sample.")
+
+    magic, version, kind, count, seq, timestamp = _HEADER.unpack_from(payload)
+    if magic != WIRE_MAGIC:
+        raise ValueError("Payload is not a binary sample.")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version}.")
+    if expected_kind is not None and kind != expected_kind:
+        raise ValueError(
+            f"Unexpected message kind {kind}, expected {int(expected_kind)}."
+        )
+
+    values = np.frombuffer(payload, dtype=_FLOAT64, count=count, offset=_HEADER.size)
+    return WireHeader(version, kind, count, seq, timestamp), values
+
+
+@dataclass
+class RobotStateSample:
+    """One atomic state sample, published once per control loop tick on the state topic."""
+
+    seq: int
+    timestamp: float  # publisher monotonic clock, in seconds
+    control_mode: str | None
+    head_joint_positions: Annotated[npt.NDArray[np.float64], (7,)]
+    antennas_joint_positions: Annotated[npt.NDArray[np.float64], (2,)]
+    target_head_joint_positions: Annotated[npt.NDArray[np.float64], (7,)] | None
+    target_antennas_joint_positions: Annotated[npt.NDArray[np.float64], (2,)] | None
+    head_pose: Annotated[npt.NDArray[np.float64], (4, 4)]
+
+
+def encode_state(
+    sample: RobotStateSample,
+    wire_format: WireFormat = WireFormat.BINARY,
+) -> bytes:
+    """Encode a robot state sample for the state topic."""
+    if wire_format == WireFormat.JSON:
+        return json.dumps(
+            {
+                "seq": sample.seq,
+                "timestamp": sample.timestamp,
+                "control_mode": sample.control_mode,
+                "head_joint_positions": np.asarray(
+                    sample.head_joint_positions
+                ).tolist(),
+                "antennas_joint_positions": np.asarray(
+                    sample.antennas_joint_positions
+                ).tolist(),
+                "target_head_joint_positions": _optional_list(
+                    sample.target_head_joint_positions
+                ),
+                "target_antennas_joint_positions": _optional_list(
+                    sample.target_antennas_joint_positions
+                ),
+                "head_pose": np.asarray(sample.head_pose).tolist(),
+            }
+        ).encode("utf-8")
+
+    values = np.full(STATE_SIZE, np.nan, dtype=_FLOAT64)
+    values[STATE_LAYOUT["control_mode"]] = (
+        CONTROL_MODES.index(sample.control_mode)
+        if sample.control_mode in CONTROL_MODES
+        else -1
+    )
+    values[STATE_LAYOUT["head_joint_positions"]] = sample.head_joint_positions
+    values[STATE_LAYOUT["antennas_joint_positions"]] = sample.antennas_joint_positions
+    if sample.target_head_joint_positions is not None:
+        values[STATE_LAYOUT["target_head_joint_positions"]] = (
+            sample.target_head_joint_positions
+        )
+    if sample.target_antennas_joint_positions is not None:
+        values[STATE_LAYOUT["target_antennas_joint_positions"]] = (
+            sample.target_antennas_joint_positions
+        )
+    values[STATE_LAYOUT["head_pose"]] = np.asarray(sample.head_pose).ravel()
+
+    return encode_values(MessageKind.STATE, values, sample.seq, sample.timestamp)
+
+
+def decode_state(payload: bytes | bytearray | memoryview) -> RobotStateSample:
+    """Decode a state sample, whatever its wire format."""
+    if is_binary(payload):
+        header, values = decode_values(payload, MessageKind.STATE)
+        mode = int(values[STATE_LAYOUT["control_mode"]][0])
+        return RobotStateSample(
+            seq=header.seq,
+            timestamp=header.timestamp,
+            control_mode=CONTROL_MODES[mode]
+            if 0 <= mode < len(CONTROL_MODES)
+            else None,
+            head_joint_positions=values[STATE_LAYOUT["head_joint_positions"]],
+            antennas_joint_positions=values[STATE_LAYOUT["antennas_joint_positions"]],
+            target_head_joint_positions=_optional_values(
+                values[STATE_LAYOUT["target_head_joint_positions"]]
+            ),
+            target_antennas_joint_positions=_optional_values(
+                values[STATE_LAYOUT["target_antennas_joint_positions"]]
+            ),
+            head_pose=values[STATE_LAYOUT["head_pose"]].reshape(4, 4),
+        )
+
+    state = json.loads(bytes(payload))
+    return RobotStateSample(
+        seq=state["seq"],
+        timestamp=state["timestamp"],
+        control_mode=state["control_mode"],
+        head_joint_positions=np.array(state["head_joint_positions"], dtype=np.float64),
+        antennas_joint_positions=np.array(
+            state["antennas_joint_positions"], dtype=np.float64
+        ),
+        target_head_joint_positions=_optional_array(
+            state["target_head_joint_positions"]
+        ),
+        target_antennas_joint_positions=_optional_array(
+            state["target_antennas_joint_positions"]
+        ),
+        head_pose=np.array(state["head_pose"], dtype=np.float64).reshape(4, 4),
+    )
+
+
+def _optional_list(values: npt.ArrayLike | None) -> list[float] | None:
+    return None if values is None else np.asarray(values).tolist()
+
+
+def _optional_array(values: list[float] | None) -> npt.NDArray[np.float64] | None:
+    return None if values is None else np.array(values, dtype=np.float64)
+
+
+def _optional_values(
+    values: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64] | None:
+    return None if np.isnan(values).all() else values
+
+
+@dataclass
+class TargetSample:
+    """A full body target streamed by a client, parts not set are None."""
+
+    seq: int
+    timestamp: float  # client clock, in seconds
+    head_pose: Annotated[npt.NDArray[np.float64], (4, 4)] | None
+    antennas: Annotated[npt.NDArray[np.float64], (2,)] | None
+    body_yaw: float | None
+
+
+def encode_target(sample: TargetSample) -> bytes:
+    """Encode a full body target as a binary TARGET message."""
+    values = np.full(TARGET_SIZE, np.nan, dtype=_FLOAT64)
+    if sample.head_pose is not None:
+        values[TARGET_LAYOUT["head_quaternion"]] = matrix_to_quat_single(
+            np.asarray(sample.head_pose)
+        )
+        values[TARGET_LAYOUT["head_translation"]] = np.asarray(sample.head_pose)[:3, 3]
+    if sample.antennas is not None:
+        values[TARGET_LAYOUT["antennas"]] = sample.antennas
+    if sample.body_yaw is not None:
+        values[TARGET_LAYOUT["body_yaw"]] = sample.body_yaw
+
+    return encode_values(MessageKind.TARGET, values, sample.seq, sample.timestamp)
+
+
+def decode_target(payload: bytes | bytearray | memoryview) -> TargetSample:
+    """Decode a binary TARGET message.
+
+    Raises:
+        ValueError: If the payload is not a valid target.
+
+    """
+    header, values = decode_values(payload, MessageKind.TARGET)
+    if header.count != TARGET_SIZE:
+        raise ValueError(
+            f"Target should have {TARGET_SIZE} values, got {header.count}."
+        )
+
+    head_pose = None
+    quat = values[TARGET_LAYOUT["head_quaternion"]].tolist()
+    translation = values[TARGET_LAYOUT["head_translation"]].tolist()
+    if not any(math.isnan(v) for v in quat + translation):
+        if not any(quat):
+            raise ValueError("The head quaternion of the target is zero.")
+        head_pose = quat_to_pose(quat, translation)
+    antennas = _optional_values(values[TARGET_LAYOUT["antennas"]])
+    body_yaw = values.item(TARGET_LAYOUT["body_yaw"].start)
+
+    return TargetSample(
+        seq=header.seq,
+        timestamp=header.timestamp,
+        head_pose=head_pose,
+        antennas=None if antennas is None else antennas.copy(),
+        body_yaw=None if math.isnan(body_yaw) else body_yaw,
+    )
+
+
+@dataclass
+class TargetAck:
+    """Acknowledgement of a streamed target applied by the control loop."""
+
+    seq: int
+    timestamp: float  # client clock, in seconds, echoed from the target
+    latency: float  # from the reception to the application of the target, in seconds
+    nb_coalesced: int
+
+
+def encode_target_ack(ack: TargetAck) -> bytes:
+    """Encode the acknowledgement of a target as a binary TARGET_ACK message."""
+    values = np.empty(TARGET_ACK_SIZE, dtype=_FLOAT64)
+    values[TARGET_ACK_LAYOUT["latency"]] = ack.latency
+    values[TARGET_ACK_LAYOUT["nb_coalesced"]] = ack.nb_coalesced
+    return encode_values(MessageKind.TARGET_ACK, values, ack.seq, ack.timestamp)
+
+
+def decode_target_ack(payload: bytes | bytearray | memoryview) -> TargetAck:
+    """Decode a binary TARGET_ACK message.
+
+    Raises:
+        ValueError: If the payload is not a valid acknowledgement.
+
+    """
+    header, values = decode_values(payload, MessageKind.TARGET_ACK)
+    if header.count != TARGET_ACK_SIZE:
+        raise ValueError(
+            f"Target ack should have {TARGET_ACK_SIZE} values, got {header.count}."
+        )
+    return TargetAck(
+        seq=header.seq,
+        timestamp=header.timestamp,
+        latency=values.item(TARGET_ACK_LAYOUT["latency"].start),
+        nb_coalesced=int(values.item(TARGET_ACK_LAYOUT["nb_coalesced"].start)),
+    )
+
+
+@dataclass
+class Trajectory:
+    """Timed head, antennas and body yaw samples of a move uploaded to the daemon."""
+
+    times: Annotated[npt.NDArray[np.float64], (-1,)]
+    head_quaternions: Annotated[npt.NDArray[np.float64], (-1, 4)]
+    head_translations: Annotated[npt.NDArray[np.float64], (-1, 3)]
+    antennas: Annotated[npt.NDArray[np.float64], (-1, 2)]
+    body_yaw: Annotated[npt.NDArray[np.float64], (-1,)]
+
+
+def encode_trajectory(trajectory: Trajectory) -> bytes:
+    """Encode a trajectory as a binary TRAJECTORY message."""
+    n = len(trajectory.times)
+    values = np.empty((n, TRAJECTORY_SAMPLE_SIZE), dtype=_FLOAT64)
+    values[:, TRAJECTORY_LAYOUT["time"]] = np.reshape(trajectory.times, (n, 1))
+    values[:, TRAJECTORY_LAYOUT["head_quaternion"]] = trajectory.head_quaternions
+    values[:, TRAJECTORY_LAYOUT["head_translation"]] = trajectory.head_translations
+    values[:, TRAJECTORY_LAYOUT["antennas"]] = trajectory.antennas
+    values[:, TRAJECTORY_LAYOUT["body_yaw"]] = np.reshape(trajectory.body_yaw, (n, 1))
+
+    header = _TRAJECTORY_HEADER.pack(
+        WIRE_MAGIC, WIRE_VERSION, int(MessageKind.TRAJECTORY), n
+    )
+    return header + values.tobytes()
+
+
+def decode_trajectory(payload: bytes | bytearray | memoryview) -> Trajectory:
+    """Decode a binary TRAJECTORY message.
+
+    The arrays of the returned trajectory are read-only views on the payload.
+
+    Raises:
+        ValueError: If the payload is not a valid trajectory.
+
+    """
+    if len(payload) < _TRAJECTORY_HEADER.size:
+        raise ValueError("Payload too short to be a trajectory.")
+
+    magic, version, kind, n = _TRAJECTORY_HEADER.unpack_from(payload)
+    if magic != WIRE_MAGIC or kind != MessageKind.TRAJECTORY:
+        raise ValueError("Payload is not a trajectory.")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version}.")
+    if n == 0:
+        raise ValueError("Empty trajectory.")
+    expected_size = _TRAJECTORY_HEADER.size + n * TRAJECTORY_SAMPLE_SIZE * 8
+    if len(payload) != expected_size:
+        raise ValueError(
+            f"Trajectory of {n} samples should be {expected_size} bytes, got {len(payload)}."
+        )
+
+    values = np.frombuffer(
+        payload,
+        dtype=_FLOAT64,
+        count=n * TRAJECTORY_SAMPLE_SIZE,
+        offset=_TRAJECTORY_HEADER.size,
+    ).reshape(n, TRAJECTORY_SAMPLE_SIZE)
+    return Trajectory(
+        times=values[:, TRAJECTORY_LAYOUT["time"]].ravel(),
+        head_quaternions=values[:, TRAJECTORY_LAYOUT["head_quaternion"]],
+        head_translations=values[:, TRAJECTORY_LAYOUT["head_translation"]],
+        antennas=values[:, TRAJECTORY_LAYOUT["antennas"]],
+        body_yaw=values[:, TRAJECTORY_LAYOUT["body_yaw"]].ravel(),
+    )
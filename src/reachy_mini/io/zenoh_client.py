@@ -2,14 +2,20 @@
 
 This module implements a Zenoh client that allows communication with the Reachy Mini
 robot. It subscribes to joint positions updates and allows sending commands to the robot.
+
+Besides its blocking methods, the client can be used from an asyncio event loop:
+tasks can be awaited with `async_wait_for_task_completion`, and state samples
+iterated with `state_samples`. The Zenoh callbacks run in Zenoh threads, so they hand
+the samples and task completions over to each loop with `call_soon_threadsafe`.
 """
 
+import asyncio
 import json
 import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 from uuid import UUID, uuid4
 
 import numpy as np
@@ -18,20 +24,38 @@ import zenoh
 
 from reachy_mini.io.abstract import AbstractClient
 from reachy_mini.io.protocol import AnyTaskRequest, TaskProgress, TaskRequest
+from reachy_mini.io.wire import RobotStateSample, decode_state
+from reachy_mini.utils.stats import RollingWindow
+
+# Time without state sample after which the server is considered disconnected (in seconds)
+DEFAULT_LIVENESS_TIMEOUT = 1.0
+# Number of state sample inter-arrival intervals kept to compute the rate statistics
+STATE_INTERVALS_WINDOW_SIZE = 200
+# Time without chunk after which a partially received recording is dropped (in seconds)
+RECORDING_CHUNKS_TIMEOUT = 10.0
 
 
 class ZenohClient(AbstractClient):
     """Zenoh client for Reachy Mini."""
 
-    def __init__(self, prefix: str, localhost_only: bool = True):
+    def __init__(
+        self,
+        prefix: str,
+        localhost_only: bool = True,
+        liveness_timeout: float = DEFAULT_LIVENESS_TIMEOUT,
+    ):
         """Initialize the Zenoh client.
 
         Args:
             prefix: The Zenoh prefix to use for communication (used to identify multiple robots).
             localhost_only: If True, connect to localhost only
+            liveness_timeout: Time without state sample after which the server is considered disconnected (in seconds).
 
         """
         self.prefix = prefix
+        self.liveness_timeout = liveness_timeout
+        # Identifies the commands of this client on the daemon
+        self.source_id = uuid4().hex
 
         if localhost_only:
             c = zenoh.Config.from_json5(
@@ -50,21 +74,15 @@ class ZenohClient(AbstractClient):
                 )
             )
 
-        self.joint_position_received = threading.Event()
-        self.head_pose_received = threading.Event()
+        self.state_received = threading.Event()
         self.status_received = threading.Event()
 
         self.session = zenoh.open(c)
         self.cmd_pub = self.session.declare_publisher(f"{self.prefix}/command")
 
-        self.joint_sub = self.session.declare_subscriber(
-            f"{self.prefix}/joint_positions",
-            self._handle_joint_positions,
-        )
-
-        self.pose_sub = self.session.declare_subscriber(
-            f"{self.prefix}/head_pose",
-            self._handle_head_pose,
+        self.state_sub = self.session.declare_subscriber(
+            f"{self.prefix}/state",
+            self._handle_state,
         )
 
         self.recording_sub = self.session.declare_subscriber(
@@ -77,14 +95,32 @@ class ZenohClient(AbstractClient):
             self._handle_status,
         )
 
-        self._last_head_joint_positions = None
-        self._last_antennas_joint_positions = None
-        self._last_head_pose: Optional[npt.NDArray[np.float64]] = None
+        self._last_state: Optional[RobotStateSample] = None
+        # Event loops iterating over state_samples, and their sample callbacks
+        self._state_listeners: List[
+            tuple[asyncio.AbstractEventLoop, Callable[[RobotStateSample], None]]
+        ] = []
+        self.nb_dropped_samples = 0  # Detected from gaps in the state sequence numbers
         self._recorded_data: Optional[
             List[Dict[str, float | List[float] | List[List[float]]]]
         ] = None
         self._recorded_data_ready = threading.Event()
-        self._is_alive = False
+        self.last_recording_id: Optional[str] = None  # Id of the _recorded_data
+        # Chunks of the recordings being received: recording id -> seq -> records
+        self._recording_chunks: Dict[str, Dict[int, List[Any]]] = {}
+        self._recording_nb_chunks: Dict[str, int] = {}
+        self._recording_last_chunk_time: Dict[str, float] = {}  # time.monotonic()
+        self._recording_lock = threading.Lock()
+        # Liveness watchdog, based on the arrival time of the state samples
+        self._connected = False
+        self._last_state_time: Optional[float] = None  # time.monotonic() of arrival
+        self._state_intervals = RollingWindow(STATE_INTERVALS_WINDOW_SIZE)
+        self._connection_callbacks: Dict[bool, List[Callable[[], None]]] = {
+            True: [],  # reconnection
+            False: [],  # disconnection
+        }
+        self._connection_lock = threading.Lock()
+        self._closed = threading.Event()
         self._last_status: Dict[str, Any] = {}  # contains a DaemonStatus
 
         self.tasks: dict[UUID, TaskState] = {}
@@ -105,9 +141,7 @@ class ZenohClient(AbstractClient):
 
         """
         start = time.time()
-        while not self.joint_position_received.wait(
-            timeout=1.0
-        ) or not self.head_pose_received.wait(timeout=1.0):
+        while not self.state_received.wait(timeout=1.0):
             if time.time() - start > timeout:
                 self.disconnect()
                 raise TimeoutError(
@@ -115,55 +149,167 @@ class ZenohClient(AbstractClient):
                 )
             print("Waiting for connection with the server...")
 
-        self._is_alive = True
-        self._check_alive_evt = threading.Event()
-        threading.Thread(target=self.check_alive, daemon=True).start()
+        self._set_connected(True)
+        threading.Thread(target=self._watchdog, daemon=True).start()
+
+    def _watchdog(self) -> None:
+        """Detect disconnections, waking up only when the last state sample gets stale.
 
-    def check_alive(self) -> None:
-        """Periodically check if the client is still connected to the server."""
-        while True:
-            self._is_alive = self.is_connected()
-            self._check_alive_evt.set()
-            time.sleep(1.0)
+        Reconnections are detected by _handle_state, on the first sample received.
+        """
+        while not self._closed.is_set():
+            if not self._connected:
+                # Re-checked after clearing: a sample received in between reconnected
+                self.state_received.clear()
+                if not self._connected:
+                    self.state_received.wait()
+                continue
+
+            staleness = self.get_staleness()
+            if staleness < self.liveness_timeout:
+                self._closed.wait(self.liveness_timeout - staleness)
+            else:
+                self._set_connected(False)
+
+    def _set_connected(self, connected: bool) -> None:
+        with self._connection_lock:
+            if connected == self._connected:
+                return
+            self._connected = connected
+            callbacks = list(self._connection_callbacks[connected])
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in connection callback: {e}")
 
     def is_connected(self) -> bool:
-        """Check if the client is connected to the server."""
-        self.joint_position_received.clear()
-        self.head_pose_received.clear()
-        return self.joint_position_received.wait(
-            timeout=1.0
-        ) and self.head_pose_received.wait(timeout=1.0)
+        """Check if the client is connected to the server, without blocking.
+
+        The client is connected while the last state sample is not older than the
+        liveness timeout.
+        """
+        return self.get_staleness() < self.liveness_timeout
+
+    def get_staleness(self) -> float:
+        """Get the time since the last state sample was received (in seconds).
+
+        Returns infinity if no sample was received yet.
+        """
+        last = self._last_state_time
+        return float("inf") if last is None else time.monotonic() - last
+
+    def get_state_rate_stats(self) -> Dict[str, Any]:
+        """Get the rate and inter-arrival jitter of the state samples received.
+
+        Intervals and jitter (standard deviation of the intervals) are in milliseconds,
+        computed on the last samples.
+        """
+        intervals = self._state_intervals.values()
+        if len(intervals) == 0:
+            return {}
+        return {
+            "rate_hz": 1.0 / float(np.mean(intervals)),
+            "interval_ms": self._state_intervals.summary(scale=1e3),
+            "jitter_ms": float(np.std(intervals)) * 1e3,
+        }
+
+    def add_disconnect_callback(self, callback: Callable[[], None]) -> None:
+        """Register a function called when the connection with the server is lost.
+
+        Callbacks are called from the watchdog thread, so they should not block.
+        """
+        self._connection_callbacks[False].append(callback)
+
+    def add_reconnect_callback(self, callback: Callable[[], None]) -> None:
+        """Register a function called when the connection with the server comes back.
+
+        Callbacks are called from a Zenoh thread, so they should not block.
+        """
+        self._connection_callbacks[True].append(callback)
 
     def disconnect(self) -> None:
         """Disconnect the client from the server."""
+        self._closed.set()
+        self.state_received.set()  # Wake up the watchdog
         self.session.close()  # type: ignore[no-untyped-call]
 
     def send_command(self, command: str) -> None:
         """Send a command to the server."""
-        if not self._is_alive:
+        if not self.is_connected():
             raise ConnectionError("Lost connection with the server.")
 
         self.cmd_pub.put(command.encode("utf-8"))
 
-    def _handle_joint_positions(self, sample: zenoh.Sample) -> None:
-        """Handle incoming joint positions."""
+    def _handle_state(self, sample: zenoh.Sample) -> None:
+        """Handle incoming robot state samples."""
         if sample.payload:
-            positions = json.loads(sample.payload.to_string())
-            self._last_head_joint_positions = positions.get("head_joint_positions")
-            self._last_antennas_joint_positions = positions.get(
-                "antennas_joint_positions"
-            )
-            self.joint_position_received.set()
+            state = decode_state(sample.payload.to_bytes())
+            last = self._last_state
+            if last is not None and state.seq > last.seq + 1:
+                self.nb_dropped_samples += state.seq - last.seq - 1
+            self._last_state = state
+
+            now = time.monotonic()
+            if self._last_state_time is not None:
+                self._state_intervals.append(now - self._last_state_time)
+            self._last_state_time = now
+            self.state_received.set()
+            if not self._connected and not self._closed.is_set():
+                self._set_connected(True)
+            for loop, push in self._state_listeners:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(push, state)
 
     def _handle_recorded_data(self, sample: zenoh.Sample) -> None:
-        """Handle incoming recorded data."""
-        print("Received recorded data.")
-        if sample.payload:
-            data = json.loads(sample.payload.to_string())
-            self._recorded_data = data
-            self._recorded_data_ready.set()
-        if self._recorded_data is not None:
-            print(f"Recorded data: {len(self._recorded_data)} frames received.")
+        """Handle incoming recorded data chunks, reassembling each recording."""
+        if not sample.payload:
+            return
+        chunk = json.loads(sample.payload.to_string())
+        recording_id = chunk["recording_id"]
+
+        with self._recording_lock:
+            now = time.monotonic()
+            self._drop_stale_recordings(now)
+            self._recording_last_chunk_time[recording_id] = now
+            chunks = self._recording_chunks.setdefault(recording_id, {})
+            chunks[chunk["seq"]] = chunk["records"]
+            if chunk["last"]:
+                if len(chunks) < chunk["seq"] + 1 and (
+                    recording_id not in self._recording_nb_chunks
+                ):
+                    # Some chunks were missed, ask the daemon to publish them again
+                    self.cmd_pub.put(
+                        json.dumps({"get_recording": recording_id}).encode("utf-8")
+                    )
+                self._recording_nb_chunks[recording_id] = chunk["seq"] + 1
+
+            nb_chunks = self._recording_nb_chunks.get(recording_id)
+            if nb_chunks is None or len(chunks) < nb_chunks:
+                return
+
+            self._forget_recording(recording_id)
+            self._recorded_data = [
+                record for seq in range(nb_chunks) for record in chunks[seq]
+            ]
+            self.last_recording_id = recording_id
+        self._recorded_data_ready.set()
+        print(f"Recorded data: {len(self._recorded_data)} frames received.")
+
+    def _drop_stale_recordings(self, now: float) -> None:
+        """Drop the partial recordings whose missing chunks never came (lock held)."""
+        for recording_id, last_chunk_time in list(
+            self._recording_last_chunk_time.items()
+        ):
+            if now - last_chunk_time > RECORDING_CHUNKS_TIMEOUT:
+                self._forget_recording(recording_id)
+
+    def _forget_recording(self, recording_id: str) -> None:
+        """Drop the chunks received for a recording (lock held)."""
+        self._recording_chunks.pop(recording_id, None)
+        self._recording_nb_chunks.pop(recording_id, None)
+        self._recording_last_chunk_time.pop(recording_id, None)
 
     def _handle_status(self, sample: zenoh.Sample) -> None:
         """Handle incoming status updates."""
@@ -174,15 +320,49 @@ class ZenohClient(AbstractClient):
 
     def get_current_joints(self) -> tuple[list[float], list[float]]:
         """Get the current joint positions."""
-        assert (
-            self._last_head_joint_positions is not None
-            and self._last_antennas_joint_positions is not None
-        ), "No joint positions received yet. Wait for the client to connect."
+        state = self._last_state
+        assert state is not None, (
+            "No joint positions received yet. Wait for the client to connect."
+        )
         return (
-            self._last_head_joint_positions.copy(),
-            self._last_antennas_joint_positions.copy(),
+            state.head_joint_positions.tolist(),
+            state.antennas_joint_positions.tolist(),
         )
 
+    async def state_samples(self) -> AsyncIterator[RobotStateSample]:
+        """Iterate over the robot state samples received from the daemon.
+
+        If the iteration is slower than the control loop, the intermediate samples are
+        skipped: each iteration returns the latest sample received.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[RobotStateSample] = asyncio.Queue(maxsize=1)
+
+        def push(state: RobotStateSample) -> None:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(state)
+
+        listener = (loop, push)
+        self._state_listeners = self._state_listeners + [listener]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._state_listeners = [
+                other for other in self._state_listeners if other is not listener
+            ]
+
+    def get_last_state(self) -> RobotStateSample:
+        """Get the last robot state sample received from the daemon.
+
+        All the fields of a sample were read during the same control loop tick.
+        """
+        assert self._last_state is not None, (
+            "No state received yet. Wait for the client to connect."
+        )
+        return self._last_state
+
     def wait_for_recorded_data(self, timeout: float = 5.0) -> bool:
         """Block until the daemon publishes the frames (or timeout)."""
         return self._recorded_data_ready.wait(timeout)
@@ -201,6 +381,27 @@ class ZenohClient(AbstractClient):
             return self._recorded_data.copy()
         return None
 
+    def get_recording(
+        self, recording_id: str, timeout: float = 5.0
+    ) -> List[Dict[str, float | List[float] | List[List[float]]]]:
+        """Fetch a finished recording from the daemon by its id.
+
+        Raises `TimeoutError` if the recording is not received in time.
+        """
+        self._recorded_data_ready.clear()
+        self.send_command(json.dumps({"get_recording": recording_id}))
+
+        deadline = time.time() + timeout
+        while self._recorded_data_ready.wait(max(deadline - time.time(), 0.0)):
+            self._recorded_data_ready.clear()
+            with self._recording_lock:
+                if (
+                    self.last_recording_id == recording_id
+                    and self._recorded_data is not None
+                ):
+                    return self._recorded_data.copy()
+        raise TimeoutError(f"Recording {recording_id} not received in time.")
+
     def get_status(self, wait: bool = True, timeout: float = 5.0) -> Dict[str, Any]:
         """Get the last received status. Returns DaemonStatus as a dict."""
         if wait and not self.status_received.wait(timeout):
@@ -208,21 +409,14 @@ class ZenohClient(AbstractClient):
         self.status_received.clear()  # ready for next run
         return self._last_status
 
-    def _handle_head_pose(self, sample: zenoh.Sample) -> None:
-        """Handle incoming head pose."""
-        if sample.payload:
-            pose = json.loads(sample.payload.to_string())
-            self._last_head_pose = np.array(pose.get("head_pose")).reshape(4, 4)
-            self.head_pose_received.set()
-
     def get_current_head_pose(self) -> npt.NDArray[np.float64]:
         """Get the current head pose."""
-        assert self._last_head_pose is not None, "No head pose received yet."
-        return self._last_head_pose.copy()
+        assert self._last_state is not None, "No head pose received yet."
+        return self._last_state.head_pose.copy()
 
     def send_task_request(self, task_req: AnyTaskRequest) -> UUID:
         """Send a task request to the server."""
-        if not self._is_alive:
+        if not self.is_connected():
             raise ConnectionError("Lost connection with the server.")
 
         task = TaskRequest(uuid=uuid4(), req=task_req, timestamp=datetime.now())
@@ -233,8 +427,10 @@ class ZenohClient(AbstractClient):
 
         return task.uuid
 
-    def wait_for_task_completion(self, task_uid: UUID, timeout: float = 5.0) -> None:
-        """Wait for the specified task to complete."""
+    def wait_for_task_completion(
+        self, task_uid: UUID, timeout: float | None = 5.0
+    ) -> None:
+        """Wait for the specified task to complete (forever if timeout is None)."""
         if task_uid not in self.tasks:
             raise ValueError("Task not found.")
 
@@ -247,16 +443,85 @@ class ZenohClient(AbstractClient):
 
         del self.tasks[task_uid]
 
+    async def async_wait_for_task_completion(
+        self,
+        task_uid: UUID,
+        timeout: float | None = 5.0,
+        start_timeout: float | None = None,
+    ) -> None:
+        """Asynchronously wait for the specified task to complete (forever if timeout is None).
+
+        If start_timeout is given, the timeout is only armed once the daemon reported
+        the first progress of the task (e.g. after compiling a move), which is waited
+        for at most start_timeout seconds.
+        """
+        task = self.tasks.get(task_uid)
+        if task is None:
+            raise ValueError("Task not found.")
+
+        try:
+            if start_timeout is not None:
+                await self._wait_for_task_future(
+                    task.start_futures, lambda: task.started, start_timeout
+                )
+            await self._wait_for_task_future(task.futures, task.event.is_set, timeout)
+
+            if task.error is not None:
+                raise Exception(f"Task failed with error: {task.error}")
+        finally:
+            # Also forget the task on timeout, error or cancellation
+            self.tasks.pop(task_uid, None)
+
+    async def _wait_for_task_future(
+        self,
+        futures: List[tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]],
+        is_done: Callable[[], bool],
+        timeout: float | None,
+    ) -> None:
+        """Wait for a future registered in futures, resolved by the progress handler."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        futures.append((loop, future))
+        if is_done():
+            # Reached before the future was registered
+            _resolve(future)
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Task did not complete in time.")
+        finally:
+            futures.remove((loop, future))
+
     def _handle_task_progress(self, sample: zenoh.Sample) -> None:
         if sample.payload:
             progress = TaskProgress.model_validate_json(sample.payload.to_string())
-            assert progress.uuid in self.tasks, "Unknown task UUID."
+            task = self.tasks.get(progress.uuid)
+            if task is None:
+                # Task sent by another client
+                return
 
             if progress.error:
-                self.tasks[progress.uuid].error = progress.error
+                task.error = progress.error
+
+            if progress.progress is not None:
+                task.progress = progress.progress
+
+            if not task.started:
+                task.started = True
+                for loop, future in list(task.start_futures):
+                    loop.call_soon_threadsafe(_resolve, future)
 
             if progress.finished:
-                self.tasks[progress.uuid].event.set()
+                task.event.set()
+                for loop, future in list(task.futures):
+                    loop.call_soon_threadsafe(_resolve, future)
+
+    def get_task_progress(self, task_uid: UUID) -> float:
+        """Get the last progress reported by the daemon for a task, in [0, 1]."""
+        if task_uid not in self.tasks:
+            raise ValueError("Task not found.")
+        return self.tasks[task_uid].progress
 
 
 @dataclass
@@ -265,3 +530,19 @@ class TaskState:
 
     event: threading.Event
     error: str | None
+    progress: float = 0.0
+    # Set on the first progress message of the daemon
+    started: bool = False
+    # Futures of the event loops awaiting the task
+    futures: List[tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = field(
+        default_factory=list
+    )
+    # Futures of the event loops awaiting the start of the task
+    start_futures: List[tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = (
+        field(default_factory=list)
+    )
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -10,7 +10,10 @@ either on localhost only or to accept connections from other hosts.
 import asyncio
 import json
 import threading
+import time
 from datetime import datetime
+from typing import Any, Coroutine
+from uuid import UUID
 
 import numpy as np
 import zenoh
@@ -23,20 +26,74 @@ from reachy_mini.io.protocol import (
     TaskProgress,
     TaskRequest,
 )
+from reachy_mini.io.wire import WireFormat, decode_trajectory
+from reachy_mini.motion.recorded_move import RecordedMove, get_recorded_moves
+from reachy_mini.utils.metrics import metrics
+
+# Period of the progress updates published while a move is played (in seconds)
+PLAY_MOVE_PROGRESS_PERIOD = 0.1
+
+# Commands counted by name (other keys of the command messages are ignored)
+COMMAND_NAMES = (
+    "torque",
+    "set_target",
+    "head_joint_positions",
+    "head_pose",
+    "body_yaw",
+    "antennas_joint_positions",
+    "gravity_compensation",
+    "automatic_body_yaw",
+    "set_target_record",
+    "start_recording",
+    "stop_recording",
+    "get_recording",
+)
+
+_commands_total = metrics.counter(
+    "zenoh_commands_total", "Commands received over Zenoh.", ("command",)
+)
+_command_duration = metrics.histogram(
+    "zenoh_command_handling_seconds", "Time spent handling a Zenoh command message."
+)
 
 
 class ZenohServer(AbstractServer):
     """Zenoh server for Reachy Mini."""
 
-    def __init__(self, prefix: str, backend: Backend, localhost_only: bool = True):
-        """Initialize the Zenoh server."""
+    def __init__(
+        self,
+        prefix: str,
+        backend: Backend,
+        localhost_only: bool = True,
+        wire_format: WireFormat = WireFormat.BINARY,
+        legacy_topics: bool = True,
+    ):
+        """Initialize the Zenoh server.
+
+        Args:
+            prefix (str): The Zenoh prefix used for all topics (the robot name).
+            backend (Backend): The backend controlled by this server.
+            localhost_only (bool): If True, only accept connections from localhost.
+            wire_format (WireFormat): Encoding of the combined state topic.
+                Use WireFormat.JSON to serve clients that do not support the binary format.
+            legacy_topics (bool): If True, also publish the separate joint_positions and head_pose topics
+                used by older clients, in addition to the combined state topic. They are always JSON
+                encoded, as older clients expect. Enabled by default until the clients
+                reading them are deprecated.
+
+        """
         self.prefix = prefix
         self.localhost_only = localhost_only
         self.backend = backend
+        self.wire_format = wire_format
+        self.legacy_topics = legacy_topics
 
         self._lock = threading.Lock()
         self._cmd_event = threading.Event()
 
+        # All the task requests run on this event loop, in a single thread
+        self._task_loop = asyncio.new_event_loop()
+
     def start(self) -> None:
         """Start the Zenoh server."""
         if self.localhost_only:
@@ -83,19 +140,25 @@ class ZenohServer(AbstractServer):
                 )
             )
 
+        threading.Thread(target=self._task_loop.run_forever, daemon=True).start()
+
         self.session = zenoh.open(c)
         self.sub = self.session.declare_subscriber(
             f"{self.prefix}/command",
             self._handle_command,
         )
-        self.pub = self.session.declare_publisher(f"{self.prefix}/joint_positions")
+        self.pub_state = self.session.declare_publisher(f"{self.prefix}/state")
+        self.backend.set_state_publisher(self.pub_state, self.wire_format)
+
+        if self.legacy_topics:
+            self.pub = self.session.declare_publisher(f"{self.prefix}/joint_positions")
+            self.backend.set_joint_positions_publisher(self.pub)
+            self.pub_pose = self.session.declare_publisher(f"{self.prefix}/head_pose")
+            self.backend.set_pose_publisher(self.pub_pose)
+
         self.pub_record = self.session.declare_publisher(f"{self.prefix}/recorded_data")
-        self.backend.set_joint_positions_publisher(self.pub)
         self.backend.set_recording_publisher(self.pub_record)
 
-        self.pub_pose = self.session.declare_publisher(f"{self.prefix}/head_pose")
-        self.backend.set_pose_publisher(self.pub_pose)
-
         self.task_req_sub = self.session.declare_subscriber(
             f"{self.prefix}/task",
             self._handle_task_request,
@@ -106,17 +169,28 @@ class ZenohServer(AbstractServer):
 
         self.pub_status = self.session.declare_publisher(f"{self.prefix}/daemon_status")
 
+        # Rendered on query only: no cost as long as nobody scrapes the metrics
+        self.metrics_queryable = self.session.declare_queryable(
+            f"{self.prefix}/metrics",
+            self._handle_metrics_query,
+        )
+
     def stop(self) -> None:
         """Stop the Zenoh server."""
         self.session.close()  # type: ignore[no-untyped-call]
+        self._task_loop.call_soon_threadsafe(self._task_loop.stop)
 
     def command_received_event(self) -> threading.Event:
         """Wait for a new command and return it."""
         return self._cmd_event
 
     def _handle_command(self, sample: zenoh.Sample) -> None:
+        t0 = time.perf_counter()
         data = sample.payload.to_string()
         command = json.loads(data)
+        for name in command:
+            if name in COMMAND_NAMES:
+                _commands_total.labels(command=name).inc()
         with self._lock:
             if "torque" in command:
                 if (
@@ -128,20 +202,19 @@ class ZenohServer(AbstractServer):
                         self.backend.set_motor_control_mode(MotorControlMode.Enabled)
                     else:
                         self.backend.set_motor_control_mode(MotorControlMode.Disabled)
+            if "set_target" in command:
+                self._set_target(command["set_target"])
             if "head_joint_positions" in command:
                 self.backend.set_target_head_joint_positions(
                     np.array(command["head_joint_positions"])
                 )
-            if "head_pose" in command:
-                self.backend.set_target_head_pose(
-                    np.array(command["head_pose"]).reshape(4, 4)
-                )
-            if "body_yaw" in command:
-                self.backend.set_target_body_yaw(command["body_yaw"])
-            if "antennas_joint_positions" in command:
-                self.backend.set_target_antenna_joint_positions(
-                    np.array(command["antennas_joint_positions"]),
-                )
+            if (
+                "head_pose" in command
+                or "body_yaw" in command
+                or "antennas_joint_positions" in command
+            ):
+                # Separate target commands of older clients
+                self._set_target(command)
             if "gravity_compensation" in command:
                 try:
                     if command["gravity_compensation"]:
@@ -163,45 +236,138 @@ class ZenohServer(AbstractServer):
                 self.backend.start_recording()
             if "stop_recording" in command:
                 self.backend.stop_recording()
+            if "get_recording" in command:
+                # Read from disk, so published from its own thread
+                threading.Thread(
+                    target=self._publish_recording, args=(command["get_recording"],)
+                ).start()
         self._cmd_event.set()
+        _command_duration.observe(time.perf_counter() - t0)
+
+    def _handle_metrics_query(self, query: zenoh.Query) -> None:
+        query.reply(query.key_expr, metrics.render())
+
+    def _publish_recording(self, recording_id: str) -> None:
+        try:
+            self.backend.publish_recording(recording_id)
+        except KeyError as e:
+            print(e)
+
+    def _set_target(self, target: dict[str, Any]) -> None:
+        """Submit a coalesced set_target command to the backend command arbiter.
+
+        The command holds any of head_pose, antennas_joint_positions and body_yaw,
+        the source id and priority of the client (see daemon/backend/arbiter.py), and
+        a record flag set by the client only while it is recording. The record is
+        then built here from the targets, so no record payload goes over the network.
+        """
+        head_pose = target.get("head_pose")
+        antennas = target.get("antennas_joint_positions")
+        body_yaw = target.get("body_yaw")
+
+        self.backend.command_arbiter.submit(
+            source=target.get("source", "zenoh"),
+            head=np.array(head_pose).reshape(4, 4) if head_pose is not None else None,
+            antennas=np.array(antennas) if antennas is not None else None,
+            body_yaw=body_yaw,
+            priority=target.get("priority", 0),
+        )
+
+        if target.get("record", False):
+            record: dict[str, Any] = {
+                "time": time.time(),
+                "body_yaw": body_yaw if body_yaw is not None else 0.0,
+            }
+            if head_pose is not None:
+                record["head"] = head_pose
+            if antennas is not None:
+                record["antennas"] = antennas
+            self.backend.append_record(record)
 
     def _handle_task_request(self, sample: zenoh.Sample) -> None:
         task_req = TaskRequest.model_validate_json(sample.payload.to_string())
 
+        task: Coroutine[Any, Any, None]
         if isinstance(task_req.req, GotoTaskRequest):
             req = task_req.req
-
-            def task() -> None:
-                asyncio.run(
-                    self.backend.goto_target(
-                        head=np.array(req.head).reshape(4, 4) if req.head else None,
-                        antennas=np.array(req.antennas) if req.antennas else None,
-                        duration=req.duration,
-                        method=req.method,
-                        body_yaw=req.body_yaw,
-                    )
-                )
+            # Preempts or blends into the active goto (see backend/motion_executor.py)
+            task = self.backend.goto_target(
+                head=np.array(req.head).reshape(4, 4) if req.head else None,
+                antennas=np.array(req.antennas) if req.antennas else None,
+                duration=req.duration,
+                method=req.method,
+                body_yaw=req.body_yaw,
+            )
         elif isinstance(task_req.req, PlayMoveTaskRequest):
+            task = self._play_move(task_req.uuid, task_req.req)
+        else:
+            assert False, f"Unknown task request type {task_req.req.__class__.__name__}"
 
-            def task() -> None:
-                print("PLAY MOVE")
+        asyncio.run_coroutine_threadsafe(
+            self._run_task(task_req.uuid, task), self._task_loop
+        )
 
+    async def _run_task(self, uuid: UUID, task: Coroutine[Any, Any, None]) -> None:
+        """Run a task on the task loop, then publish its completion."""
+        error = None
+        try:
+            await task
+        except Exception as e:
+            error = str(e)
+
+        self._publish_task_progress(
+            uuid,
+            finished=True,
+            error=error,
+            progress=1.0 if error is None else None,
+        )
+
+    async def _play_move(self, uuid: UUID, req: PlayMoveTaskRequest) -> None:
+        """Play the move of a request, publishing its progress until it ends."""
+        if req.trajectory is not None:
+            move = RecordedMove.from_trajectory(decode_trajectory(req.trajectory))
         else:
-            assert False, f"Unknown task request type {task_req.req.__class__.__name__}"
+            assert req.dataset_name is not None and req.move_name is not None
+            # May download the dataset, so kept off the task loop
+            moves = await asyncio.to_thread(get_recorded_moves, req.dataset_name)
+            move = moves.get(req.move_name)
+
+        duration = req.initial_goto_duration + move.duration
+        # Set once the move is compiled, the progress is only published from then on
+        started_at: list[float] = []
 
-        def wrapped_task() -> None:
-            error = None
-            try:
-                task()
-            except Exception as e:
-                error = str(e)
-
-            progress = TaskProgress(
-                uuid=task_req.uuid,
-                finished=True,
-                error=error,
-                timestamp=datetime.now(),
+        def on_started() -> None:
+            started_at.append(time.monotonic())
+            self._publish_task_progress(uuid, progress=0.0)
+
+        play = asyncio.create_task(
+            self.backend.play_move(
+                move,
+                play_frequency=req.play_frequency,
+                initial_goto_duration=req.initial_goto_duration,
+                on_started=on_started,
             )
-            self.task_progress_pub.put(progress.model_dump_json())
+        )
 
-        threading.Thread(target=wrapped_task).start()
+        while not play.done():
+            await asyncio.wait({play}, timeout=PLAY_MOVE_PROGRESS_PERIOD)
+            if not play.done() and started_at and duration > 0.0:
+                elapsed = time.monotonic() - started_at[0]
+                self._publish_task_progress(uuid, progress=min(elapsed / duration, 1.0))
+        await play
+
+    def _publish_task_progress(
+        self,
+        uuid: UUID,
+        finished: bool = False,
+        error: str | None = None,
+        progress: float | None = None,
+    ) -> None:
+        progress_msg = TaskProgress(
+            uuid=uuid,
+            finished=finished,
+            error=error,
+            progress=progress,
+            timestamp=datetime.now(),
+        )
+        self.task_progress_pub.put(progress_msg.model_dump_json())
@@ -30,6 +30,22 @@ except ImportError:
                 "NNKinematics could not be imported. Make sure you run pip install reachy_mini[nn_kinematics]."
             )
 
+        def ik_batch(  # type: ignore[no-untyped-def]
+            self, *args, **kwargs
+        ) -> Annotated[npt.NDArray[np.float64], (-1, 7)]:
+            """Mockup method for ik_batch."""
+            raise ImportError(
+                "NNKinematics could not be imported. Make sure you run pip install reachy_mini[nn_kinematics]."
+            )
+
+        def fk_batch(  # type: ignore[no-untyped-def]
+            self, *args, **kwargs
+        ) -> Annotated[npt.NDArray[np.float64], (-1, 4, 4)]:
+            """Mockup method for fk_batch."""
+            raise ImportError(
+                "NNKinematics could not be imported. Make sure you run pip install reachy_mini[nn_kinematics]."
+            )
+
     NNKinematics = MockupNNKinematics  # type: ignore[assignment, misc]
 
 try:
@@ -57,6 +73,22 @@ except ImportError:
                 "PlacoKinematics could not be imported. Make sure you run pip install reachy_mini[placo_kinematics]."
             )
 
+        def ik_batch(  # type: ignore[no-untyped-def]
+            self, *args, **kwargs
+        ) -> Annotated[npt.NDArray[np.float64], (-1, 7)]:
+            """Mockup method for ik_batch."""
+            raise ImportError(
+                "PlacoKinematics could not be imported. Make sure you run pip install reachy_mini[placo_kinematics]."
+            )
+
+        def fk_batch(  # type: ignore[no-untyped-def]
+            self, *args, **kwargs
+        ) -> Annotated[npt.NDArray[np.float64], (-1, 4, 4)]:
+            """Mockup method for fk_batch."""
+            raise ImportError(
+                "PlacoKinematics could not be imported. Make sure you run pip install reachy_mini[placo_kinematics]."
+            )
+
     PlacoKinematics = MockupPlacoKinematics  # type: ignore[assignment, misc]
 
 
@@ -141,6 +141,71 @@ class AnalyticalKinematics:
 
         return T_world_platform
 
+    def ik_batch(
+        self,
+        poses: Annotated[NDArray[np.float64], (-1, 4, 4)],
+        body_yaws: Annotated[NDArray[np.float64], (-1,)] | None = None,
+    ) -> Annotated[NDArray[np.float64], (-1, 7)]:
+        """Compute the inverse kinematics for a batch of head poses.
+
+        Args:
+            poses (np.ndarray): N 4x4 head poses.
+            body_yaws (np.ndarray | None): N body yaw angles, zeros if None.
+
+        Returns:
+            np.ndarray: The N x 7 head joint positions.
+
+        """
+        _poses = np.array(poses, dtype=np.float64)
+        _poses[:, 2, 3] += self.head_z_offset
+        _body_yaws = (
+            np.zeros(len(_poses))
+            if body_yaws is None
+            else np.asarray(body_yaws, dtype=np.float64)
+        )
+
+        joints = np.empty((len(_poses), 7))
+        if self.automatic_body_yaw:
+            max_relative_yaw = np.deg2rad(65)
+            max_body_yaw = np.deg2rad(160)
+            for i in range(len(_poses)):
+                joints[i] = self.kin.inverse_kinematics_safe(
+                    _poses[i],  # type: ignore[arg-type]
+                    body_yaw=_body_yaws[i],
+                    max_relative_yaw=max_relative_yaw,
+                    max_body_yaw=max_body_yaw,
+                )
+        else:
+            joints[:, 0] = _body_yaws
+            for i in range(len(_poses)):
+                joints[i, 1:] = self.kin.inverse_kinematics(_poses[i], _body_yaws[i])  # type: ignore[arg-type]
+
+        return joints
+
+    def fk_batch(
+        self,
+        joint_angles: Annotated[NDArray[np.float64], (-1, 7)],
+        no_iterations: int = 3,
+    ) -> Annotated[NDArray[np.float64], (-1, 4, 4)]:
+        """Compute the forward kinematics for a batch of joint positions.
+
+        The numerical solver is warm-started from the previous solution, so the
+        batch is best ordered like a trajectory (consecutive joints close to each other).
+
+        Args:
+            joint_angles (np.ndarray): N x 7 head joint positions.
+            no_iterations (int): Number of Newton iterations per joint positions.
+
+        Returns:
+            np.ndarray: The N 4x4 head poses.
+
+        """
+        joint_angles = np.asarray(joint_angles, dtype=np.float64)
+        poses = np.empty((len(joint_angles), 4, 4))
+        for i in range(len(joint_angles)):
+            poses[i] = self.fk(joint_angles[i], no_iterations=no_iterations)
+        return poses
+
     def set_automatic_body_yaw(self, automatic_body_yaw: bool) -> None:
         """Set the automatic body yaw.
 
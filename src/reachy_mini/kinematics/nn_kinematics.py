@@ -1,5 +1,6 @@
 """Neural Network based FK/IK."""
 
+import os
 import time
 from typing import Annotated
 
@@ -19,6 +20,14 @@ class NNKinematics:
         self.fk_infer = OnnxInfer(self.fk_model_path)
         self.ik_infer = OnnxInfer(self.ik_model_path)
 
+        # Same network exported with a dynamic batch size, used by fk_batch
+        fk_batch_model_path = f"{models_root_path}/fknetwork.dynamic.onnx"
+        self.fk_batch_infer = (
+            OnnxInfer(fk_batch_model_path)
+            if os.path.exists(fk_batch_model_path)
+            else self.fk_infer
+        )
+
         self.automatic_body_yaw = False  # No used, kept for canaompatibility
 
     def ik(
@@ -59,6 +68,60 @@ class NNKinematics:
         pose[:3, :3] = R.from_euler("xyz", [roll, pitch, yaw]).as_matrix()
         return pose
 
+    def ik_batch(
+        self,
+        poses: Annotated[npt.NDArray[np.float64], (-1, 4, 4)],
+        body_yaws: Annotated[npt.NDArray[np.float64], (-1,)] | None = None,
+    ) -> Annotated[npt.NDArray[np.float64], (-1, 7)]:
+        """Compute the inverse kinematics for a batch of head poses.
+
+        The whole batch goes through a single inference if the IK network has a
+        dynamic batch size.
+
+        Args:
+            poses (np.ndarray): N 4x4 head poses.
+            body_yaws (np.ndarray | None): N body yaw angles, zeros if None.
+
+        Returns:
+            np.ndarray: The N x 7 head joint positions.
+
+        """
+        poses = np.asarray(poses, dtype=np.float64)
+        body_yaws = (
+            np.zeros(len(poses))
+            if body_yaws is None
+            else np.asarray(body_yaws, dtype=np.float64)
+        )
+
+        inputs = np.empty((len(poses), 6))
+        inputs[:, :3] = poses[:, :3, 3]
+        inputs[:, 3:] = R.from_matrix(poses[:, :3, :3]).as_euler("xyz")
+        inputs[:, 5] += body_yaws
+
+        joints = self.ik_infer.infer_batch(inputs).astype(np.float64)
+        joints[:, 0] += body_yaws
+        return joints
+
+    def fk_batch(
+        self,
+        joint_angles: Annotated[npt.NDArray[np.float64], (-1, 7)],
+    ) -> Annotated[npt.NDArray[np.float64], (-1, 4, 4)]:
+        """Compute the forward kinematics for a batch of joint positions, in a single inference.
+
+        Args:
+            joint_angles (np.ndarray): N x 7 head joint positions.
+
+        Returns:
+            np.ndarray: The N 4x4 head poses.
+
+        """
+        outputs = self.fk_batch_infer.infer_batch(np.asarray(joint_angles))
+
+        poses = np.tile(np.eye(4), (len(outputs), 1, 1))
+        poses[:, :3, 3] = outputs[:, :3]
+        poses[:, :3, :3] = R.from_euler("xyz", outputs[:, 3:]).as_matrix()
+        return poses
+
     def set_automatic_body_yaw(self, automatic_body_yaw: bool) -> None:
         """Set the automatic body yaw.
 
@@ -85,6 +148,27 @@ class OnnxInfer:
         res: npt.NDArray[np.float64] = outputs[0][0]
         return res
 
+    def infer_batch(self, inputs: npt.NDArray[np.float64]) -> npt.NDArray[np.float32]:
+        """Run inference on a batch of inputs (one per row).
+
+        The batch goes through a single run if the model has a dynamic batch size,
+        otherwise it is split into chunks of the fixed batch size of the model.
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        batch_size = self.ort_session.get_inputs()[0].shape[0]
+        if not isinstance(batch_size, int):
+            res: npt.NDArray[np.float32] = self.ort_session.run(
+                None, {"input": inputs}
+            )[0]
+            return res
+
+        return np.concatenate(
+            [
+                self.ort_session.run(None, {"input": inputs[i : i + batch_size]})[0]
+                for i in range(0, len(inputs), batch_size)
+            ]
+        )
+
 
 if __name__ == "__main__":
     nn_kin = NNKinematics(
@@ -491,6 +491,59 @@ class PlacoKinematics:
 
         return T_world_head
 
+    def ik_batch(
+        self,
+        poses: Annotated[npt.NDArray[np.float64], (-1, 4, 4)],
+        body_yaws: Annotated[npt.NDArray[np.float64], (-1,)] | None = None,
+        no_iterations: int = 2,
+    ) -> Annotated[npt.NDArray[np.float64], (-1, 7)]:
+        """Compute the inverse kinematics for a batch of head poses.
+
+        Placo solves one pose at a time, so this loops over `ik`. The solver is
+        warm-started from the previous solution, so the batch is best ordered like
+        a trajectory.
+
+        Args:
+            poses (np.ndarray): N 4x4 head poses.
+            body_yaws (np.ndarray | None): N body yaw angles, zeros if None.
+            no_iterations (int): Number of iterations per pose (default: 2).
+
+        Returns:
+            np.ndarray: The N x 7 head joint positions, NaN for the poses without solution.
+
+        """
+        joints = np.full((len(poses), 7), np.nan)
+        for i, pose in enumerate(poses):
+            body_yaw = 0.0 if body_yaws is None else float(body_yaws[i])
+            sol = self.ik(pose, body_yaw=body_yaw, no_iterations=no_iterations)
+            if sol is not None:
+                joints[i] = sol
+        return joints
+
+    def fk_batch(
+        self,
+        joints_angles: Annotated[npt.NDArray[np.float64], (-1, 7)],
+        no_iterations: int = 2,
+    ) -> Annotated[npt.NDArray[np.float64], (-1, 4, 4)]:
+        """Compute the forward kinematics for a batch of joint positions.
+
+        Placo solves one configuration at a time, so this loops over `fk`.
+
+        Args:
+            joints_angles (np.ndarray): N x 7 head joint positions.
+            no_iterations (int): Number of iterations per configuration (default: 2).
+
+        Returns:
+            np.ndarray: The N 4x4 head poses, NaN for the configurations without solution.
+
+        """
+        poses = np.full((len(joints_angles), 4, 4), np.nan)
+        for i, joints in enumerate(joints_angles):
+            pose = self.fk(joints, no_iterations=no_iterations)
+            if pose is not None:
+                poses[i] = pose
+        return poses
+
     def config_collision_model(self) -> None:
         """Configure the collision model for the robot.
 
@@ -3,7 +3,9 @@
 Provides camera and audio access based on the selected backedn
 """
 
+import functools
 import logging
+import weakref
 from enum import Enum
 from typing import Optional
 
@@ -12,9 +14,31 @@ import numpy.typing as npt
 
 from reachy_mini.media.audio_base import AudioBase
 from reachy_mini.media.camera_base import CameraBase
+from reachy_mini.utils.metrics import metrics
 
 # actual backends are dynamically imported
 
+_frames = metrics.counter(
+    "media_camera_frames_total",
+    "Camera reads, by whether a frame was available.",
+    ("result",),
+)
+_frames_read = _frames.labels(result="read")
+_frames_missed = _frames.labels(result="missed")
+_audio_samples = metrics.counter(
+    "media_audio_samples_total",
+    "Audio samples recorded (read or missing) and pushed to the output device.",
+    ("result",),
+)
+_audio_samples_read = _audio_samples.labels(result="read")
+_audio_samples_missed = _audio_samples.labels(result="missed")
+_audio_samples_pushed = _audio_samples.labels(result="pushed")
+_audio_input_events = metrics.counter(
+    "media_audio_input_events_total",
+    "Underflows and overflows of the audio input buffer (SoundDevice backend).",
+    ("event",),
+)
+
 
 class MediaBackend(Enum):
     """Media backends."""
@@ -64,6 +88,13 @@ class MediaManager:
             case _:
                 raise NotImplementedError(f"Media backend {backend} not implemented.")
 
+        # Read at scrape time from the audio backends which count them
+        manager = weakref.ref(self)
+        for event in ("input_underflows", "input_overflows"):
+            _audio_input_events.labels(event=event).set_function(
+                functools.partial(_read_audio_input_event, manager, event)
+            )
+
     def close(self) -> None:
         """Close the media manager and release resources."""
         if self.camera is not None:
@@ -113,7 +144,12 @@ class MediaManager:
         if self.camera is None:
             self.logger.warning("Camera is not initialized.")
             return None
-        return self.camera.read()
+        frame = self.camera.read()
+        if frame is None:
+            _frames_missed.inc()
+        else:
+            _frames_read.inc()
+        return frame
 
     def _init_audio(self, log_level: str) -> None:
         """Initialize the audio system."""
@@ -186,7 +222,12 @@ class MediaManager:
         if self.audio is None:
             self.logger.warning("Audio system is not initialized.")
             return None
-        return self.audio.get_audio_sample()
+        sample = self.audio.get_audio_sample()
+        if sample is None:
+            _audio_samples_missed.inc()
+        else:
+            _audio_samples_read.inc()
+        return sample
 
     def get_input_audio_samplerate(self) -> int:
         """Get the input samplerate of the audio device."""
@@ -265,6 +306,7 @@ class MediaManager:
             data = data[:, :output_channels]
 
         self.audio.push_audio_sample(data)
+        _audio_samples_pushed.inc()
 
     def stop_playing(self) -> None:
         """Stop playing audio."""
@@ -272,3 +314,14 @@ class MediaManager:
             self.logger.warning("Audio system is not initialized.")
             return
         self.audio.stop_playing()
+
+
+def _read_audio_input_event(
+    manager: "weakref.ref[MediaManager]", event: str
+) -> float | None:
+    """Read an audio input event counter for the metrics (None if not available)."""
+    instance = manager()
+    if instance is None:
+        return None
+    count: int | None = getattr(instance.audio, "_logs", {}).get(event)
+    return count
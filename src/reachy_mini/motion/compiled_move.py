@@ -0,0 +1,218 @@
+"""Joint-space compilation of moves.
+
+Playing a move by evaluating it in task space at each step means interpolating
+the head pose and then solving the IK of every sample in the control loop. For
+moves known in advance (e.g. recorded moves), this work can be done once:
+`compile_move` samples the move at the playback frequency, solves the IK of the
+whole trajectory in a single batch and stores the resulting joint positions.
+Playing the compiled move then only streams joint targets, without any IK.
+
+Compiled moves are kept in a process-wide LRU cache (`compiled_moves`), keyed on
+the move fingerprint, the kinematics engine, its automatic body yaw setting and the
+sampling frequency.
+"""
+
+import threading
+import typing
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Annotated
+
+import numpy as np
+import numpy.typing as npt
+
+from reachy_mini.motion.move import JointMove, Move
+
+if typing.TYPE_CHECKING:
+    from reachy_mini.kinematics import AnyKinematics
+
+
+@dataclass
+class CompiledMove(JointMove):
+    """Joint-space trajectory of a move, sampled at a fixed frequency."""
+
+    frequency: float
+    head_joint_positions: Annotated[npt.NDArray[np.float64], (-1, 7)]
+    antennas_joint_positions: Annotated[npt.NDArray[np.float64], (-1, 2)]
+    # Task-space target at the end of the move
+    final_head_pose: Annotated[npt.NDArray[np.float64], (4, 4)]
+    final_body_yaw: float
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self.head_joint_positions)
+
+    @property
+    def duration(self) -> float:
+        """Duration of the compiled move in seconds."""
+        return len(self) / self.frequency
+
+    def sample(
+        self, t: float
+    ) -> tuple[
+        Annotated[npt.NDArray[np.float64], (7,)],
+        Annotated[npt.NDArray[np.float64], (2,)],
+    ]:
+        """Get the head and antennas joint positions of the sample at time t."""
+        index = min(max(int(t * self.frequency), 0), len(self) - 1)
+        return self.head_joint_positions[index], self.antennas_joint_positions[index]
+
+    def evaluate_joints(
+        self, t: float
+    ) -> tuple[
+        Annotated[npt.NDArray[np.float64], (7,)],
+        Annotated[npt.NDArray[np.float64], (2,)],
+    ]:
+        """Get the head and antennas joint positions at time t."""
+        return self.sample(t)
+
+    def end_target(
+        self,
+    ) -> tuple[Annotated[npt.NDArray[np.float64], (4, 4)], float]:
+        """Get the task-space target at the end of the move."""
+        return self.final_head_pose, self.final_body_yaw
+
+
+def compile_move(
+    move: Move,
+    kinematics: "AnyKinematics",
+    frequency: float,
+) -> CompiledMove:
+    """Sample a move at the given frequency and solve its IK in batch.
+
+    Samples whose head pose is not reachable keep the joint positions of the
+    previous sample, as the control loop does when the IK fails.
+
+    Raises:
+        ValueError: If the move does not define the head pose, or if its first pose is not reachable.
+
+    """
+    ts = np.arange(0.0, move.duration, 1.0 / frequency)
+    n = len(ts)
+
+    evaluate_many = getattr(move, "evaluate_many", None)
+    if evaluate_many is not None:
+        # Vectorized evaluation (e.g. RecordedMove)
+        head_poses, antennas, body_yaws = evaluate_many(ts)
+    else:
+        head_poses = np.empty((n, 4, 4))
+        antennas = np.zeros((n, 2))
+        body_yaws = np.zeros(n)
+        for i, t in enumerate(ts):
+            head, antennas_i, body_yaw = move.evaluate(float(t))
+            if head is None:
+                raise ValueError("Only moves defining the head pose can be compiled.")
+            head_poses[i] = head
+            if antennas_i is not None:
+                antennas[i] = antennas_i
+            if body_yaw is not None:
+                body_yaws[i] = body_yaw
+
+    head_joints = kinematics.ik_batch(head_poses, body_yaws)
+
+    unreachable = np.flatnonzero(np.isnan(head_joints).any(axis=1))
+    if len(unreachable) > 0:
+        if unreachable[0] == 0:
+            raise ValueError("The first head pose of the move is not reachable.")
+        # Forward-fill the unreachable samples with the last reachable joints
+        indices = np.arange(n)
+        indices[unreachable] = 0
+        last_valid = np.maximum.accumulate(indices)
+        head_joints = head_joints[last_valid]
+
+    return CompiledMove(
+        frequency=frequency,
+        head_joint_positions=head_joints,
+        antennas_joint_positions=antennas,
+        final_head_pose=head_poses[-1],
+        final_body_yaw=float(body_yaws[-1]),
+    )
+
+
+class CompiledMoveCache:
+    """Thread-safe LRU cache of compiled moves."""
+
+    def __init__(self, maxsize: int = 32) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of compiled moves kept.
+
+        """
+        self.maxsize = maxsize
+        self._moves: OrderedDict[tuple[str, str, bool, float], CompiledMove] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # Locks serializing the compilations on each kinematics instance
+        self._kinematics_locks: weakref.WeakKeyDictionary[
+            "AnyKinematics", threading.Lock
+        ] = weakref.WeakKeyDictionary()
+
+    def kinematics_lock(self, kinematics: "AnyKinematics") -> threading.Lock:
+        """Get the lock held while compiling with a kinematics instance.
+
+        The kinematics engines keep an internal state, so they must not solve two
+        compilations at once, nor be reconfigured during a compilation.
+        """
+        with self._lock:
+            lock = self._kinematics_locks.get(kinematics)
+            if lock is None:
+                lock = self._kinematics_locks[kinematics] = threading.Lock()
+            return lock
+
+    def get_or_compile(
+        self,
+        fingerprint: str,
+        move: Move,
+        kinematics: "AnyKinematics",
+        kinematics_engine: str,
+        frequency: float,
+    ) -> CompiledMove:
+        """Get the compiled move from the cache, compiling it on a miss.
+
+        The move is compiled without holding the cache lock, so a slow compilation
+        does not block the lookups of the other moves. Compilations on the same
+        kinematics instance are serialized (see `kinematics_lock`). If the same move is
+        compiled twice concurrently, the first one inserted is kept.
+
+        Args:
+            fingerprint (str): Fingerprint identifying the content of the move.
+            move (Move): The move to compile on a miss.
+            kinematics (AnyKinematics): Kinematics instance used to compile on a miss.
+            kinematics_engine (str): Name of the kinematics engine, part of the cache key.
+            frequency (float): Sampling frequency, part of the cache key.
+
+        """
+        key = (
+            fingerprint,
+            kinematics_engine,
+            kinematics.automatic_body_yaw,
+            frequency,
+        )
+        with self._lock:
+            compiled = self._moves.get(key)
+            if compiled is not None:
+                self._moves.move_to_end(key)
+                return compiled
+
+        with self.kinematics_lock(kinematics):
+            # The setting may have changed meanwhile, the key is the one compiled with
+            key = key[:2] + (kinematics.automatic_body_yaw,) + key[3:]
+            compiled = compile_move(move, kinematics, frequency)
+
+        with self._lock:
+            compiled = self._moves.setdefault(key, compiled)
+            self._moves.move_to_end(key)
+            if len(self._moves) > self.maxsize:
+                self._moves.popitem(last=False)
+            return compiled
+
+    def clear(self) -> None:
+        """Remove all the compiled moves."""
+        with self._lock:
+            self._moves.clear()
+
+
+compiled_moves = CompiledMoveCache()
@@ -1,19 +1,29 @@
-"""A goto move to a target head pose and/or antennas position."""
+"""Goto moves to a target head pose and/or antennas position."""
 
 import numpy as np
 import numpy.typing as npt
+from scipy.spatial.transform import Rotation as R
 
 from reachy_mini.utils.interpolation import (
     InterpolationTechnique,
-    linear_pose_interpolation,
+    MinimumJerkTrajectory,
+    linear_pose_interpolation_many,
     time_trajectory,
 )
+from reachy_mini.utils.quaternion import (
+    matrix_to_quat_single,
+    quat_rotvec_pose,
+    quat_slerp_pose,
+)
 
-from .move import Move
+from .move import JointMove, Move
 
 
 class GotoMove(Move):
-    """A goto move to a target head pose and/or antennas position."""
+    """A goto move to a target head pose and/or antennas position.
+
+    A goto with no duration is at its target from the start.
+    """
 
     def __init__(
         self,
@@ -43,6 +53,12 @@ class GotoMove(Move):
         self._duration = duration
         self.method = method
 
+        # Precomputed once, evaluate is called at each control loop tick
+        self._start_quat = matrix_to_quat_single(self.start_head_pose)
+        self._start_translation = self.start_head_pose[:3, 3].tolist()
+        self._target_quat = matrix_to_quat_single(self.target_head_pose)
+        self._target_translation = self.target_head_pose[:3, 3].tolist()
+
     @property
     def duration(self) -> float:
         """Duration of the goto in seconds."""
@@ -54,10 +70,18 @@ class GotoMove(Move):
         npt.NDArray[np.float64] | None, npt.NDArray[np.float64] | None, float | None
     ]:
         """Evaluate the goto at time t."""
-        interp_time = time_trajectory(t / self.duration, method=self.method)
+        interp_time = (
+            time_trajectory(t / self.duration, method=self.method)
+            if self.duration > 0.0
+            else 1.0
+        )
 
-        interp_head_pose = linear_pose_interpolation(
-            self.start_head_pose, self.target_head_pose, interp_time
+        interp_head_pose = quat_slerp_pose(
+            self._start_quat,
+            self._start_translation,
+            self._target_quat,
+            self._target_translation,
+            interp_time,
         )
         interp_antennas_joint = (
             self.start_antennas
@@ -69,3 +93,167 @@ class GotoMove(Move):
         )
 
         return interp_head_pose, interp_antennas_joint, interp_body_yaw_joint
+
+    def evaluate_many(
+        self, ts: npt.ArrayLike
+    ) -> tuple[
+        npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]
+    ]:
+        """Evaluate the goto at several times at once (N x 4x4, N x 2 and N arrays)."""
+        ts = np.asarray(ts, dtype=np.float64)
+        if self.duration > 0.0:
+            interp_times = np.array(
+                [
+                    time_trajectory(min(t / self.duration, 1.0), method=self.method)
+                    for t in ts.tolist()
+                ]
+            )
+        else:
+            interp_times = np.ones(len(ts))
+
+        head_poses = linear_pose_interpolation_many(
+            self.start_head_pose, self.target_head_pose, interp_times
+        )
+        antennas = self.start_antennas + np.multiply.outer(
+            interp_times, self.target_antennas - self.start_antennas
+        )
+        body_yaws = (
+            self.start_body_yaw
+            + (self.target_body_yaw - self.start_body_yaw) * interp_times
+        )
+
+        return head_poses, antennas, body_yaws
+
+
+class BlendedGotoMove(Move):
+    """A minimum jerk goto starting with a non-zero velocity and acceleration.
+
+    Used to blend a goto into a running move, or to start it from the measured
+    motion: the goto starts from the position, velocity and acceleration of the
+    move, so chained gotos do not stop and go.
+
+    The trajectory is interpolated on a 9D vector: head translation (3), head
+    rotation vector relative to the start orientation (3), antennas (2) and body
+    yaw (1). The start velocity uses the same layout, with the angular velocity
+    expressed in the head frame. The polynomial coefficients are computed once, at
+    construction. A goto with no duration is at its target from the start.
+    """
+
+    def __init__(
+        self,
+        start_head_pose: npt.NDArray[np.float64],
+        target_head_pose: npt.NDArray[np.float64] | None,
+        start_antennas: npt.NDArray[np.float64],
+        target_antennas: npt.NDArray[np.float64] | None,
+        start_body_yaw: float,
+        target_body_yaw: float | None,
+        duration: float,
+        start_velocity: npt.NDArray[np.float64] | None = None,
+        start_acceleration: npt.NDArray[np.float64] | None = None,
+    ):
+        """Set up the goto move."""
+        if target_head_pose is None:
+            target_head_pose = start_head_pose
+        if target_antennas is None:
+            target_antennas = start_antennas
+        if target_body_yaw is None:
+            target_body_yaw = start_body_yaw
+
+        self.start_head_pose = start_head_pose
+        self._start_quat = matrix_to_quat_single(start_head_pose)
+        relative_rotation = R.from_matrix(
+            start_head_pose[:3, :3]
+        ).inv() * R.from_matrix(target_head_pose[:3, :3])
+
+        start = np.concatenate(
+            (start_head_pose[:3, 3], np.zeros(3), start_antennas, [start_body_yaw])
+        )
+        goal = np.concatenate(
+            (
+                target_head_pose[:3, 3],
+                relative_rotation.as_rotvec(),
+                target_antennas,
+                [target_body_yaw],
+            )
+        )
+        self._duration = duration
+        self._goal = goal
+        self._trajectory: MinimumJerkTrajectory | None = None
+        if duration > 0.0:
+            self._trajectory = MinimumJerkTrajectory(
+                start,
+                goal,
+                duration,
+                starting_velocity=start_velocity,
+                starting_acceleration=start_acceleration,
+            )
+
+    @property
+    def duration(self) -> float:
+        """Duration of the goto in seconds."""
+        return self._duration
+
+    def evaluate(
+        self, t: float
+    ) -> tuple[
+        npt.NDArray[np.float64] | None, npt.NDArray[np.float64] | None, float | None
+    ]:
+        """Evaluate the goto at time t."""
+        x = self._trajectory.position(t) if self._trajectory is not None else self._goal
+        values = x.tolist()
+
+        head_pose = quat_rotvec_pose(self._start_quat, values[3:6], values[0:3])
+
+        return head_pose, x[6:8], values[8]
+
+
+class JointGotoMove(JointMove):
+    """A goto to target head and antennas joint positions, interpolated in joint space.
+
+    Minimum jerk gotos may start with a non-zero joint velocity (7 head joints, then
+    2 antennas). A goto with no duration is at its target from the start.
+    """
+
+    def __init__(
+        self,
+        start_joints: npt.NDArray[np.float64],
+        target_joints: npt.NDArray[np.float64],
+        duration: float,
+        method: InterpolationTechnique,
+        start_velocity: npt.NDArray[np.float64] | None = None,
+    ):
+        """Set up the goto move."""
+        self.start_joints = start_joints
+        self.target_joints = target_joints
+        self._duration = duration
+        self.method = method
+
+        self._trajectory: MinimumJerkTrajectory | None = None
+        if method == InterpolationTechnique.MIN_JERK and duration > 0.0:
+            self._trajectory = MinimumJerkTrajectory(
+                start_joints,
+                target_joints,
+                duration,
+                starting_velocity=start_velocity,
+            )
+
+    @property
+    def duration(self) -> float:
+        """Duration of the goto in seconds."""
+        return self._duration
+
+    def evaluate_joints(
+        self, t: float
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Evaluate the goto at time t."""
+        if self._trajectory is not None:
+            joints = self._trajectory.position(t)
+        elif self._duration <= 0.0:
+            joints = self.target_joints
+        else:
+            interp_time = time_trajectory(t / self._duration, method=self.method)
+            joints = (
+                self.start_joints
+                + (self.target_joints - self.start_joints) * interp_time
+            )
+        return joints[:7], joints[7:]
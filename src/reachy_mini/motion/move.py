@@ -34,3 +34,41 @@ class Move(ABC):
 
         """
         pass
+
+
+class JointMove(ABC):
+    """Abstract base class for moves defined in joint space.
+
+    Joint moves directly stream the joint positions of the head and antennas, without
+    solving any IK (e.g. compiled moves and joint-space gotos).
+    """
+
+    @property
+    @abstractmethod
+    def duration(self) -> float:
+        """Duration of the move in seconds."""
+        pass
+
+    @abstractmethod
+    def evaluate_joints(
+        self,
+        t: float,
+    ) -> tuple[npt.NDArray[np.float64] | None, npt.NDArray[np.float64] | None]:
+        """Evaluate the move at time t, between 0 and duration.
+
+        Returns:
+            head_joints: The head joint positions (rad), length 7.
+            antennas: The antennas positions (rad).
+
+        """
+        pass
+
+    def end_target(self) -> tuple[npt.NDArray[np.float64] | None, float | None]:
+        """Get the task-space target reached at the end of the move, if known.
+
+        Returns:
+            head: The head pose (4x4 homogeneous matrix).
+            body_yaw: The body yaw angle (rad).
+
+        """
+        return None, None
@@ -1,6 +1,11 @@
-import bisect  # noqa: D100
+import hashlib  # noqa: D100
 import json
-from glob import glob
+import os
+import shutil
+import tempfile
+import threading
+import typing
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -9,35 +14,172 @@ import numpy.typing as npt
 from huggingface_hub import snapshot_download
 
 from reachy_mini.motion.move import Move
-from reachy_mini.utils.interpolation import linear_pose_interpolation
+from reachy_mini.utils.quaternion import (
+    matrix_to_quat,
+    quat_slerp,
+    quat_slerp_pose,
+    quat_to_matrix,
+)
 
-
-def lerp(v0: float, v1: float, alpha: float) -> float:
-    """Linear interpolation between two values."""
-    return v0 + alpha * (v1 - v0)
+if typing.TYPE_CHECKING:
+    from reachy_mini.io.wire import Trajectory
 
 
 class RecordedMove(Move):
-    """Represent a recorded move."""
+    """Represent a recorded move.
+
+    The recorded samples are stored as contiguous arrays: times[N], head
+    orientations as quaternions[N, 4] (x, y, z, w), head translations[N, 3],
+    antennas[N, 2] and body_yaw[N].
+    """
 
     def __init__(self, move: Dict[str, Any]) -> None:
-        """Initialize RecordedMove."""
-        self.move = move
+        """Initialize RecordedMove from its JSON representation."""
+        trajectory = move["set_target_data"]
+        heads = np.array([sample["head"] for sample in trajectory], dtype=np.float64)
+
+        self._set_arrays(
+            description=move["description"],
+            times=np.array(move["time"], dtype=np.float64),
+            head_quaternions=matrix_to_quat(heads[:, :3, :3]),
+            head_translations=heads[:, :3, 3],
+            antennas=np.array(
+                [sample["antennas"] for sample in trajectory], dtype=np.float64
+            ),
+            body_yaw=np.array(
+                [sample.get("body_yaw", 0.0) for sample in trajectory],
+                dtype=np.float64,
+            ),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        description: str,
+        times: npt.NDArray[np.float64],
+        head_quaternions: npt.NDArray[np.float64],
+        head_translations: npt.NDArray[np.float64],
+        antennas: npt.NDArray[np.float64],
+        body_yaw: npt.NDArray[np.float64],
+    ) -> "RecordedMove":
+        """Create a RecordedMove directly from its arrays (see the class docstring)."""
+        move = cls.__new__(cls)
+        move._set_arrays(
+            description, times, head_quaternions, head_translations, antennas, body_yaw
+        )
+        return move
+
+    @classmethod
+    def from_trajectory(
+        cls, trajectory: "Trajectory", description: str = ""
+    ) -> "RecordedMove":
+        """Create a RecordedMove from a trajectory uploaded to the daemon."""
+        return cls.from_arrays(
+            description,
+            trajectory.times,
+            trajectory.head_quaternions,
+            trajectory.head_translations,
+            trajectory.antennas,
+            trajectory.body_yaw,
+        )
 
-        self.description: str = self.move["description"]
-        self.timestamps: List[float] = self.move["time"]
-        self.trajectory: List[Dict[str, List[List[float]] | List[float] | float]] = (
-            self.move["set_target_data"]
+    def to_trajectory(self) -> "Trajectory":
+        """Get the samples of the move, to upload it to the daemon."""
+        # Imported here as reachy_mini.io depends on this module
+        from reachy_mini.io.wire import Trajectory
+
+        return Trajectory(
+            times=self.times,
+            head_quaternions=self.head_quaternions,
+            head_translations=self.head_translations,
+            antennas=self.antennas,
+            body_yaw=self.body_yaw,
         )
 
-        self.dt: float = (self.timestamps[-1] - self.timestamps[0]) / len(
-            self.timestamps
+    def _set_arrays(
+        self,
+        description: str,
+        times: npt.NDArray[np.float64],
+        head_quaternions: npt.NDArray[np.float64],
+        head_translations: npt.NDArray[np.float64],
+        antennas: npt.NDArray[np.float64],
+        body_yaw: npt.NDArray[np.float64],
+    ) -> None:
+        self.description = description
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        self.head_quaternions = np.ascontiguousarray(head_quaternions, dtype=np.float64)
+        self.head_translations = np.ascontiguousarray(
+            head_translations, dtype=np.float64
         )
+        self.antennas = np.ascontiguousarray(antennas, dtype=np.float64)
+        self.body_yaw = np.ascontiguousarray(body_yaw, dtype=np.float64)
+
+        self.dt: float = float(self.times[-1] - self.times[0]) / len(self.times)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Hash of the move content, used to cache its compiled trajectory."""
+        h = hashlib.sha1()
+        for array in (
+            self.times,
+            self.head_quaternions,
+            self.head_translations,
+            self.antennas,
+            self.body_yaw,
+        ):
+            h.update(array.tobytes())
+        return h.hexdigest()
 
     @property
     def duration(self) -> float:
         """Get the duration of the recorded move."""
-        return len(self.trajectory) * self.dt
+        return len(self.times) * self.dt
+
+    # Read-only views of the samples in their former JSON layout, built from the
+    # arrays at each access. Prefer the arrays, these are kept for compatibility.
+
+    @property
+    def timestamps(self) -> List[float]:
+        """Get the times of the samples (see `times`)."""
+        return typing.cast(List[float], self.times.tolist())
+
+    @property
+    def trajectory(self) -> List[Dict[str, Any]]:
+        """Get the samples as dicts with the head pose, antennas and body yaw."""
+        heads = np.zeros((len(self.times), 4, 4))
+        heads[:, :3, :3] = quat_to_matrix(self.head_quaternions)
+        heads[:, :3, 3] = self.head_translations
+        heads[:, 3, 3] = 1.0
+        return [
+            {"head": head, "antennas": antennas, "body_yaw": body_yaw}
+            for head, antennas, body_yaw in zip(
+                heads.tolist(), self.antennas.tolist(), self.body_yaw.tolist()
+            )
+        ]
+
+    @property
+    def move(self) -> Dict[str, Any]:
+        """Get the JSON representation of the move, as given to the constructor."""
+        return {
+            "description": self.description,
+            "time": self.timestamps,
+            "set_target_data": self.trajectory,
+        }
+
+    def _interpolation_indices(
+        self, ts: npt.NDArray[np.float64]
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.float64]]:
+        """Get the samples surrounding each time and the interpolation factors."""
+        # insertion point, which gives us the next timestamp
+        index = np.searchsorted(self.times, ts, side="right")
+        idx_prev = np.maximum(index - 1, 0)
+        idx_next = np.minimum(index, len(self.times) - 1)
+
+        t_prev = self.times[idx_prev]
+        span = self.times[idx_next] - t_prev
+        # Avoid division by zero (if by any chance two timestamps are identical).
+        alpha = np.where(span > 0, (ts - t_prev) / np.where(span > 0, span, 1.0), 0.0)
+        return idx_prev, idx_next, alpha
 
     def evaluate(
         self, t: float
@@ -50,83 +192,241 @@ class RecordedMove(Move):
             body_yaw: The body yaw angle (rad).
 
         """
-        # Under is Remi's emotions code, adapted
-        if t >= self.timestamps[-1]:
+        if t >= self.times[-1]:
             raise Exception("Tried to evaluate recorded move beyond its duration.")
 
-        # Locate the right interval in the recorded time array.
-        # 'index' is the insertion point which gives us the next timestamp.
-        index = bisect.bisect_right(self.timestamps, t)
-        # print(f"index: {index}, expected index: {t / self.dt:.0f}")
+        # Scalar path: a single sample is faster to interpolate with plain floats.
+        # Locate the right interval in the recorded time array, starting from the
+        # index expected for a uniform sampling ('index' is the insertion point,
+        # which gives us the next timestamp).
+        times = self.times
+        n = len(times)
+        index = min(max(int((t - times.item(0)) / self.dt), 0), n)
+        while index < n and times.item(index) <= t:
+            index += 1
+        while index > 0 and times.item(index - 1) > t:
+            index -= 1
         idx_prev = index - 1 if index > 0 else 0
-        idx_next = index if index < len(self.timestamps) else idx_prev
-
-        t_prev = self.timestamps[idx_prev]
-        t_next = self.timestamps[idx_next]
+        idx_next = index if index < n else idx_prev
 
+        t_prev = times.item(idx_prev)
+        t_next = times.item(idx_next)
         # Avoid division by zero (if by any chance two timestamps are identical).
-        if t_next == t_prev:
-            alpha = 0.0
-        else:
-            alpha = (t - t_prev) / (t_next - t_prev)
-
-        head_prev = np.array(self.trajectory[idx_prev]["head"], dtype=np.float64)
-        head_next = np.array(self.trajectory[idx_next]["head"], dtype=np.float64)
-        antennas_prev: List[float] = self.trajectory[idx_prev]["antennas"]  # type: ignore[assignment]
-        antennas_next: List[float] = self.trajectory[idx_next]["antennas"]  # type: ignore[assignment]
-        body_yaw_prev: float = self.trajectory[idx_prev].get("body_yaw", 0.0)  # type: ignore[assignment]
-        body_yaw_next: float = self.trajectory[idx_next].get("body_yaw", 0.0)  # type: ignore[assignment]
-        # check_collision = self.trajectory[idx_prev].get("check_collision", False)
-
-        # Interpolate to infer a better position at the current time.
-        # Joint interpolations are easy:
-
-        antennas_joints = np.array(
+        alpha = 0.0 if t_next == t_prev else (t - t_prev) / (t_next - t_prev)
+
+        head_pose = quat_slerp_pose(
+            self.head_quaternions[idx_prev].tolist(),
+            self.head_translations[idx_prev].tolist(),
+            self.head_quaternions[idx_next].tolist(),
+            self.head_translations[idx_next].tolist(),
+            alpha,
+        )
+
+        (a0_prev, a1_prev), (a0_next, a1_next) = (
+            self.antennas[idx_prev].tolist(),
+            self.antennas[idx_next].tolist(),
+        )
+        antennas = np.array(
             [
-                lerp(pos_prev, pos_next, alpha)
-                for pos_prev, pos_next in zip(antennas_prev, antennas_next)
-            ],
-            dtype=np.float64,
+                a0_prev + alpha * (a0_next - a0_prev),
+                a1_prev + alpha * (a1_next - a1_prev),
+            ]
+        )
+
+        body_yaw_prev = self.body_yaw.item(idx_prev)
+        body_yaw = body_yaw_prev + alpha * (
+            self.body_yaw.item(idx_next) - body_yaw_prev
+        )
+
+        return head_pose, antennas, body_yaw
+
+    def evaluate_many(
+        self, ts: npt.ArrayLike
+    ) -> tuple[
+        npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]
+    ]:
+        """Evaluate the move at several times at once.
+
+        Times beyond the end of the move are clamped to the last sample.
+
+        Returns:
+            head: The head positions (N x 4x4 homogeneous matrices).
+            antennas: The antennas positions (N x 2, rad).
+            body_yaw: The body yaw angles (N, rad).
+
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        idx_prev, idx_next, alpha = self._interpolation_indices(ts)
+        a = alpha[:, np.newaxis]
+
+        head = np.zeros((len(ts), 4, 4))
+        head[:, :3, :3] = quat_to_matrix(
+            quat_slerp(
+                self.head_quaternions[idx_prev], self.head_quaternions[idx_next], alpha
+            )
         )
+        t_prev = self.head_translations[idx_prev]
+        head[:, :3, 3] = t_prev + a * (self.head_translations[idx_next] - t_prev)
+        head[:, 3, 3] = 1.0
+
+        antennas_prev = self.antennas[idx_prev]
+        antennas = antennas_prev + a * (self.antennas[idx_next] - antennas_prev)
+
+        body_yaw_prev = self.body_yaw[idx_prev]
+        body_yaw = body_yaw_prev + alpha * (self.body_yaw[idx_next] - body_yaw_prev)
+
+        return head, antennas, body_yaw
+
+
+# Columns of the packed format, one .npy file each, all moves concatenated
+PACKED_COLUMNS = (
+    "times",
+    "head_quaternions",
+    "head_translations",
+    "antennas",
+    "body_yaw",
+)
+PACKED_INDEX = "index.json"
+PACKED_MOVES_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "reachy_mini"
+    / "recorded_moves"
+)
+
+
+def pack_recorded_moves(json_dir: str | Path, output_dir: str | Path) -> None:
+    """Convert a directory of JSON recorded moves to the packed format.
+
+    The packed format is a directory with one .npy file per column of the moves
+    (see PACKED_COLUMNS), holding all the moves concatenated, and an index.json
+    with the name, description, duration, offset and length of each move. The
+    columns can then be memory-mapped, so loading a move does not parse anything.
+
+    The directory is written next to its final location and renamed once complete,
+    so concurrent readers never see a partially written dataset.
+    """
+    output_dir = Path(output_dir)
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
 
-        body_yaw = lerp(body_yaw_prev, body_yaw_next, alpha)
+    index: Dict[str, Dict[str, Any]] = {}
+    columns: Dict[str, List[npt.NDArray[np.float64]]] = {
+        name: [] for name in PACKED_COLUMNS
+    }
+    offset = 0
+    for move_path in sorted(Path(json_dir).glob("*.json")):
+        with open(move_path, "r") as f:
+            move = RecordedMove(json.load(f))
 
-        # Head position interpolation is more complex:
-        head_pose = linear_pose_interpolation(head_prev, head_next, alpha)
+        for name in PACKED_COLUMNS:
+            columns[name].append(getattr(move, name))
+        index[move_path.stem] = {
+            "description": move.description,
+            "duration": move.duration,
+            "offset": offset,
+            "length": len(move.times),
+        }
+        offset += len(move.times)
 
-        return head_pose, antennas_joints, body_yaw
+    tmp_dir = Path(tempfile.mkdtemp(dir=output_dir.parent))
+    try:
+        for name, arrays in columns.items():
+            np.save(tmp_dir / f"{name}.npy", np.concatenate(arrays) if arrays else [])
+        with open(tmp_dir / PACKED_INDEX, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_dir, output_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Another process may have packed the same dataset in the meantime
+        if not (output_dir / PACKED_INDEX).exists():
+            raise
 
 
 class RecordedMoves:
-    """Load a library of recorded moves from a HuggingFace dataset."""
+    """Load a library of recorded moves from a HuggingFace dataset.
 
-    def __init__(self, hf_dataset_name: str):
-        """Initialize RecordedMoves."""
+    The JSON moves of the dataset are converted once to the packed format (see
+    `pack_recorded_moves`), cached per dataset revision. Then only the index is
+    read at construction, and the move bodies are memory-mapped and loaded lazily.
+    Use `get_recorded_moves` to share the loaded datasets across the process.
+    """
+
+    def __init__(self, hf_dataset_name: str, cache_path: str | Path | None = None):
+        """Initialize RecordedMoves.
+
+        Args:
+            hf_dataset_name (str): Name of the HuggingFace dataset.
+            cache_path (str | Path | None): Root directory of the packed datasets. Defaults to PACKED_MOVES_CACHE_PATH.
+
+        """
         self.hf_dataset_name = hf_dataset_name
         self.local_path = snapshot_download(self.hf_dataset_name, repo_type="dataset")
-        self.moves: Dict[str, Any] = {}
+        # The snapshot directory is named after the dataset revision
+        self.packed_path = (
+            Path(cache_path or PACKED_MOVES_CACHE_PATH)
+            / hf_dataset_name.replace("/", "--")
+            / Path(self.local_path).name
+        )
+
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._columns: Dict[str, npt.NDArray[np.float64]] = {}
+        self._moves: Dict[str, RecordedMove] = {}
 
         self.process()
 
     def process(self) -> None:
-        """Populate recorded moves and sounds."""
-        move_paths_tmp = glob(f"{self.local_path}/*.json")
-        move_paths = [Path(move_path) for move_path in move_paths_tmp]
-        for move_path in move_paths:
-            move_name = move_path.stem
+        """Load the index of the moves, packing the dataset first if needed."""
+        if not (self.packed_path / PACKED_INDEX).exists():
+            pack_recorded_moves(self.local_path, self.packed_path)
 
-            move = json.load(open(move_path, "r"))
-            self.moves[move_name] = move
+        with open(self.packed_path / PACKED_INDEX, "r") as f:
+            self.index = json.load(f)
+        self._columns = {
+            name: np.load(self.packed_path / f"{name}.npy", mmap_mode="r")
+            for name in PACKED_COLUMNS
+        }
+        self._moves.clear()
 
     def get(self, move_name: str) -> RecordedMove:
         """Get a recorded move by name."""
-        if move_name not in self.moves:
+        move = self._moves.get(move_name)
+        if move is not None:
+            return move
+
+        if move_name not in self.index:
             raise ValueError(
                 f"Move {move_name} not found in recorded moves library {self.hf_dataset_name}"
             )
 
-        return RecordedMove(self.moves[move_name])
+        entry = self.index[move_name]
+        rows = slice(entry["offset"], entry["offset"] + entry["length"])
+        move = RecordedMove.from_arrays(
+            description=entry["description"],
+            **{name: self._columns[name][rows] for name in PACKED_COLUMNS},
+        )
+        self._moves[move_name] = move
+        return move
 
     def list_moves(self) -> List[str]:
         """List all moves in the loaded library."""
-        return list(self.moves.keys())
+        return list(self.index.keys())
+
+    @property
+    def moves(self) -> Dict[str, Any]:
+        """Get the JSON representation of every move, by name.
+
+        Kept for compatibility: this loads all the moves, use `get` instead.
+        """
+        return {name: self.get(name).move for name in self.index}
+
+
+_recorded_moves: Dict[str, RecordedMoves] = {}
+_recorded_moves_lock = threading.Lock()
+
+
+def get_recorded_moves(hf_dataset_name: str) -> RecordedMoves:
+    """Get the RecordedMoves of a dataset, loaded once per process."""
+    with _recorded_moves_lock:
+        moves = _recorded_moves.get(hf_dataset_name)
+        if moves is None:
+            moves = _recorded_moves[hf_dataset_name] = RecordedMoves(hf_dataset_name)
+        return moves
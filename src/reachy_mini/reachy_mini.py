@@ -10,7 +10,7 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
 import cv2
 import numpy as np
@@ -19,11 +19,14 @@ from asgiref.sync import async_to_sync
 from scipy.spatial.transform import Rotation as R
 
 from reachy_mini.daemon.utils import daemon_check
-from reachy_mini.io.protocol import GotoTaskRequest
+from reachy_mini.io.protocol import GotoTaskRequest, PlayMoveTaskRequest
+from reachy_mini.io.wire import RobotStateSample, encode_trajectory
 from reachy_mini.io.zenoh_client import ZenohClient
 from reachy_mini.media.media_manager import MediaBackend, MediaManager
 from reachy_mini.motion.move import Move
+from reachy_mini.motion.recorded_move import RecordedMove
 from reachy_mini.utils.interpolation import InterpolationTechnique, minimum_jerk
+from reachy_mini.utils.quaternion import matrix_to_quat
 
 # Behavior definitions
 INIT_HEAD_POSE = np.eye(4)
@@ -49,6 +52,10 @@ SLEEP_HEAD_POSE = np.array(
     ]
 )
 
+# Maximum time waited for the daemon to start playing an uploaded move, compiling
+# it first (in seconds)
+PLAY_MOVE_START_TIMEOUT = 60.0
+
 
 class ReachyMini:
     """Reachy Mini class for controlling a simulated or real Reachy Mini robot.
@@ -70,6 +77,7 @@ class ReachyMini:
         automatic_body_yaw: bool = True,
         log_level: str = "INFO",
         media_backend: str = "default",
+        target_priority: int = 0,
     ) -> None:
         """Initialize the Reachy Mini robot.
 
@@ -82,6 +90,7 @@ class ReachyMini:
             automatic_body_yaw (bool): If True, the body yaw will be used to compute the IK and FK. Default is False.
             log_level (str): Logging level, defaults to "INFO".
             media_backend (str): Media backend to use, either "default" (OpenCV), "gstreamer" or "webrtc", defaults to "default".
+            target_priority (int): Priority of the targets of this client when several clients send targets, higher wins, defaults to 0.
 
         It will try to connect to the daemon, and if it fails, it will raise an exception.
 
@@ -95,6 +104,7 @@ class ReachyMini:
         self.set_automatic_body_yaw(automatic_body_yaw)
         self._last_head_pose: Optional[npt.NDArray[np.float64]] = None
         self.is_recording = False
+        self.target_priority = target_priority
 
         self.T_head_cam = np.eye(4)
         self.T_head_cam[:3, 3][:] = [0.0437, 0, 0.0512]
@@ -198,32 +208,9 @@ class ReachyMini:
         if body_yaw is not None and not isinstance(body_yaw, (int, float)):
             raise ValueError("body_yaw must be a float.")
 
-        if head is not None:
-            self.set_target_head_pose(head)
-
-        if antennas is not None:
-            self.set_target_antenna_joint_positions(list(antennas))
-            # self._set_joint_positions(
-            #     antennas_joint_positions=list(antennas),
-            # )
-
-        if body_yaw is not None:
-            self.set_target_body_yaw(body_yaw)
-
+        self._send_target(head, antennas, body_yaw, record=self.is_recording)
         self._last_head_pose = head
 
-        record: Dict[str, float | List[float] | List[List[float]]] = {
-            "time": time.time(),
-            "body_yaw": body_yaw if body_yaw is not None else 0.0,
-        }
-        if head is not None:
-            record["head"] = head.tolist()
-        if antennas is not None:
-            record["antennas"] = list(antennas)
-        if body_yaw is not None:
-            record["body_yaw"] = body_yaw
-        self._set_record_data(record)
-
     def goto_target(
         self,
         head: Optional[npt.NDArray[np.float64]] = None,  # 4x4 pose matrix
@@ -247,30 +234,53 @@ class ReachyMini:
             ValueError: If neither head nor antennas are provided, or if duration is not positive.
 
         """
-        if head is None and antennas is None and body_yaw is None:
-            raise ValueError(
-                "At least one of head, antennas or body_yaw must be provided."
-            )
+        req = _goto_request(head, antennas, duration, method, body_yaw)
+        task_uid = self.client.send_task_request(req)
+        self.client.wait_for_task_completion(task_uid, timeout=duration + 1.0)
 
-        if duration <= 0.0:
-            raise ValueError(
-                "Duration must be positive and non-zero. Use set_target() for immediate position setting."
-            )
+    async def async_goto_target(
+        self,
+        head: Optional[npt.NDArray[np.float64]] = None,  # 4x4 pose matrix
+        antennas: Optional[
+            Union[npt.NDArray[np.float64], List[float]]
+        ] = None,  # [right_angle, left_angle] (in rads)
+        duration: float = 0.5,  # Duration in seconds for the movement, default is 0.5 seconds.
+        method: InterpolationTechnique = InterpolationTechnique.MIN_JERK,
+        body_yaw: float | None = 0.0,  # Body yaw angle in radians
+    ) -> None:
+        """Asynchronously go to a target head pose and/or antennas position, in "duration" seconds.
 
-        req = GotoTaskRequest(
-            head=np.array(head, dtype=np.float64).flatten().tolist()
-            if head is not None
-            else None,
-            antennas=np.array(antennas, dtype=np.float64).flatten().tolist()
-            if antennas is not None
-            else None,
-            duration=duration,
-            method=method,
-            body_yaw=body_yaw,
-        )
+        Same as goto_target, but awaits the completion of the goto instead of blocking
+        the event loop.
+
+        Args:
+            head (Optional[np.ndarray]): 4x4 pose matrix representing the target head pose.
+            antennas (Optional[Union[np.ndarray, List[float]]]): 1D array with two elements representing the angles of the antennas in radians.
+            duration (float): Duration of the movement in seconds.
+            method (InterpolationTechnique): Interpolation method to use ("linear", "minjerk", "ease", "cartoon"). Default is "minjerk".
+            body_yaw (float | None): Body yaw angle in radians. Use None to keep the current yaw.
+
+        Raises:
+            ValueError: If neither head nor antennas are provided, or if duration is not positive.
 
+        """
+        req = _goto_request(head, antennas, duration, method, body_yaw)
         task_uid = self.client.send_task_request(req)
-        self.client.wait_for_task_completion(task_uid, timeout=duration + 1.0)
+        await self.client.async_wait_for_task_completion(
+            task_uid, timeout=duration + 1.0
+        )
+
+    def state_samples(self) -> AsyncIterator[RobotStateSample]:
+        """Asynchronously iterate over the robot state samples published by the daemon.
+
+        Each iteration returns the latest sample received, all the fields of a sample
+        were read during the same control loop tick::
+
+            async for state in mini.state_samples():
+                print(state.head_pose)
+
+        """
+        return self.client.state_samples()
 
     def wake_up(self) -> None:
         """Wake up the robot - go to the initial head position and play the wake up emote and sound."""
@@ -593,22 +603,45 @@ class ReachyMini:
             ValueError: If the shape of the pose is not (4, 4).
 
         """
-        cmd = {}
-
-        if pose is not None:
-            assert pose.shape == (4, 4), (
-                f"Head pose should be a 4x4 matrix, got {pose.shape}."
-            )
-            cmd["head_pose"] = pose.tolist()
-        else:
+        if pose is None:
             raise ValueError("Pose must be provided as a 4x4 matrix.")
+        assert pose.shape == (4, 4), (
+            f"Head pose should be a 4x4 matrix, got {pose.shape}."
+        )
 
-        self.client.send_command(json.dumps(cmd))
+        self._send_target(pose, None, None, record=self.is_recording)
+
+    def _send_target(
+        self,
+        head: Optional[npt.NDArray[np.float64]],
+        antennas: Optional[Union[npt.NDArray[np.float64], List[float]]],
+        body_yaw: Optional[float],
+        record: bool = False,
+    ) -> None:
+        """Send the head, antennas and body yaw targets in a single command.
+
+        The daemon applies all of them at once, unless another client with a higher
+        priority is sending targets. If record is True, the daemon also appends them to
+        the current recording.
+        """
+        target: Dict[str, Any] = {
+            "source": self.client.source_id,
+            "priority": self.target_priority,
+        }
+        if head is not None:
+            target["head_pose"] = head.tolist()
+        if antennas is not None:
+            target["antennas_joint_positions"] = [float(a) for a in antennas]
+        if body_yaw is not None:
+            target["body_yaw"] = float(body_yaw)
+        if record:
+            target["record"] = True
+
+        self.client.send_command(json.dumps({"set_target": target}))
 
     def set_target_antenna_joint_positions(self, antennas: List[float]) -> None:
         """Set the target joint positions of the antennas."""
-        cmd = {"antennas_joint_positions": antennas}
-        self.client.send_command(json.dumps(cmd))
+        self._send_target(None, antennas, None, record=self.is_recording)
 
     def set_target_body_yaw(self, body_yaw: float) -> None:
         """Set the target body yaw.
@@ -617,8 +650,7 @@ class ReachyMini:
             body_yaw (float): The yaw angle of the body in radians.
 
         """
-        cmd = {"body_yaw": body_yaw}
-        self.client.send_command(json.dumps(cmd))
+        self._send_target(None, None, body_yaw, record=self.is_recording)
 
     def start_recording(self) -> None:
         """Start recording data."""
@@ -637,20 +669,20 @@ class ReachyMini:
 
         return recorded_data
 
-    def _set_record_data(
-        self, record: Dict[str, float | List[float] | List[List[float]]]
-    ) -> None:
-        """Set the record data to be logged by the backend.
+    def get_recording(
+        self, recording_id: str, timeout: float = 5.0
+    ) -> List[Dict[str, float | List[float] | List[List[float]]]]:
+        """Fetch a recording kept by the daemon.
+
+        The id of the last recording received is available as
+        `self.client.last_recording_id`.
 
         Args:
-            record (Dict): The record data to be logged.
+            recording_id (str): The id of the recording.
+            timeout (float): Maximum time to wait for the recording (in seconds).
 
         """
-        if not isinstance(record, dict):
-            raise ValueError("Record must be a dictionary.")
-
-        # Send the record data to the backend
-        self.client.send_command(json.dumps({"set_target_record": record}))
+        return self.client.get_recording(recording_id, timeout=timeout)
 
     def enable_motors(self, ids: List[str] | None = None) -> None:
         """Enable the motors.
@@ -698,12 +730,73 @@ class ReachyMini:
     ) -> None:
         """Asynchronously play a Move.
 
+        The move is sampled at play_frequency and uploaded to the daemon, which plays it
+        with its own timing. Moves that do not define the head pose, the antennas and the
+        body yaw are streamed from the client instead.
+
         Args:
             move (Move): The Move object to be played.
             play_frequency (float): The frequency at which to evaluate the move (in Hz).
             initial_goto_duration (float): Duration for the initial goto to the starting position of the move (in seconds). If 0, no initial goto is performed.
 
         """
+        recorded_move = (
+            move
+            if isinstance(move, RecordedMove)
+            else _sample_move(move, play_frequency)
+        )
+        if recorded_move is None:
+            return await self._stream_move(move, play_frequency, initial_goto_duration)
+
+        req = PlayMoveTaskRequest(
+            trajectory=encode_trajectory(recorded_move.to_trajectory()),
+            play_frequency=play_frequency,
+            initial_goto_duration=initial_goto_duration,
+        )
+        task_uid = self.client.send_task_request(req)
+        # The daemon compiles the move first, the duration only counts once it started
+        await self.client.async_wait_for_task_completion(
+            task_uid,
+            timeout=initial_goto_duration + recorded_move.duration + 5.0,
+            start_timeout=PLAY_MOVE_START_TIMEOUT,
+        )
+
+    async def async_play_dataset_move(
+        self,
+        dataset_name: str,
+        move_name: str,
+        play_frequency: float = 100.0,
+        initial_goto_duration: float = 0.0,
+    ) -> None:
+        """Asynchronously play a recorded move of a Hugging Face dataset.
+
+        The daemon loads the dataset (downloading it if needed) and plays the move, so
+        nothing is downloaded on the client side.
+
+        Args:
+            dataset_name (str): Name of the Hugging Face dataset of recorded moves.
+            move_name (str): Name of the move in the dataset.
+            play_frequency (float): The frequency at which to evaluate the move (in Hz).
+            initial_goto_duration (float): Duration for the initial goto to the starting position of the move (in seconds). If 0, no initial goto is performed.
+
+        """
+        req = PlayMoveTaskRequest(
+            dataset_name=dataset_name,
+            move_name=move_name,
+            play_frequency=play_frequency,
+            initial_goto_duration=initial_goto_duration,
+        )
+        task_uid = self.client.send_task_request(req)
+        # The duration of the move is only known by the daemon
+        await self.client.async_wait_for_task_completion(task_uid, timeout=None)
+
+    async def _stream_move(
+        self,
+        move: Move,
+        play_frequency: float,
+        initial_goto_duration: float,
+    ) -> None:
+        """Play a Move by streaming its targets from the client."""
         if initial_goto_duration > 0.0:
             start_head_pose, start_antennas_positions, start_body_yaw = move.evaluate(
                 0.0
@@ -722,12 +815,8 @@ class ReachyMini:
             t = min(time.time() - t0, move.duration - 1e-2)
 
             head, antennas, body_yaw = move.evaluate(t)
-            if head is not None:
-                self.set_target_head_pose(head)
-            if body_yaw is not None:
-                self.set_target_body_yaw(body_yaw)
-            if antennas is not None:
-                self.set_target_antenna_joint_positions(list(antennas))
+            if head is not None or antennas is not None or body_yaw is not None:
+                self._send_target(head, antennas, body_yaw)
 
             elapsed = time.time() - t0 - t
             if elapsed < sleep_period:
@@ -736,3 +825,60 @@ class ReachyMini:
                 await asyncio.sleep(0.001)
 
     play_move = async_to_sync(async_play_move)
+    play_dataset_move = async_to_sync(async_play_dataset_move)
+
+
+def _goto_request(
+    head: Optional[npt.NDArray[np.float64]],
+    antennas: Optional[Union[npt.NDArray[np.float64], List[float]]],
+    duration: float,
+    method: InterpolationTechnique,
+    body_yaw: float | None,
+) -> GotoTaskRequest:
+    """Check the arguments of a goto and build its task request."""
+    if head is None and antennas is None and body_yaw is None:
+        raise ValueError("At least one of head, antennas or body_yaw must be provided.")
+
+    if duration <= 0.0:
+        raise ValueError(
+            "Duration must be positive and non-zero. Use set_target() for immediate position setting."
+        )
+
+    return GotoTaskRequest(
+        head=np.array(head, dtype=np.float64).flatten().tolist()
+        if head is not None
+        else None,
+        antennas=np.array(antennas, dtype=np.float64).flatten().tolist()
+        if antennas is not None
+        else None,
+        duration=duration,
+        method=method,
+        body_yaw=body_yaw,
+    )
+
+
+def _sample_move(move: Move, frequency: float) -> RecordedMove | None:
+    """Sample a move at the given frequency, None if it does not define all its targets."""
+    ts = np.arange(0.0, move.duration, 1.0 / frequency)
+    if len(ts) < 2:
+        return None
+
+    heads = np.empty((len(ts), 4, 4))
+    antennas = np.empty((len(ts), 2))
+    body_yaws = np.empty(len(ts))
+    for i, t in enumerate(ts):
+        head, antennas_i, body_yaw = move.evaluate(float(t))
+        if head is None or antennas_i is None or body_yaw is None:
+            return None
+        heads[i] = head
+        antennas[i] = antennas_i
+        body_yaws[i] = body_yaw
+
+    return RecordedMove.from_arrays(
+        description="",
+        times=ts,
+        head_quaternions=matrix_to_quat(heads[:, :3, :3]),
+        head_translations=heads[:, :3, 3],
+        antennas=antennas,
+        body_yaw=body_yaws,
+    )
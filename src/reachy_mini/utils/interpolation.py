@@ -5,11 +5,117 @@ from typing import Callable, Optional, Tuple
 
 import numpy as np
 import numpy.typing as npt
-from scipy.spatial.transform import Rotation as R
+
+from reachy_mini.utils.quaternion import (
+    matrix_to_quat_single,
+    quat_slerp,
+    quat_slerp_pose,
+    quat_to_matrix,
+)
 
 InterpolationFunc = Callable[[float], npt.NDArray[np.float64]]
 
 
+class MinimumJerkTrajectory:
+    """Minimum jerk trajectory with arbitrary boundary velocities and accelerations.
+
+    The quintic polynomial coefficients of each dimension are computed once, so the
+    trajectory can then be evaluated cheaply, at a single time or at many times at
+    once. Evaluations after the duration return the goal (with the final velocity
+    and acceleration).
+    """
+
+    def __init__(
+        self,
+        starting_position: npt.NDArray[np.float64],
+        goal_position: npt.NDArray[np.float64],
+        duration: float,
+        starting_velocity: Optional[npt.NDArray[np.float64]] = None,
+        starting_acceleration: Optional[npt.NDArray[np.float64]] = None,
+        final_velocity: Optional[npt.NDArray[np.float64]] = None,
+        final_acceleration: Optional[npt.NDArray[np.float64]] = None,
+    ) -> None:
+        """Compute the polynomial coefficients of the trajectory.
+
+        Args:
+            starting_position (np.ndarray): Position at t=0, of shape (n,).
+            goal_position (np.ndarray): Position at t=duration, of shape (n,).
+            duration (float): Duration of the trajectory (in seconds).
+            starting_velocity (np.ndarray | None): Velocity at t=0, zero if None.
+            starting_acceleration (np.ndarray | None): Acceleration at t=0, zero if None.
+            final_velocity (np.ndarray | None): Velocity at t=duration, zero if None.
+            final_acceleration (np.ndarray | None): Acceleration at t=duration, zero if None.
+
+        """
+        if duration <= 0.0:
+            raise ValueError("The duration of the trajectory must be positive.")
+
+        a0 = np.asarray(starting_position, dtype=np.float64)
+        goal = np.asarray(goal_position, dtype=np.float64)
+        zeros = np.zeros(a0.shape)
+        a1 = zeros if starting_velocity is None else np.asarray(starting_velocity)
+        a2 = (
+            zeros
+            if starting_acceleration is None
+            else np.asarray(starting_acceleration)
+        ) / 2
+        vf = zeros if final_velocity is None else np.asarray(final_velocity)
+        af = zeros if final_acceleration is None else np.asarray(final_acceleration)
+
+        d1, d2, d3, d4, d5 = [duration**i for i in range(1, 6)]
+        A = np.array(
+            ((d3, d4, d5), (3 * d2, 4 * d3, 5 * d4), (6 * d1, 12 * d2, 20 * d3))
+        )
+        B = np.array(
+            (
+                goal - a0 - (a1 * d1) - (a2 * d2),
+                vf - a1 - (2 * a2 * d1),
+                af - (2 * a2),
+            )
+        )
+        X = np.linalg.solve(A, B)
+
+        self.duration = duration
+        # Coefficients of t**0 to t**5, of shape (6, n)
+        self.coeffs = np.stack((a0, a1, a2, X[0], X[1], X[2]))
+        self._goal = (goal, vf, af)
+        # Coefficients of the velocity and acceleration polynomials
+        self._velocity_coeffs = (
+            self.coeffs[1:] * np.arange(1, 6, dtype=np.float64)[:, None]
+        )
+        self._acceleration_coeffs = (
+            self._velocity_coeffs[1:] * np.arange(1, 5, dtype=np.float64)[:, None]
+        )
+
+    def position(self, t: float | npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """Evaluate the position at time t (scalar, or array of shape (m,) -> (m, n))."""
+        return self._evaluate(self.coeffs, t, self._goal[0])
+
+    def velocity(self, t: float | npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """Evaluate the velocity at time t (scalar, or array of shape (m,) -> (m, n))."""
+        return self._evaluate(self._velocity_coeffs, t, self._goal[1])
+
+    def acceleration(
+        self, t: float | npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        """Evaluate the acceleration at time t (scalar, or array of shape (m,) -> (m, n))."""
+        return self._evaluate(self._acceleration_coeffs, t, self._goal[2])
+
+    def _evaluate(
+        self,
+        coeffs: npt.NDArray[np.float64],
+        t: float | npt.NDArray[np.float64],
+        after_end: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        ts = np.asarray(t, dtype=np.float64)
+        clipped = np.minimum(ts, self.duration)
+        # Horner's scheme, vectorized over the times and the dimensions
+        result = np.broadcast_to(coeffs[-1], clipped.shape + coeffs.shape[1:])
+        for c in coeffs[-2::-1]:
+            result = result * clipped[..., None] + c
+        return np.where((ts > self.duration)[..., None], after_end, result)
+
+
 def minimum_jerk(
     starting_position: npt.NDArray[np.float64],
     goal_position: npt.NDArray[np.float64],
@@ -19,69 +125,59 @@ def minimum_jerk(
     final_velocity: Optional[npt.NDArray[np.float64]] = None,
     final_acceleration: Optional[npt.NDArray[np.float64]] = None,
 ) -> InterpolationFunc:
-    """Compute the mimimum jerk interpolation function from starting position to goal position."""
-    if starting_velocity is None:
-        starting_velocity = np.zeros(starting_position.shape)
-    if starting_acceleration is None:
-        starting_acceleration = np.zeros(starting_position.shape)
-    if final_velocity is None:
-        final_velocity = np.zeros(goal_position.shape)
-    if final_acceleration is None:
-        final_acceleration = np.zeros(goal_position.shape)
-
-    a0 = starting_position
-    a1 = starting_velocity
-    a2 = starting_acceleration / 2
-
-    d1, d2, d3, d4, d5 = [duration**i for i in range(1, 6)]
-
-    A = np.array(((d3, d4, d5), (3 * d2, 4 * d3, 5 * d4), (6 * d1, 12 * d2, 20 * d3)))
-    B = np.array(
-        (
-            goal_position - a0 - (a1 * d1) - (a2 * d2),
-            final_velocity - a1 - (2 * a2 * d1),
-            final_acceleration - (2 * a2),
-        )
-    )
-    X = np.linalg.solve(A, B)
-
-    coeffs = [a0, a1, a2, X[0], X[1], X[2]]
-
-    def f(t: float) -> npt.NDArray[np.float64]:
-        if t > duration:
-            return goal_position
-        return np.sum([c * t**i for i, c in enumerate(coeffs)], axis=0)  # type: ignore[no-any-return]
+    """Compute the mimimum jerk interpolation function from starting position to goal position.
 
-    return f
+    See MinimumJerkTrajectory, whose position function is returned.
+    """
+    return MinimumJerkTrajectory(
+        starting_position,
+        goal_position,
+        duration,
+        starting_velocity=starting_velocity,
+        starting_acceleration=starting_acceleration,
+        final_velocity=final_velocity,
+        final_acceleration=final_acceleration,
+    ).position
 
 
 def linear_pose_interpolation(
     start_pose: npt.NDArray[np.float64], target_pose: npt.NDArray[np.float64], t: float
 ) -> npt.NDArray[np.float64]:
-    """Linearly interpolate between two poses in 6D space."""
-    # Extract rotations
-    rot_start = R.from_matrix(start_pose[:3, :3])
-    rot_end = R.from_matrix(target_pose[:3, :3])
-
-    # Compute relative rotation q_rel such that rot_start * q_rel = rot_end
-    q_rel = rot_start.inv() * rot_end
-    # Convert to rotation vector (axis-angle)
-    rotvec_rel = q_rel.as_rotvec()
-    # Scale the rotation vector by t (allows t<0 or >1 for overshoot)
-    rot_interp = (rot_start * R.from_rotvec(rotvec_rel * t)).as_matrix()
-
-    # Extract translations
-    pos_start = start_pose[:3, 3]
-    pos_end = target_pose[:3, 3]
-    # Linear interpolation/extrapolation on translation
-    pos_interp = pos_start + (pos_end - pos_start) * t
-
-    # Compose homogeneous transformation
-    interp_pose = np.eye(4)
-    interp_pose[:3, :3] = rot_interp
-    interp_pose[:3, 3] = pos_interp
-
-    return interp_pose
+    """Linearly interpolate between two poses in 6D space.
+
+    The orientation is interpolated along the shortest path (slerp) and the
+    translation linearly. Values of t outside [0, 1] extrapolate. To interpolate
+    between the same poses many times, precompute their quaternions and use
+    `quat_slerp_pose`, or `linear_pose_interpolation_many`.
+    """
+    return quat_slerp_pose(
+        matrix_to_quat_single(start_pose),
+        start_pose[:3, 3].tolist(),
+        matrix_to_quat_single(target_pose),
+        target_pose[:3, 3].tolist(),
+        t,
+    )
+
+
+def linear_pose_interpolation_many(
+    start_pose: npt.NDArray[np.float64],
+    target_pose: npt.NDArray[np.float64],
+    ts: npt.ArrayLike,
+) -> npt.NDArray[np.float64]:
+    """Interpolate between two poses at several values of t at once.
+
+    Batched form of `linear_pose_interpolation`, returning an array of N 4x4 poses.
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    q0 = np.array(matrix_to_quat_single(start_pose))
+    q1 = np.array(matrix_to_quat_single(target_pose))
+
+    poses = np.zeros(ts.shape + (4, 4))
+    poses[..., :3, :3] = quat_to_matrix(quat_slerp(q0, q1, ts))
+    t_start = start_pose[:3, 3]
+    poses[..., :3, 3] = t_start + ts[..., np.newaxis] * (target_pose[:3, 3] - t_start)
+    poses[..., 3, 3] = 1.0
+    return poses
 
 
 class InterpolationTechnique(str, Enum):
@@ -0,0 +1,329 @@
+"""Registry of the runtime metrics of the daemon.
+
+Counters, gauges and histograms are registered once by name in a `MetricsRegistry`
+(usually the module-level `metrics`) and updated in place by the instrumented code:
+an update is a few float additions, nothing is formatted nor sent. The registry is
+only rendered when it is scraped, in the Prometheus text exposition format (served
+by the daemon on `/api/metrics` and on the `<robot_name>/metrics` Zenoh queryable).
+
+Values that already exist elsewhere (e.g. the cache counters of the backend) are
+exported with counters or gauges computed by a function, called at scrape time only.
+Such functions should not keep the objects they read alive (use a weakref).
+
+Usage::
+
+    commands = metrics.counter("zenoh_commands_total", "Commands received.", ("command",))
+    commands.labels(command="set_target").inc()
+
+    update = metrics.histogram("control_loop_update_seconds", "Duration of the updates.")
+    update.observe(duration)
+
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Any, Callable, Generic, Iterator, TypeVar
+
+# Prefix of the names of all the metrics
+METRICS_NAMESPACE = "reachy_mini"
+
+# Default histogram buckets (in seconds), from 100us to 1s
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+class _Value:
+    """Single value, updated in place or computed by a function at scrape time."""
+
+    def __init__(self) -> None:
+        """Initialize the value at zero."""
+        self.value = 0.0
+        self._function: Callable[[], float | None] | None = None
+
+    def set_function(self, function: Callable[[], float | None] | None) -> None:
+        """Compute the value with a function at scrape time (None skips the sample)."""
+        self._function = function
+
+    def _samples(self, name: str, labels: str) -> Iterator[tuple[str, float]]:
+        value: float | None = self.value
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                # A failing function must not break the rendering of the other metrics
+                logger.warning("Could not compute the metric %s.", name, exc_info=True)
+                value = None
+        if value is not None:
+            yield f"{name}{_braces(labels)}", float(value)
+
+
+class Counter(_Value):
+    """Monotonically increasing value."""
+
+    def __init__(self) -> None:
+        """Initialize the counter at zero."""
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter."""
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(_Value):
+    """Value that can go up and down."""
+
+    def set(self, value: float) -> None:
+        """Set the value of the gauge."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the gauge (only from a single thread)."""
+        self.value += amount
+
+
+class Histogram:
+    """Distribution of observed values, counted in cumulative buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Initialize the histogram.
+
+        Args:
+            buckets (tuple[float, ...]): Increasing upper bounds of the buckets, +Inf is added.
+
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def _samples(self, name: str, labels: str) -> Iterator[tuple[str, float]]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self.sum, self.count
+
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else repr(bound)
+            yield f'{name}_bucket{{{labels}{sep}le="{le}"}}', cumulative
+        yield f"{name}_sum{_braces(labels)}", total
+        yield f"{name}_count{_braces(labels)}", count
+
+
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+# A metric of the registry, whatever its type
+_Metric = Counter | Gauge | Histogram
+
+
+class Family(Generic[M]):
+    """A metric and its children, one per combination of label values."""
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        factory: Callable[[], M],
+    ) -> None:
+        """Initialize the family (use the MetricsRegistry methods instead)."""
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._factory: Callable[[], M] = factory
+        self._children: dict[tuple[str, ...], M] = {}
+        self._lock = threading.Lock()
+        if not labelnames:
+            self._children[()] = factory()
+
+    def labels(self, **values: str) -> M:
+        """Get the child metric for the given label values, created on first use."""
+        key = tuple(str(values[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def _unlabelled(self) -> M:
+        if self.labelnames:
+            raise ValueError(f"Metric {self.name} has labels, use labels() first.")
+        return self._children[()]
+
+    def render(self) -> Iterator[str]:
+        """Render the family in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, child in list(self._children.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, key)
+            )
+            for sample_name, value in child._samples(self.name, labels):
+                yield f"{sample_name} {_format(value)}"
+
+
+class CounterFamily(Family[Counter]):
+    """Counters sharing a name, one per combination of label values."""
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter (without labels)."""
+        self._unlabelled().inc(amount)
+
+    def set_function(self, function: Callable[[], float | None] | None) -> None:
+        """Compute the counter (without labels) with a function at scrape time."""
+        self._unlabelled().set_function(function)
+
+
+class GaugeFamily(Family[Gauge]):
+    """Gauges sharing a name, one per combination of label values."""
+
+    def set(self, value: float) -> None:
+        """Set the value of the gauge (without labels)."""
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the gauge (without labels)."""
+        self._unlabelled().inc(amount)
+
+    def set_function(self, function: Callable[[], float | None] | None) -> None:
+        """Compute the gauge (without labels) with a function at scrape time."""
+        self._unlabelled().set_function(function)
+
+
+class HistogramFamily(Family[Histogram]):
+    """Histograms sharing a name, one per combination of label values."""
+
+    def observe(self, value: float) -> None:
+        """Add an observation to the histogram (without labels)."""
+        self._unlabelled().observe(value)
+
+
+F = TypeVar("F", bound=Family[Any])
+
+
+class MetricsRegistry:
+    """Named metrics of the process, rendered on demand."""
+
+    def __init__(self, namespace: str = METRICS_NAMESPACE) -> None:
+        """Initialize an empty registry.
+
+        Args:
+            namespace (str): Prefix added to the names of the metrics.
+
+        """
+        self.namespace = namespace
+        self._families: dict[str, Family[Any]] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> CounterFamily:
+        """Get or create a counter."""
+        return self._get(CounterFamily, "counter", name, help, labelnames, Counter)
+
+    def gauge(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> GaugeFamily:
+        """Get or create a gauge."""
+        return self._get(GaugeFamily, "gauge", name, help, labelnames, Gauge)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        """Get or create a histogram."""
+        return self._get(
+            HistogramFamily,
+            "histogram",
+            name,
+            help,
+            labelnames,
+            lambda: Histogram(buckets),
+        )
+
+    def render(self) -> str:
+        """Render all the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            families = list(self._families.values())
+        lines = [line for family in families for line in family.render()]
+        return "\n".join(lines) + "\n"
+
+    def _get(
+        self,
+        cls: type[F],
+        kind: str,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        factory: Callable[[], _Metric],
+    ) -> F:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            family = self._families.get(full_name)
+            if family is None:
+                new_family = cls(kind, full_name, help, labelnames, factory)
+                self._families[full_name] = new_family
+                return new_family
+            if not isinstance(family, cls) or family.labelnames != labelnames:
+                raise ValueError(
+                    f"Metric {full_name} is already registered with another type or labels."
+                )
+        return family
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# Registry of the daemon, rendered by /api/metrics and the metrics Zenoh queryable
+metrics = MetricsRegistry()
@@ -0,0 +1,220 @@
+"""Quaternion helpers for interpolating head orientations.
+
+Quaternions are stored in scalar-last (x, y, z, w) order, as in
+`scipy.spatial.transform.Rotation.as_quat`. All functions are vectorized over the
+leading dimensions of their inputs, except the `*_single` / `*_pose` ones, which
+handle a single rotation with plain floats: for one sample they are much faster
+than both scipy and the vectorized versions, whose cost is dominated by the call
+overhead.
+"""
+
+import math
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial.transform import Rotation as R
+
+# Below this angle between two quaternions, slerp falls back to a normalized lerp
+_SLERP_EPS = 1e-8
+
+
+def matrix_to_quat(
+    matrices: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Convert rotation matrices [..., 3, 3] to quaternions [..., 4]."""
+    matrices = np.asarray(matrices, dtype=np.float64)
+    quats: npt.NDArray[np.float64] = R.from_matrix(matrices.reshape(-1, 3, 3)).as_quat()
+    return quats.reshape(matrices.shape[:-2] + (4,))
+
+
+def quat_to_matrix(quats: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Convert unit quaternions [..., 4] to rotation matrices [..., 3, 3]."""
+    x, y, z, w = np.moveaxis(np.asarray(quats, dtype=np.float64), -1, 0)
+
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+
+    matrices = np.empty(x.shape + (3, 3))
+    matrices[..., 0, 0] = 1.0 - 2.0 * (yy + zz)
+    matrices[..., 0, 1] = 2.0 * (xy - wz)
+    matrices[..., 0, 2] = 2.0 * (xz + wy)
+    matrices[..., 1, 0] = 2.0 * (xy + wz)
+    matrices[..., 1, 1] = 1.0 - 2.0 * (xx + zz)
+    matrices[..., 1, 2] = 2.0 * (yz - wx)
+    matrices[..., 2, 0] = 2.0 * (xz - wy)
+    matrices[..., 2, 1] = 2.0 * (yz + wx)
+    matrices[..., 2, 2] = 1.0 - 2.0 * (xx + yy)
+    return matrices
+
+
+def quat_slerp(
+    q0: npt.NDArray[np.float64],
+    q1: npt.NDArray[np.float64],
+    alpha: npt.ArrayLike,
+) -> npt.NDArray[np.float64]:
+    """Spherical linear interpolation between unit quaternions, along the shortest path.
+
+    Args:
+        q0 (np.ndarray): Start quaternions [..., 4].
+        q1 (np.ndarray): End quaternions [..., 4].
+        alpha (array-like): Interpolation factors, broadcast against the leading dimensions.
+            Values outside [0, 1] extrapolate.
+
+    Returns:
+        np.ndarray: The interpolated unit quaternions [..., 4].
+
+    """
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    alpha = np.asarray(alpha, dtype=np.float64)[..., np.newaxis]
+
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    # q and -q are the same rotation: go along the shortest path
+    q1 = np.where(dot < 0.0, -q1, q1)
+
+    # Angle between q0 and q1, accurate for small angles unlike arccos(dot)
+    theta = 2.0 * np.arctan2(
+        np.linalg.norm(q0 - q1, axis=-1, keepdims=True),
+        np.linalg.norm(q0 + q1, axis=-1, keepdims=True),
+    )
+    sin_theta = np.sin(theta)
+    small = sin_theta < _SLERP_EPS
+    safe_sin_theta = np.where(small, 1.0, sin_theta)
+
+    w0 = np.where(small, 1.0 - alpha, np.sin((1.0 - alpha) * theta) / safe_sin_theta)
+    w1 = np.where(small, alpha, np.sin(alpha * theta) / safe_sin_theta)
+
+    q = w0 * q0 + w1 * q1
+    res: npt.NDArray[np.float64] = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    return res
+
+
+def matrix_to_quat_single(
+    matrix: npt.NDArray[np.float64],
+) -> tuple[float, float, float, float]:
+    """Convert a single rotation matrix (or the rotation of a 4x4 pose) to a quaternion."""
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = matrix[:3, :3].tolist()
+
+    # Shepperd's method: divide by the largest of the 4 candidates for stability
+    trace = m00 + m11 + m22
+    if trace > 0.0:
+        s = 2.0 * math.sqrt(trace + 1.0)
+        x, y, z, w = (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s, 0.25 * s
+    elif m00 > m11 and m00 > m22:
+        s = 2.0 * math.sqrt(1.0 + m00 - m11 - m22)
+        x, y, z, w = 0.25 * s, (m01 + m10) / s, (m02 + m20) / s, (m21 - m12) / s
+    elif m11 > m22:
+        s = 2.0 * math.sqrt(1.0 + m11 - m00 - m22)
+        x, y, z, w = (m01 + m10) / s, 0.25 * s, (m12 + m21) / s, (m02 - m20) / s
+    else:
+        s = 2.0 * math.sqrt(1.0 + m22 - m00 - m11)
+        x, y, z, w = (m02 + m20) / s, (m12 + m21) / s, 0.25 * s, (m10 - m01) / s
+
+    norm = math.sqrt(x * x + y * y + z * z + w * w)
+    return x / norm, y / norm, z / norm, w / norm
+
+
+def quat_slerp_pose(
+    q0: Sequence[float],
+    t0: Sequence[float],
+    q1: Sequence[float],
+    t1: Sequence[float],
+    alpha: float,
+) -> npt.NDArray[np.float64]:
+    """Interpolate a single pose, given as quaternion + translation, into a 4x4 matrix.
+
+    Scalar counterpart of `quat_slerp` + `quat_to_matrix` for one sample. Values of
+    alpha outside [0, 1] extrapolate.
+    """
+    x0, y0, z0, w0 = q0
+    x1, y1, z1, w1 = q1
+
+    dot = x0 * x1 + y0 * y1 + z0 * z1 + w0 * w1
+    if dot < 0.0:
+        x1, y1, z1, w1 = -x1, -y1, -z1, -w1
+
+    # Angle between q0 and q1, accurate for small angles unlike acos(dot)
+    dx, dy, dz, dw = x0 - x1, y0 - y1, z0 - z1, w0 - w1
+    sx, sy, sz, sw = x0 + x1, y0 + y1, z0 + z1, w0 + w1
+    theta = 2.0 * math.atan2(
+        math.sqrt(dx * dx + dy * dy + dz * dz + dw * dw),
+        math.sqrt(sx * sx + sy * sy + sz * sz + sw * sw),
+    )
+    sin_theta = math.sin(theta)
+    if sin_theta < _SLERP_EPS:
+        k0, k1 = 1.0 - alpha, alpha
+    else:
+        k0 = math.sin((1.0 - alpha) * theta) / sin_theta
+        k1 = math.sin(alpha * theta) / sin_theta
+
+    return _pose(
+        k0 * x0 + k1 * x1,
+        k0 * y0 + k1 * y1,
+        k0 * z0 + k1 * z1,
+        k0 * w0 + k1 * w1,
+        t0[0] + alpha * (t1[0] - t0[0]),
+        t0[1] + alpha * (t1[1] - t0[1]),
+        t0[2] + alpha * (t1[2] - t0[2]),
+    )
+
+
+def quat_rotvec_pose(
+    q0: Sequence[float],
+    rotvec: Sequence[float],
+    translation: Sequence[float],
+) -> npt.NDArray[np.float64]:
+    """Build the 4x4 pose with orientation q0 * exp(rotvec) and the given translation.
+
+    The rotation vector is expressed in the frame of q0. Scalar counterpart of
+    `(R.from_quat(q0) * R.from_rotvec(rotvec)).as_matrix()`.
+    """
+    x0, y0, z0, w0 = q0
+    rx, ry, rz = rotvec
+
+    angle = math.sqrt(rx * rx + ry * ry + rz * rz)
+    if angle < _SLERP_EPS:
+        # Taylor expansion of sin(angle / 2) / angle
+        k = 0.5 - angle * angle / 48.0
+    else:
+        k = math.sin(0.5 * angle) / angle
+    x1, y1, z1, w1 = k * rx, k * ry, k * rz, math.cos(0.5 * angle)
+
+    return _pose(
+        w0 * x1 + x0 * w1 + y0 * z1 - z0 * y1,
+        w0 * y1 - x0 * z1 + y0 * w1 + z0 * x1,
+        w0 * z1 + x0 * y1 - y0 * x1 + z0 * w1,
+        w0 * w1 - x0 * x1 - y0 * y1 - z0 * z1,
+        translation[0],
+        translation[1],
+        translation[2],
+    )
+
+
+def quat_to_pose(
+    q: Sequence[float], translation: Sequence[float]
+) -> npt.NDArray[np.float64]:
+    """Build a single 4x4 pose from a quaternion and a translation."""
+    return _pose(q[0], q[1], q[2], q[3], translation[0], translation[1], translation[2])
+
+
+def _pose(
+    x: float, y: float, z: float, w: float, tx: float, ty: float, tz: float
+) -> npt.NDArray[np.float64]:
+    """Build a 4x4 pose from a quaternion (normalized here) and a translation."""
+    norm = math.sqrt(x * x + y * y + z * z + w * w)
+    x, y, z, w = x / norm, y / norm, z / norm, w / norm
+
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+
+    return np.array(
+        [
+            [1.0 - 2.0 * (yy + zz), 2.0 * (xy - wz), 2.0 * (xz + wy), tx],
+            [2.0 * (xy + wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz - wx), ty],
+            [2.0 * (xz - wy), 2.0 * (yz + wx), 1.0 - 2.0 * (xx + yy), tz],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+    )
@@ -0,0 +1,114 @@
+"""Constant-memory statistics for high-rate loops.
+
+The control loop runs at 50Hz or more for hours, so its statistics must not grow
+with the uptime nor allocate at each tick. The `RollingWindow` keeps the last
+samples in a preallocated ring buffer and only computes percentiles when a
+summary is requested (e.g. once per second for the daemon status).
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of float samples with on-demand statistics."""
+
+    def __init__(self, size: int = 500) -> None:
+        """Initialize the window.
+
+        Args:
+            size (int): Number of samples kept. Older samples are overwritten.
+
+        """
+        if size < 1:
+            raise ValueError("The window size must be at least 1.")
+
+        self._values = np.zeros(size, dtype=np.float64)
+        self._size = size
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples currently in the window."""
+        return self._count
+
+    def append(self, value: float) -> None:
+        """Add a sample, overwriting the oldest one if the window is full."""
+        self._values[self._index] = value
+        self._index += 1
+        if self._index == self._size:
+            self._index = 0
+        if self._count < self._size:
+            self._count += 1
+
+    def clear(self) -> None:
+        """Remove all the samples."""
+        self._index = 0
+        self._count = 0
+
+    def values(self) -> npt.NDArray[np.float64]:
+        """Return a copy of the samples, oldest first."""
+        if self._count < self._size:
+            return self._values[: self._count].copy()
+        return np.roll(self._values, -self._index)
+
+    def summary(self, scale: float = 1.0) -> dict[str, float]:
+        """Compute the mean, p50, p99 and max of the samples.
+
+        Args:
+            scale (float): Factor applied to the results (e.g. 1e3 to report seconds as ms).
+
+        Returns:
+            dict: The statistics, empty if there is no sample yet.
+
+        """
+        if self._count == 0:
+            return {}
+
+        values = self._values[: self._count]
+        p50, p99 = np.percentile(values, (50, 99))
+        return {
+            "mean": float(np.mean(values)) * scale,
+            "p50": float(p50) * scale,
+            "p99": float(p99) * scale,
+            "max": float(np.max(values)) * scale,
+        }
+
+
+class TimingStats:
+    """Rolling windows of durations, one per named section of a loop."""
+
+    def __init__(self, window_size: int = 500) -> None:
+        """Initialize the timing statistics.
+
+        Args:
+            window_size (int): Number of samples kept per section.
+
+        """
+        self.window_size = window_size
+        self._windows: dict[str, RollingWindow] = {}
+
+    def record(self, name: str, duration: float) -> None:
+        """Record the duration (in seconds) of one run of a section."""
+        window = self._windows.get(name)
+        if window is None:
+            window = self._windows[name] = RollingWindow(self.window_size)
+        window.append(duration)
+
+    def clear(self) -> None:
+        """Remove all the samples of all the sections."""
+        for window in self._windows.values():
+            window.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Compute the statistics of each section, in milliseconds.
+
+        Returns:
+            dict: Section name suffixed with "_ms" -> mean, p50, p99 and max durations.
+
+        """
+        return {
+            f"{name}_ms": window.summary(scale=1e3)
+            for name, window in self._windows.items()
+            if len(window) > 0
+        }
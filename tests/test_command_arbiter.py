@@ -0,0 +1,213 @@
+"""Tests of the arbitration of the targets streamed by the clients."""
+
+import json
+from typing import Any
+
+import numpy as np
+import pytest
+
+from reachy_mini.daemon.backend import arbiter as arbiter_module
+from reachy_mini.daemon.backend.arbiter import CommandArbiter
+from reachy_mini.reachy_mini import ReachyMini
+
+
+class FakeClient:
+    """Client keeping the commands sent instead of publishing them."""
+
+    def __init__(self, source_id: str) -> None:
+        """Initialize the client of the given source."""
+        self.source_id = source_id
+        self.commands: list[dict[str, Any]] = []
+
+    def send_command(self, command: str) -> None:
+        """Keep the command."""
+        self.commands.append(json.loads(command))
+
+    def disconnect(self) -> None:
+        """Do nothing, the client is not connected."""
+        pass
+
+
+def make_sdk(source_id: str, priority: int = 0) -> ReachyMini:
+    """Create a ReachyMini sending its commands to a FakeClient."""
+    mini = ReachyMini.__new__(ReachyMini)
+    mini.client = FakeClient(source_id)  # type: ignore[assignment]
+    mini.target_priority = priority
+    mini.is_recording = False
+    mini._last_head_pose = None
+    return mini
+
+
+def submit_commands(mini: ReachyMini, arbiter: CommandArbiter) -> None:
+    """Submit the set_target commands sent by the SDK, as the Zenoh server does."""
+    client: FakeClient = mini.client  # type: ignore[assignment]
+    for command in client.commands:
+        target = command["set_target"]
+        head = target.get("head_pose")
+        antennas = target.get("antennas_joint_positions")
+        arbiter.submit(
+            source=target["source"],
+            head=np.array(head) if head is not None else None,
+            antennas=np.array(antennas) if antennas is not None else None,
+            body_yaw=target.get("body_yaw"),
+            priority=target["priority"],
+        )
+    client.commands.clear()
+
+
+def test_per_part_setters_carry_the_source_and_priority() -> None:
+    """Every per-part setter tags its target with the source and priority."""
+    mini = make_sdk("client", priority=2)
+    mini.set_target_head_pose(np.eye(4))
+    mini.set_target_antenna_joint_positions([0.1, 0.2])
+    mini.set_target_body_yaw(0.3)
+
+    client: FakeClient = mini.client  # type: ignore[assignment]
+    assert len(client.commands) == 3
+    for command in client.commands:
+        assert command["set_target"]["source"] == "client"
+        assert command["set_target"]["priority"] == 2
+
+
+def test_mixed_stream_of_the_lease_holder_is_applied() -> None:
+    """The lease holder can mix set_target and per-part targets."""
+    arbiter = CommandArbiter()
+    mini = make_sdk("client")
+    applied: list[tuple[Any, Any, Any]] = []
+
+    def set_target(head: Any, antennas: Any, body_yaw: Any) -> None:
+        applied.append((head, antennas, body_yaw))
+
+    # The client takes the lease with set_target
+    mini.set_target(head=np.eye(4), antennas=[0.0, 0.0], body_yaw=0.0)
+    submit_commands(mini, arbiter)
+    arbiter.apply(set_target)
+
+    # Then mixes in per-part targets while holding it
+    mini.set_target_antenna_joint_positions([0.5, -0.5])
+    submit_commands(mini, arbiter)
+    arbiter.apply(set_target)
+
+    mini.set_target_body_yaw(0.4)
+    submit_commands(mini, arbiter)
+    arbiter.apply(set_target)
+
+    assert len(applied) == 3
+    assert arbiter.nb_dropped == 0
+    np.testing.assert_allclose(applied[1][1], [0.5, -0.5])
+    assert applied[2][2] == 0.4
+
+
+def test_other_source_waits_for_the_lease() -> None:
+    """Targets of another source of the same priority are dropped."""
+    arbiter = CommandArbiter()
+    holder, other = make_sdk("holder"), make_sdk("other")
+    applied: list[Any] = []
+
+    holder.set_target(antennas=[0.0, 0.0])
+    submit_commands(holder, arbiter)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(antennas))
+
+    other.set_target_antenna_joint_positions([1.0, 1.0])
+    submit_commands(other, arbiter)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(antennas))
+
+    assert len(applied) == 1
+    assert arbiter.nb_dropped == 1
+
+
+class FakeClock:
+    """Monotonic clock of the arbiter, advanced by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at an arbitrary time."""
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Replace the clock of the arbiter module."""
+    clock = FakeClock()
+    monkeypatch.setattr(arbiter_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_higher_priority_takes_a_held_lease(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A source with a higher priority preempts the lease holder immediately."""
+    fake_clock(monkeypatch)
+    arbiter = CommandArbiter()
+    applied: list[Any] = []
+
+    arbiter.submit("holder", body_yaw=0.1, priority=0)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(body_yaw))
+    arbiter.submit("other", body_yaw=0.2, priority=0)
+    arbiter.submit("urgent", body_yaw=0.3, priority=1)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(body_yaw))
+
+    assert applied == [0.1, 0.3]
+    assert arbiter.get_stats()["lease_source"] == "urgent"
+    assert arbiter.nb_dropped == 1
+
+
+def test_lease_expires_after_its_duration(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Another source gets the lease once the holder stopped sending for a while."""
+    clock = fake_clock(monkeypatch)
+    arbiter = CommandArbiter(lease_duration=0.5)
+    applied: list[Any] = []
+
+    arbiter.submit("holder", body_yaw=0.1)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(body_yaw))
+
+    clock.now += 0.4
+    arbiter.submit("other", body_yaw=0.2)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(body_yaw))
+
+    clock.now += 0.2
+    arbiter.submit("other", body_yaw=0.3)
+    arbiter.apply(lambda head, antennas, body_yaw: applied.append(body_yaw))
+
+    assert applied == [0.1, 0.3]
+    assert arbiter.get_stats()["lease_source"] == "other"
+
+
+def test_targets_of_a_source_are_coalesced(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Targets submitted between two ticks are merged, the latest parts win."""
+    clock = fake_clock(monkeypatch)
+    arbiter = CommandArbiter()
+    applied: list[tuple[Any, Any, Any]] = []
+
+    arbiter.submit("client", head=np.eye(4), body_yaw=0.1)
+    clock.now += 0.01
+    arbiter.submit("client", antennas=np.array([0.5, -0.5]))
+    clock.now += 0.01
+    arbiter.submit("client", body_yaw=0.2)
+    arbiter.apply(lambda *target: applied.append(target))
+
+    assert len(applied) == 1
+    head, antennas, body_yaw = applied[0]
+    np.testing.assert_allclose(head, np.eye(4))
+    np.testing.assert_allclose(antennas, [0.5, -0.5])
+    assert body_yaw == 0.2
+    assert arbiter.get_last_applied("client") == pytest.approx((100.02, 100.02))
+
+
+def test_counters(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Count the applied, coalesced and dropped targets, the most recent wins."""
+    clock = fake_clock(monkeypatch)
+    arbiter = CommandArbiter()
+
+    for source, body_yaw in (("a", 0.1), ("a", 0.2), ("b", 0.3), ("c", 0.4)):
+        clock.now += 0.01
+        arbiter.submit(source, body_yaw=body_yaw)
+    arbiter.apply(lambda head, antennas, body_yaw: None)
+    arbiter.apply(lambda head, antennas, body_yaw: None)
+
+    assert arbiter.get_stats() == {
+        "nb_applied": 1,
+        "nb_coalesced": 1,
+        "nb_dropped": 2,
+        "lease_source": "c",
+    }
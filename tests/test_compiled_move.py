@@ -0,0 +1,93 @@
+"""Tests of the joint-space compilation of moves and of its cache."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from reachy_mini.motion.compiled_move import CompiledMoveCache, compile_move
+from reachy_mini.motion.goto import GotoMove
+from reachy_mini.utils.interpolation import InterpolationTechnique
+
+
+class FakeKinematics:
+    """Kinematics whose IK maps the head height to the 7 joints, NaN above a limit."""
+
+    def __init__(self, max_z: float = np.inf) -> None:
+        """Initialize the kinematics, unreachable above max_z."""
+        self.max_z = max_z
+        self.automatic_body_yaw = True
+        self.nb_batches = 0
+
+    def ik_batch(self, poses: np.ndarray, body_yaws: np.ndarray) -> np.ndarray:
+        """Solve a batch of poses."""
+        self.nb_batches += 1
+        z = poses[:, 2, 3]
+        joints = np.repeat(z[:, None], 7, axis=1)
+        joints[z > self.max_z] = np.nan
+        return joints
+
+
+def fake_kinematics(max_z: float = np.inf) -> Any:
+    """Get a FakeKinematics, typed as any kinematics engine."""
+    return FakeKinematics(max_z)
+
+
+def rising_move(duration: float = 1.0) -> GotoMove:
+    """Get a linear goto raising the head by 1 cm per 100 ms."""
+    target = np.eye(4)
+    target[2, 3] = 0.1 * duration
+    return GotoMove(
+        start_head_pose=np.eye(4),
+        target_head_pose=target,
+        start_antennas=np.zeros(2),
+        target_antennas=np.array([1.0, -1.0]),
+        start_body_yaw=0.0,
+        target_body_yaw=0.0,
+        duration=duration,
+        method=InterpolationTechnique.LINEAR,
+    )
+
+
+def test_compile_samples_the_move() -> None:
+    """Compile a move at 10 Hz and play back its samples."""
+    compiled = compile_move(rising_move(), fake_kinematics(), frequency=10.0)
+
+    assert len(compiled) == 10
+    assert compiled.duration == pytest.approx(1.0)
+    head_joints, antennas = compiled.evaluate_joints(0.55)
+    np.testing.assert_allclose(head_joints, [0.05] * 7)
+    np.testing.assert_allclose(antennas, [0.5, -0.5])
+    head_pose, _ = compiled.end_target()
+    assert head_pose[2, 3] == pytest.approx(0.09)
+
+
+def test_compile_holds_the_last_reachable_joints() -> None:
+    """Unreachable samples keep the joints of the last reachable one."""
+    compiled = compile_move(rising_move(), fake_kinematics(max_z=0.045), 10.0)
+
+    np.testing.assert_allclose(
+        compiled.head_joint_positions[:, 0],
+        [0.0, 0.01, 0.02, 0.03, 0.04, 0.04, 0.04, 0.04, 0.04, 0.04],
+    )
+
+
+def test_compile_rejects_an_unreachable_start() -> None:
+    """A move starting out of reach cannot be compiled."""
+    with pytest.raises(ValueError):
+        compile_move(rising_move(), fake_kinematics(max_z=-1.0), 10.0)
+
+
+def test_cache_compiles_once_per_setting() -> None:
+    """A move is compiled once, then again when the automatic body yaw changes."""
+    cache = CompiledMoveCache()
+    kinematics = fake_kinematics()
+    move = rising_move()
+
+    first = cache.get_or_compile("move", move, kinematics, "Fake", 10.0)
+    assert cache.get_or_compile("move", move, kinematics, "Fake", 10.0) is first
+    assert kinematics.nb_batches == 1
+
+    kinematics.automatic_body_yaw = False
+    assert cache.get_or_compile("move", move, kinematics, "Fake", 10.0) is not first
+    assert kinematics.nb_batches == 2
@@ -0,0 +1,73 @@
+"""Tests of the absolute deadlines of the control loop scheduler."""
+
+import pytest
+
+from reachy_mini.daemon.backend import control_loop
+from reachy_mini.daemon.backend.control_loop import ControlLoopScheduler
+
+
+class FakeTime:
+    """Monotonic clock and sleep of the scheduler, advanced by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at an arbitrary time."""
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        """Get the current time."""
+        return self.now
+
+    def sleep(self, duration: float) -> None:
+        """Advance the clock instead of sleeping."""
+        self.sleeps.append(duration)
+        self.now += duration
+
+
+def started_scheduler(
+    monkeypatch: pytest.MonkeyPatch,
+) -> tuple[ControlLoopScheduler, FakeTime]:
+    """Start a 10 Hz scheduler on a fake clock."""
+    fake_time = FakeTime()
+    monkeypatch.setattr(control_loop, "time", fake_time)
+    scheduler = ControlLoopScheduler(frequency=10.0)
+    scheduler.start()
+    return scheduler, fake_time
+
+
+def test_ticks_are_on_absolute_deadlines(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The time spent in the iterations does not shift the next deadlines."""
+    scheduler, fake_time = started_scheduler(monkeypatch)
+
+    starts = []
+    for took in (0.02, 0.05, 0.08):
+        fake_time.now += took
+        starts.append(scheduler.wait_next_tick())
+
+    assert starts == pytest.approx([100.1, 100.2, 100.3])
+    assert fake_time.sleeps == pytest.approx([0.08, 0.05, 0.02])
+    assert scheduler.nb_overruns == 0
+    assert scheduler.get_stats()["mean_control_loop_frequency"] == pytest.approx(10.0)
+
+
+def test_overrun_skips_the_missed_ticks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A late tick starts at once, ticks missed by more than a period are skipped."""
+    scheduler, fake_time = started_scheduler(monkeypatch)
+
+    fake_time.now += 0.12
+    assert scheduler.wait_next_tick() == pytest.approx(100.12)
+    assert (scheduler.nb_overruns, scheduler.nb_skipped_ticks) == (1, 0)
+
+    fake_time.now += 0.25
+    assert scheduler.wait_next_tick() == pytest.approx(100.37)
+    assert (scheduler.nb_overruns, scheduler.nb_skipped_ticks) == (2, 1)
+
+    # Back on the schedule of t0 + k * period
+    assert scheduler.wait_next_tick() == pytest.approx(100.4)
+    assert scheduler.jitters.values() == pytest.approx([0.02, 0.07, 0.0])
+
+
+def test_frequency_must_be_positive() -> None:
+    """A null frequency is rejected."""
+    with pytest.raises(ValueError):
+        ControlLoopScheduler(frequency=0.0)
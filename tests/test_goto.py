@@ -0,0 +1,115 @@
+"""Tests of the gotos with no duration, as sent e.g. by wake_up when already awake."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from reachy_mini.daemon.backend.motion_executor import MotionExecutor
+from reachy_mini.motion.goto import BlendedGotoMove, GotoMove, JointGotoMove
+from reachy_mini.utils.interpolation import InterpolationTechnique
+
+
+def target_pose() -> np.ndarray:
+    """Get a head pose away from the identity."""
+    pose = np.eye(4)
+    pose[:3, 3] = [0.01, -0.02, 0.03]
+    pose[:3, :3] = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+    return pose
+
+
+@pytest.mark.parametrize("method", list(InterpolationTechnique))
+def test_goto_with_no_duration_is_at_its_target(
+    method: InterpolationTechnique,
+) -> None:
+    """Evaluate a task-space goto of zero duration."""
+    move = GotoMove(
+        start_head_pose=np.eye(4),
+        target_head_pose=target_pose(),
+        start_antennas=np.zeros(2),
+        target_antennas=np.array([0.5, -0.5]),
+        start_body_yaw=0.0,
+        target_body_yaw=0.2,
+        duration=0.0,
+        method=method,
+    )
+
+    head, antennas, body_yaw = move.evaluate(0.0)
+    np.testing.assert_allclose(head, target_pose(), atol=1e-9)
+    np.testing.assert_allclose(antennas, [0.5, -0.5])
+    assert body_yaw == pytest.approx(0.2)
+
+    heads, _, body_yaws = move.evaluate_many([0.0])
+    np.testing.assert_allclose(heads[0], target_pose(), atol=1e-9)
+    np.testing.assert_allclose(body_yaws, [0.2])
+
+
+@pytest.mark.parametrize("method", list(InterpolationTechnique))
+def test_joint_goto_with_no_duration_is_at_its_target(
+    method: InterpolationTechnique,
+) -> None:
+    """Evaluate a joint-space goto of zero duration."""
+    target = np.linspace(0.1, 0.9, 9)
+    move = JointGotoMove(
+        start_joints=np.zeros(9),
+        target_joints=target,
+        duration=0.0,
+        method=method,
+        start_velocity=np.ones(9),
+    )
+
+    head_joints, antennas = move.evaluate_joints(0.0)
+    np.testing.assert_allclose(head_joints, target[:7])
+    np.testing.assert_allclose(antennas, target[7:])
+
+
+def test_blended_goto_with_no_duration_is_at_its_target() -> None:
+    """Evaluate a minimum jerk goto of zero duration, started while moving."""
+    move = BlendedGotoMove(
+        start_head_pose=np.eye(4),
+        target_head_pose=target_pose(),
+        start_antennas=np.zeros(2),
+        target_antennas=np.array([0.5, -0.5]),
+        start_body_yaw=0.0,
+        target_body_yaw=0.2,
+        duration=0.0,
+        start_velocity=np.ones(9),
+        start_acceleration=np.ones(9),
+    )
+
+    head, antennas, body_yaw = move.evaluate(0.0)
+    np.testing.assert_allclose(head, target_pose(), atol=1e-9)
+    np.testing.assert_allclose(antennas, [0.5, -0.5])
+    assert body_yaw == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("method", list(InterpolationTechnique))
+def test_executor_ends_a_goto_with_no_duration_at_once(
+    method: InterpolationTechnique,
+) -> None:
+    """Play a zero-duration goto on the executor: one tick sets the target."""
+    targets: list[Any] = []
+    executor = MotionExecutor(
+        lambda *target: targets.append(target),
+        lambda *joints: None,
+        lambda *end: None,
+    )
+    future = executor.play(
+        GotoMove(
+            start_head_pose=np.eye(4),
+            target_head_pose=target_pose(),
+            start_antennas=np.zeros(2),
+            target_antennas=None,
+            start_body_yaw=0.0,
+            target_body_yaw=None,
+            duration=0.0,
+            method=method,
+        )
+    )
+
+    executor.step()
+
+    assert future.result(timeout=0) is True
+    assert not executor.is_active
+    assert len(targets) == 1
+    np.testing.assert_allclose(targets[0][0], target_pose(), atol=1e-9)
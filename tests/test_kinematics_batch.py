@@ -0,0 +1,51 @@
+"""Parity of the batch and single-pose kinematics of the analytical engine."""
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation as R
+
+pytest.importorskip("reachy_mini_rust_kinematics")
+
+from reachy_mini.kinematics import AnalyticalKinematics  # noqa: E402
+
+
+def head_poses(n: int = 10) -> np.ndarray:
+    """Get head poses along a small nod, turn and lift of the head."""
+    poses = np.tile(np.eye(4), (n, 1, 1))
+    s = np.linspace(0.0, 1.0, n)
+    poses[:, :3, :3] = R.from_euler(
+        "xyz", np.stack([0.1 * s, -0.15 * s, 0.3 * s], axis=1)
+    ).as_matrix()
+    poses[:, 2, 3] = 0.01 * s
+    return poses
+
+
+@pytest.mark.parametrize("automatic_body_yaw", [True, False])
+def test_ik_batch_matches_ik(automatic_body_yaw: bool) -> None:
+    """Solve the poses one by one and in a batch."""
+    kinematics = AnalyticalKinematics(automatic_body_yaw=automatic_body_yaw)
+    poses = head_poses()
+    body_yaws = np.linspace(0.0, 0.2, len(poses))
+
+    batch = kinematics.ik_batch(poses, body_yaws)
+
+    assert batch.shape == (len(poses), 7)
+    for pose, body_yaw, joints in zip(poses, body_yaws, batch):
+        np.testing.assert_allclose(joints, kinematics.ik(pose, body_yaw), atol=1e-9)
+
+
+def test_fk_batch_inverts_ik_batch() -> None:
+    """The forward kinematics of the solved joints give back the poses."""
+    kinematics = AnalyticalKinematics(automatic_body_yaw=False)
+    poses = head_poses()
+
+    joints = kinematics.ik_batch(poses)
+    reached = kinematics.fk_batch(joints, no_iterations=20)
+
+    np.testing.assert_allclose(reached, poses, atol=1e-3)
+
+    single = AnalyticalKinematics(automatic_body_yaw=False)
+    for joint_positions, pose in zip(joints, reached):
+        np.testing.assert_allclose(
+            single.fk(joint_positions, no_iterations=20), pose, atol=1e-9
+        )
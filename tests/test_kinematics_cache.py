@@ -0,0 +1,51 @@
+"""Tests of the quantized caches of the kinematics results."""
+
+import numpy as np
+
+from reachy_mini.daemon.backend.kinematics_cache import QuantizedCache, fk_key, ik_key
+
+IK_TOLERANCE = {"rad": 2e-3, "m": 0.5e-3}
+
+
+def test_ik_key_shares_the_cell_of_close_poses() -> None:
+    """Poses closer than the tolerances share a key, farther ones do not."""
+    pose = np.eye(4)
+    close = pose.copy()
+    close[:3, 3] += 0.1e-3
+    far = pose.copy()
+    far[:3, 3] += 2e-3
+
+    key = ik_key(pose, 0.0, IK_TOLERANCE, True)
+    assert ik_key(close, 0.0, IK_TOLERANCE, True) == key
+    assert ik_key(far, 0.0, IK_TOLERANCE, True) != key
+    assert ik_key(pose, 0.1, IK_TOLERANCE, True) != key
+
+
+def test_ik_key_depends_on_the_automatic_body_yaw() -> None:
+    """Solutions of the two automatic body yaw settings are not mixed up."""
+    pose = np.eye(4)
+    assert ik_key(pose, 0.0, IK_TOLERANCE, True) != ik_key(
+        pose, 0.0, IK_TOLERANCE, False
+    )
+
+
+def test_fk_key_quantizes_the_joints() -> None:
+    """Joints closer than the tolerance share a key."""
+    joints = np.linspace(-0.5, 0.5, 7)
+    assert fk_key(joints, 1e-3) == fk_key(joints + 1e-4, 1e-3)
+    assert fk_key(joints, 1e-3) != fk_key(joints + 1e-2, 1e-3)
+
+
+def test_cache_evicts_the_least_recently_used_entry() -> None:
+    """Get an entry to keep it, the oldest other one is evicted."""
+    cache: QuantizedCache[int] = QuantizedCache(maxsize=2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1
+
+    cache.put(b"c", 3)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1
+    assert cache.get(b"c") == 3
+    assert cache.get_stats() == {"hits": 3, "misses": 1, "size": 2}
@@ -0,0 +1,169 @@
+"""Tests of the preemption and futures of the moves played by the executor."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from reachy_mini.daemon.backend import motion_executor as motion_executor_module
+from reachy_mini.daemon.backend.motion_executor import MotionExecutor, MotionState
+from reachy_mini.motion.move import JointMove, Move
+
+
+class FakeClock:
+    """Monotonic clock of the executor, advanced by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at an arbitrary time."""
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+class AntennasMove(Move):
+    """Move the antennas linearly from 0 to 1 rad, failing after fail_at."""
+
+    def __init__(self, duration: float = 1.0, fail_at: float = np.inf) -> None:
+        """Initialize the move."""
+        self._duration = duration
+        self.fail_at = fail_at
+
+    @property
+    def duration(self) -> float:
+        """Duration of the move in seconds."""
+        return self._duration
+
+    def evaluate(self, t: float) -> tuple[Any, Any, Any]:
+        """Evaluate the move at time t."""
+        if t >= self.fail_at:
+            raise RuntimeError("evaluation failed")
+        return None, np.full(2, t / self._duration), None
+
+
+class HeadJointsMove(JointMove):
+    """Move the head joints linearly from 0 to 1 rad."""
+
+    @property
+    def duration(self) -> float:
+        """Duration of the move in seconds."""
+        return 1.0
+
+    def evaluate_joints(self, t: float) -> tuple[Any, Any]:
+        """Evaluate the move at time t."""
+        return np.full(7, t), None
+
+    def end_target(self) -> tuple[Any, Any]:
+        """Get the body yaw reached at the end of the move."""
+        return None, 0.5
+
+
+class Recorder:
+    """Executor playing on a fake clock, keeping the targets it sets."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Initialize the executor on a fake clock."""
+        self.clock = FakeClock()
+        monkeypatch.setattr(
+            motion_executor_module.time, "monotonic", self.clock.monotonic
+        )
+        self.targets: list[Any] = []
+        self.joint_targets: list[Any] = []
+        self.end_targets: list[Any] = []
+        self.executor = MotionExecutor(
+            lambda *target: self.targets.append(target),
+            lambda *joints: self.joint_targets.append(joints),
+            lambda *end: self.end_targets.append(end),
+        )
+
+    def step_at(self, t: float) -> None:
+        """Advance the clock by t seconds and step the executor."""
+        self.clock.now += t
+        self.executor.step()
+
+
+def test_move_resolves_to_true_at_its_end(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The targets follow the move, the future resolves once it ended."""
+    recorder = Recorder(monkeypatch)
+    future = recorder.executor.play(AntennasMove())
+
+    recorder.step_at(0.5)
+    assert not future.done()
+    recorder.step_at(0.7)
+
+    assert future.result(timeout=0) is True
+    assert not recorder.executor.is_active
+    np.testing.assert_allclose(recorder.targets[0][1], [0.5, 0.5])
+    np.testing.assert_allclose(recorder.targets[1][1], [1.0, 1.0])
+
+
+def test_preempted_move_resolves_to_false(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A new move preempts the active one and starts from its motion state."""
+    recorder = Recorder(monkeypatch)
+    first = recorder.executor.play(AntennasMove())
+    recorder.clock.now += 0.5
+    states: list[MotionState | None] = []
+
+    def build(state: MotionState | None) -> Move:
+        states.append(state)
+        return AntennasMove()
+
+    second = recorder.executor.play(build)
+
+    assert first.result(timeout=0) is False
+    assert not second.done()
+    state = states[0]
+    assert state is not None
+    np.testing.assert_allclose(state.antennas, [0.5, 0.5])
+    np.testing.assert_allclose(state.velocity, [0.0] * 6 + [1.0, 1.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(state.acceleration, np.zeros(9), atol=1e-6)
+
+
+def test_stop_and_cancel_end_the_move(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Stopping resolves the future to False, cancelling it stops at the next tick."""
+    recorder = Recorder(monkeypatch)
+    stopped = recorder.executor.play(AntennasMove())
+    recorder.executor.stop()
+    assert stopped.result(timeout=0) is False
+
+    cancelled = recorder.executor.play(AntennasMove())
+    assert cancelled.cancel()
+    recorder.step_at(0.1)
+
+    assert not recorder.executor.is_active
+    assert recorder.targets == []
+
+
+def test_failing_move_is_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A move raising is dropped and its future fails, the executor keeps going."""
+    recorder = Recorder(monkeypatch)
+    future = recorder.executor.play(AntennasMove(fail_at=0.3))
+
+    recorder.step_at(0.1)
+    recorder.step_at(0.3)
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=0)
+    assert not recorder.executor.is_active
+    assert len(recorder.targets) == 1
+
+    again = recorder.executor.play(AntennasMove(duration=0.1))
+    recorder.step_at(0.2)
+    assert again.result(timeout=0) is True
+    assert len(recorder.targets) == 2
+
+
+def test_joint_move_sets_its_end_target(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A joint move sets the joints at each tick, then the target it ended at."""
+    recorder = Recorder(monkeypatch)
+    future = recorder.executor.play(HeadJointsMove())
+
+    recorder.step_at(0.5)
+    assert recorder.end_targets == []
+    recorder.step_at(1.0)
+
+    assert future.result(timeout=0) is True
+    np.testing.assert_allclose(recorder.joint_targets[-1][0], np.ones(7))
+    assert recorder.end_targets == [(None, 0.5)]
+    assert recorder.targets == []
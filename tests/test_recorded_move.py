@@ -0,0 +1,115 @@
+"""Tests of the recorded moves and of their packed datasets."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation as R
+
+from reachy_mini.motion import recorded_move
+from reachy_mini.motion.recorded_move import (
+    PACKED_INDEX,
+    RecordedMove,
+    RecordedMoves,
+    pack_recorded_moves,
+)
+
+
+def recorded_json(n: int, yaw: float) -> dict[str, Any]:
+    """Get the JSON of a move turning the head to yaw, sampled n times at 100 Hz."""
+    samples = []
+    for i in range(n):
+        head = np.eye(4)
+        head[:3, :3] = R.from_euler("z", yaw * i / (n - 1)).as_matrix()
+        head[2, 3] = 0.001 * i
+        samples.append(
+            {"head": head.tolist(), "antennas": [0.1 * i, -0.1 * i], "body_yaw": 0.0}
+        )
+    return {
+        "description": f"turn to {yaw}",
+        "time": [0.01 * i for i in range(n)],
+        "set_target_data": samples,
+    }
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> Path:
+    """Write a dataset of two JSON moves."""
+    json_dir = tmp_path / "snapshots" / "revision"
+    json_dir.mkdir(parents=True)
+    for name, n, yaw in (("left", 5, 0.5), ("right", 8, -0.5)):
+        with open(json_dir / f"{name}.json", "w") as f:
+            json.dump(recorded_json(n, yaw), f)
+    return json_dir
+
+
+def test_packed_moves_match_the_json_ones(
+    dataset: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Pack a dataset, then load its moves lazily from the memory-mapped columns."""
+    monkeypatch.setattr(
+        recorded_move, "snapshot_download", lambda *args, **kwargs: str(dataset)
+    )
+    moves = RecordedMoves("user/dataset", cache_path=tmp_path / "packed")
+
+    packed_path = tmp_path / "packed" / "user--dataset" / "revision"
+    assert (packed_path / PACKED_INDEX).exists()
+    assert sorted(moves.list_moves()) == ["left", "right"]
+
+    for name in ("left", "right"):
+        with open(dataset / f"{name}.json") as f:
+            expected = RecordedMove(json.load(f))
+        move = moves.get(name)
+
+        assert moves.get(name) is move
+        assert move.description == expected.description
+        assert move.duration == pytest.approx(expected.duration)
+        assert not move.times.flags.owndata
+        for t in np.linspace(0.0, expected.times[-1] - 1e-6, 7):
+            for value, expected_value in zip(move.evaluate(t), expected.evaluate(t)):
+                np.testing.assert_allclose(value, expected_value, atol=1e-12)
+
+    assert moves.moves["left"]["description"] == "turn to 0.5"
+
+    with pytest.raises(ValueError):
+        moves.get("unknown")
+
+
+def test_pack_an_empty_dataset(tmp_path: Path) -> None:
+    """Packing a directory without moves writes an empty index."""
+    pack_recorded_moves(tmp_path, tmp_path / "packed")
+
+    with open(tmp_path / "packed" / PACKED_INDEX) as f:
+        assert json.load(f) == {}
+
+
+def test_evaluate_many_matches_evaluate() -> None:
+    """The vectorized and scalar evaluations give the same samples."""
+    move = RecordedMove(recorded_json(10, 1.0))
+    ts = np.linspace(0.0, move.times[-1] - 1e-6, 13)
+
+    heads, antennas, body_yaws = move.evaluate_many(ts)
+
+    for i, t in enumerate(ts):
+        head, antenna, body_yaw = move.evaluate(t)
+        np.testing.assert_allclose(heads[i], head, atol=1e-12)
+        np.testing.assert_allclose(antennas[i], antenna, atol=1e-12)
+        assert body_yaws[i] == pytest.approx(body_yaw)
+
+
+def test_json_views_of_the_move() -> None:
+    """The former JSON attributes are rebuilt from the arrays."""
+    json_move = recorded_json(4, 0.5)
+    move = RecordedMove(json_move)
+
+    assert move.timestamps == pytest.approx(json_move["time"])
+    assert move.move["description"] == json_move["description"]
+    for sample, expected in zip(move.trajectory, json_move["set_target_data"]):
+        np.testing.assert_allclose(sample["head"], expected["head"], atol=1e-12)
+        np.testing.assert_allclose(sample["antennas"], expected["antennas"])
+        assert sample["body_yaw"] == expected["body_yaw"]
+    rebuilt = RecordedMove(move.move)
+    for value, expected_value in zip(rebuilt.evaluate(0.015), move.evaluate(0.015)):
+        np.testing.assert_allclose(value, expected_value, atol=1e-12)
@@ -0,0 +1,59 @@
+"""Tests of the constant-memory statistics of the control loop."""
+
+import numpy as np
+import pytest
+
+from reachy_mini.utils.stats import RollingWindow, TimingStats
+
+
+def test_window_keeps_the_last_samples() -> None:
+    """Once full, the oldest samples are overwritten."""
+    window = RollingWindow(size=3)
+    assert window.summary() == {}
+
+    for value in (1.0, 2.0):
+        window.append(value)
+    np.testing.assert_array_equal(window.values(), [1.0, 2.0])
+
+    for value in (3.0, 4.0, 5.0):
+        window.append(value)
+    assert len(window) == 3
+    np.testing.assert_array_equal(window.values(), [3.0, 4.0, 5.0])
+
+    window.clear()
+    assert len(window) == 0
+    assert window.values().size == 0
+
+
+def test_window_summary() -> None:
+    """Compute the statistics of the samples, scaled."""
+    window = RollingWindow(size=200)
+    for value in range(1, 101):
+        window.append(value / 1e3)
+
+    summary = window.summary(scale=1e3)
+
+    assert summary["mean"] == pytest.approx(50.5)
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == pytest.approx(100.0)
+
+
+def test_window_size_must_be_positive() -> None:
+    """An empty window is rejected."""
+    with pytest.raises(ValueError):
+        RollingWindow(size=0)
+
+
+def test_timing_stats_per_section() -> None:
+    """Only the sections with samples are reported, in milliseconds."""
+    stats = TimingStats(window_size=10)
+    stats.record("update", 0.002)
+    stats.record("update", 0.004)
+    stats.record("ik", 0.001)
+    stats.clear()
+    stats.record("update", 0.003)
+
+    assert stats.summary() == {
+        "update_ms": {"mean": 3.0, "p50": 3.0, "p99": 3.0, "max": 3.0}
+    }
@@ -0,0 +1,108 @@
+"""Round trips of the messages of the binary wire format."""
+
+import numpy as np
+import pytest
+
+from reachy_mini.io.wire import (
+    RobotStateSample,
+    TargetAck,
+    TargetSample,
+    Trajectory,
+    WireFormat,
+    decode_state,
+    decode_target,
+    decode_target_ack,
+    decode_trajectory,
+    encode_state,
+    encode_target,
+    encode_target_ack,
+    encode_trajectory,
+    is_binary,
+)
+
+
+def head_pose() -> np.ndarray:
+    """Get a head pose rotated around z and translated."""
+    pose = np.eye(4)
+    pose[:3, :3] = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+    pose[:3, 3] = [0.01, -0.02, 0.03]
+    return pose
+
+
+@pytest.mark.parametrize("wire_format", list(WireFormat))
+def test_state_round_trip(wire_format: WireFormat) -> None:
+    """Encode and decode a state sample, with and without targets."""
+    for targets in (True, False):
+        sample = RobotStateSample(
+            seq=42,
+            timestamp=12.5,
+            control_mode="gravity_compensation",
+            head_joint_positions=np.linspace(-0.3, 0.3, 7),
+            antennas_joint_positions=np.array([0.1, -0.1]),
+            target_head_joint_positions=np.linspace(0.3, -0.3, 7) if targets else None,
+            target_antennas_joint_positions=np.array([0.2, -0.2]) if targets else None,
+            head_pose=head_pose(),
+        )
+
+        payload = encode_state(sample, wire_format)
+        decoded = decode_state(payload)
+
+        assert is_binary(payload) == (wire_format == WireFormat.BINARY)
+        assert (decoded.seq, decoded.timestamp) == (42, 12.5)
+        assert decoded.control_mode == "gravity_compensation"
+        np.testing.assert_allclose(decoded.head_pose, head_pose())
+        np.testing.assert_allclose(
+            decoded.head_joint_positions, sample.head_joint_positions
+        )
+        if targets:
+            np.testing.assert_allclose(
+                decoded.target_head_joint_positions,  # type: ignore[arg-type]
+                sample.target_head_joint_positions,  # type: ignore[arg-type]
+            )
+        else:
+            assert decoded.target_head_joint_positions is None
+            assert decoded.target_antennas_joint_positions is None
+
+
+def test_target_round_trip() -> None:
+    """Encode and decode full and partial targets."""
+    full = decode_target(
+        encode_target(TargetSample(3, 1.5, head_pose(), np.ones(2), 0.4))
+    )
+    assert (full.seq, full.timestamp, full.body_yaw) == (3, 1.5, 0.4)
+    np.testing.assert_allclose(full.head_pose, head_pose(), atol=1e-12)  # type: ignore[arg-type]
+    np.testing.assert_allclose(full.antennas, [1.0, 1.0])  # type: ignore[arg-type]
+
+    partial = decode_target(encode_target(TargetSample(4, 2.0, None, None, 0.1)))
+    assert partial.head_pose is None
+    assert partial.antennas is None
+    assert partial.body_yaw == 0.1
+
+
+def test_target_ack_round_trip() -> None:
+    """Encode and decode an acknowledgement."""
+    ack = decode_target_ack(encode_target_ack(TargetAck(7, 3.0, 0.02, 2)))
+    assert ack == TargetAck(7, 3.0, 0.02, 2)
+
+
+def test_trajectory_round_trip() -> None:
+    """Encode and decode a trajectory, rejecting truncated payloads."""
+    n = 5
+    trajectory = Trajectory(
+        times=np.linspace(0.0, 1.0, n),
+        head_quaternions=np.tile([0.0, 0.0, 0.0, 1.0], (n, 1)),
+        head_translations=np.random.uniform(-0.01, 0.01, (n, 3)),
+        antennas=np.random.uniform(-1.0, 1.0, (n, 2)),
+        body_yaw=np.linspace(0.0, 0.5, n),
+    )
+
+    payload = encode_trajectory(trajectory)
+    decoded = decode_trajectory(payload)
+
+    for field in ("times", "head_quaternions", "head_translations", "antennas"):
+        np.testing.assert_array_equal(
+            getattr(decoded, field), getattr(trajectory, field)
+        )
+    np.testing.assert_array_equal(decoded.body_yaw, trajectory.body_yaw)
+    with pytest.raises(ValueError):
+        decode_trajectory(payload[:-8])
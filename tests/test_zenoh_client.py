@@ -0,0 +1,97 @@
+"""Tests of the reassembly of the recordings received in chunks by the client."""
+
+import json
+import threading
+from typing import Any
+
+import pytest
+
+from reachy_mini.io import zenoh_client
+from reachy_mini.io.zenoh_client import RECORDING_CHUNKS_TIMEOUT, ZenohClient
+
+
+class FakePayload:
+    """Payload of a Zenoh sample."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Initialize the payload with the JSON of data."""
+        self.data = json.dumps(data)
+
+    def to_string(self) -> str:
+        """Get the payload as a string."""
+        return self.data
+
+
+class FakeSample:
+    """Zenoh sample holding a chunk of a recording."""
+
+    def __init__(self, recording_id: str, seq: int, last: bool) -> None:
+        """Initialize the sample of the given chunk, holding one record."""
+        self.payload = FakePayload(
+            {
+                "recording_id": recording_id,
+                "seq": seq,
+                "last": last,
+                "records": [{"seq": seq}],
+            }
+        )
+
+
+class FakePublisher:
+    """Publisher keeping the messages instead of sending them."""
+
+    def __init__(self) -> None:
+        """Initialize the publisher."""
+        self.messages: list[Any] = []
+
+    def put(self, message: Any) -> None:
+        """Keep the message."""
+        self.messages.append(json.loads(message))
+
+
+def make_client(monkeypatch: pytest.MonkeyPatch) -> tuple[ZenohClient, list[float]]:
+    """Create a client receiving recordings, without a Zenoh session."""
+    now = [100.0]
+    monkeypatch.setattr(zenoh_client.time, "monotonic", lambda: now[0])
+    client = ZenohClient.__new__(ZenohClient)
+    client.cmd_pub = FakePublisher()  # type: ignore[assignment]
+    client._recorded_data = None
+    client._recorded_data_ready = threading.Event()
+    client.last_recording_id = None
+    client._recording_chunks = {}
+    client._recording_nb_chunks = {}
+    client._recording_last_chunk_time = {}
+    client._recording_lock = threading.Lock()
+    return client, now
+
+
+def test_chunks_are_reassembled_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Chunks received out of order give the records in order."""
+    client, _ = make_client(monkeypatch)
+
+    client._handle_recorded_data(FakeSample("a", 1, last=False))  # type: ignore[arg-type]
+    client._handle_recorded_data(FakeSample("a", 2, last=True))  # type: ignore[arg-type]
+    assert client.cmd_pub.messages == [{"get_recording": "a"}]  # type: ignore[attr-defined]
+    client._handle_recorded_data(FakeSample("a", 0, last=False))  # type: ignore[arg-type]
+
+    assert client.last_recording_id == "a"
+    assert client.get_recorded_data(wait=False) == [{"seq": 0}, {"seq": 1}, {"seq": 2}]
+    assert client._recording_chunks == {}
+    assert client._recording_last_chunk_time == {}
+
+
+def test_partial_recordings_are_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A recording missing chunks for too long is dropped when others arrive."""
+    client, now = make_client(monkeypatch)
+    client._handle_recorded_data(FakeSample("a", 1, last=True))  # type: ignore[arg-type]
+
+    now[0] += RECORDING_CHUNKS_TIMEOUT / 2
+    client._handle_recorded_data(FakeSample("b", 0, last=False))  # type: ignore[arg-type]
+    assert set(client._recording_chunks) == {"a", "b"}
+
+    now[0] += RECORDING_CHUNKS_TIMEOUT + 1.0
+    client._handle_recorded_data(FakeSample("c", 0, last=True))  # type: ignore[arg-type]
+
+    assert client._recording_chunks == {}
+    assert client._recording_nb_chunks == {}
+    assert client.last_recording_id == "c"